@@ -0,0 +1,212 @@
+"""Button sequences in sequences/*.txt, compiled into programs of typed steps.
+
+Each line of a sequence file is one action:
+
+    key          press key, then wait 0.1 s
+    key-N        press key, then wait N seconds
+    key:N        hold key down for N seconds
+
+Files are parsed and validated once, so a typo fails at startup with its
+file and line instead of halfway through a restock. Programs are kept in
+memory and only recompiled when their file's mtime changes.
+"""
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+DEFAULT_PRESS_WAIT = 0.1
+
+# Key names input_handler understands besides single characters.
+SPECIAL_KEYS = frozenset({
+    "space", "enter", "return", "tab", "backspace", "escape", "esc", "up", "down", "left", "right",
+    "shift", "ctrl", "alt", "delete", "home", "end", "pageup", "pagedown", "insert",
+    "f1", "f2", "f3", "f4", "f5", "f6", "f7", "f8", "f9", "f10", "f11", "f12",
+    "capslock", "numlock", "scrolllock", "printscreen", "pause", "win", "command", "menu",
+})
+
+
+class SequenceError(ValueError):
+    """A sequence file that can't be compiled."""
+
+    def __init__(self, path: Path, line_no: int, message: str) -> None:
+        super().__init__(f"{path}:{line_no}: {message}")
+        self.path = path
+        self.line_no = line_no
+
+
+@dataclass(frozen=True, slots=True)
+class Press:
+    key: str
+
+
+@dataclass(frozen=True, slots=True)
+class Hold:
+    key: str
+    seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class Wait:
+    seconds: float
+
+
+# Steps that only code builds, for inputs a sequence file can't express.
+@dataclass(frozen=True, slots=True)
+class KeyDown:
+    key: str
+
+
+@dataclass(frozen=True, slots=True)
+class KeyUp:
+    key: str
+
+
+@dataclass(frozen=True, slots=True)
+class Move:
+    x: int
+    y: int
+
+
+@dataclass(frozen=True, slots=True)
+class Copy:
+    text: str
+
+
+Step = Union[Press, Hold, Wait, KeyDown, KeyUp, Move, Copy]
+
+
+@dataclass(frozen=True, slots=True)
+class SequenceProgram:
+    name: str
+    path: Path
+    steps: Tuple[Step, ...]
+    mtime_ns: int
+
+    def expected_duration(self, jitter: float = 0.0) -> float:
+        """Seconds the program takes, adding `jitter` to every timed step."""
+        return steps_duration(self.steps, jitter)
+
+    def keys(self) -> List[str]:
+        return [step.key for step in self.steps if isinstance(step, (Press, Hold, KeyDown))]
+
+
+def steps_duration(steps: Iterable[Step], jitter: float = 0.0) -> float:
+    """Seconds a list of steps takes, adding `jitter` to every timed step."""
+    return sum(step.seconds + jitter for step in steps if isinstance(step, (Hold, Wait)))
+
+
+def split_trailing_wait(steps: Tuple[Step, ...]) -> Tuple[Tuple[Step, ...], float]:
+    """The steps without their final pause, and that pause's length (0 if there is none)."""
+    if steps and isinstance(steps[-1], Wait):
+        return steps[:-1], steps[-1].seconds
+    return steps, 0.0
+
+
+def _check_key(path: Path, line_no: int, key: str) -> str:
+    if len(key) == 1 or key.lower() in SPECIAL_KEYS:
+        return key
+    raise SequenceError(path, line_no, f"unknown key {key!r}")
+
+
+def _seconds(path: Path, line_no: int, raw: str) -> float:
+    try:
+        seconds = float(raw)
+    except ValueError:
+        raise SequenceError(path, line_no, f"{raw!r} is not a number of seconds") from None
+    if not math.isfinite(seconds) or seconds < 0:
+        raise SequenceError(path, line_no, f"{raw!r} is not a number of seconds")
+    return seconds
+
+
+def compile_sequence(path: Path, name: Optional[str] = None) -> SequenceProgram:
+    """Parse and validate one sequence file."""
+    mtime_ns = path.stat().st_mtime_ns
+    text = path.read_text(encoding="utf-8")
+
+    steps: List[Step] = []
+    for line_no, raw_line in enumerate(text.splitlines(), start=1):
+        line = raw_line.strip()
+        if not line:
+            continue
+        if ":" in line:
+            key, duration = line.split(":", 1)
+            steps.append(Hold(_check_key(path, line_no, key.strip()), _seconds(path, line_no, duration.strip())))
+            continue
+        key, wait = line, DEFAULT_PRESS_WAIT
+        # The first character is always the key, so "-" and "--2" press minus.
+        split_at = line.find("-", 1)
+        if split_at > 0:
+            key = line[:split_at]
+            wait = _seconds(path, line_no, line[split_at + 1:].strip())
+        steps.append(Press(_check_key(path, line_no, key.strip())))
+        steps.append(Wait(wait))
+
+    return SequenceProgram(name or path.name, path, tuple(steps), mtime_ns)
+
+
+class SequenceLibrary:
+    """Compiled programs of every sequence file under a directory."""
+
+    __slots__ = ["directory", "_programs"]
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self._programs: Dict[str, SequenceProgram] = {}
+
+    @staticmethod
+    def _normalise(name: str) -> str:
+        return name if name.endswith(".txt") else f"{name}.txt"
+
+    def preload(self) -> List[SequenceProgram]:
+        """Compile every sequence, squadron overrides included.
+
+        Raises SequenceError naming every file that doesn't compile.
+        """
+        errors: List[SequenceError] = []
+        for path in sorted(self.directory.rglob("*.txt")):
+            try:
+                self.get(path.relative_to(self.directory).as_posix())
+            except SequenceError as exc:
+                errors.append(exc)
+        if errors:
+            if len(errors) == 1:
+                raise errors[0]
+            first = errors[0]
+            raise SequenceError(first.path, first.line_no, "; ".join(str(exc) for exc in errors))
+        return list(self._programs.values())
+
+    def has(self, name: str) -> bool:
+        return (self.directory / self._normalise(name)).is_file()
+
+    def get(self, name: str) -> SequenceProgram:
+        """The compiled program for `name`, recompiled if its file changed.
+
+        Raises FileNotFoundError if the file doesn't exist.
+        """
+        name = self._normalise(name)
+        path = self.directory / name
+        mtime_ns = os.stat(path).st_mtime_ns
+        program = self._programs.get(name)
+        if program is None or program.mtime_ns != mtime_ns:
+            program = compile_sequence(path, name)
+            self._programs[name] = program
+        return program
+
+    def expected_duration(self, names: Iterable[str], jitter: float = 0.0) -> float:
+        return sum(self.get(name).expected_duration(jitter) for name in names)
+
+
+_libraries: Dict[Path, SequenceLibrary] = {}
+
+
+def get_library(directory: Path) -> SequenceLibrary:
+    """The shared library for `directory`."""
+    directory = Path(directory)
+    library = _libraries.get(directory)
+    if library is None:
+        library = _libraries[directory] = SequenceLibrary(directory)
+    return library
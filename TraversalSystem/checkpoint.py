@@ -0,0 +1,114 @@
+"""Where the traversal is, written to checkpoint.json as each phase begins.
+
+A checkpoint names the route (its files and a hash of its systems), the
+position along it, the jump in flight with its departure time, the phase of
+the jump cycle and whether this cycle's restock is done. It is written to a
+temporary file, flushed to disk and renamed over the old one, so a crash or
+power cut leaves either the previous checkpoint or the new one, never half
+of one. On restart CTS rejoins a jump that is already scheduled instead of
+plotting it again.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from config import BASE_DIR
+
+CHECKPOINT_PATH = BASE_DIR / "checkpoint.json"
+# The save file older versions wrote; read once if there is no checkpoint.
+LEGACY_SAVE_NAME = "save.txt"
+VERSION = 1
+# Phases in which a jump has been requested and not yet finished its cycle.
+IN_FLIGHT_PHASES = ("countdown", "jumping", "cooldown", "restocking")
+
+# The restock thread and the traversal loop both write checkpoints.
+_write_lock = threading.Lock()
+
+
+@dataclass(slots=True)
+class Checkpoint:
+    route_hash: str
+    line_no: int
+    phase: str
+    route_files: List[str] = field(default_factory=list)
+    # The leg's file name and the position within it, for route queues.
+    leg: Optional[str] = None
+    leg_position: int = 0
+    # The jump in flight: where to, its DepartureTime and when CTS saw it land (Unix times).
+    destination: Optional[str] = None
+    departure: Optional[float] = None
+    jumped_at: Optional[float] = None
+    restocked: bool = False
+    saved_at: float = 0.0
+    version: int = VERSION
+
+    @property
+    def in_flight(self) -> bool:
+        return self.phase in IN_FLIGHT_PHASES and self.destination is not None and self.departure is not None
+
+
+def route_hash(names: Iterable[str]) -> str:
+    """Identifies a route by its systems, so a checkpoint isn't applied to an edited or different route."""
+    digest = hashlib.sha256()
+    for name in names:
+        digest.update(name.lower().encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def write_checkpoint(path: Path, checkpoint: Checkpoint) -> None:
+    """Replace the checkpoint at `path` atomically."""
+    data = json.dumps(asdict(checkpoint), indent=1).encode("utf-8")
+    with _write_lock:
+        descriptor, temp_name = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(descriptor, "wb") as temp_file:
+                temp_file.write(data)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        _sync_directory(path.parent)
+
+
+def _sync_directory(directory: Path) -> None:
+    # Makes the rename itself durable. Windows can't open directories, and
+    # NTFS journals the rename anyway.
+    if os.name == "nt":
+        return
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def read_checkpoint(path: Path) -> Optional[Checkpoint]:
+    """The checkpoint at `path`, or None if there is none. Raises ValueError if it is unreadable."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        raise ValueError(f"Could not read {path.name}: {exc}") from exc
+    if not isinstance(data, dict):
+        raise ValueError(f"Could not read {path.name}: not a checkpoint")
+    known = {item.name for item in fields(Checkpoint)}
+    try:
+        return Checkpoint(**{key: value for key, value in data.items() if key in known})
+    except TypeError as exc:
+        raise ValueError(f"Could not read {path.name}: {exc}") from exc
@@ -0,0 +1,171 @@
+"""Time source for the traversal loop.
+
+Everything that sleeps or reads the time during a route goes through a clock
+so the whole loop can run against virtual time in simulation.
+"""
+from __future__ import annotations
+
+import datetime
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+class SystemClock:
+    """The real wall clock."""
+
+    __slots__ = []
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    def now(self, tz: Optional[datetime.tzinfo] = None) -> datetime.datetime:
+        return datetime.datetime.now(tz)
+
+    def wait(self, condition: threading.Condition, timeout: float) -> None:
+        """Condition.wait: called holding `condition`, returns when notified or on timeout."""
+        condition.wait(timeout)
+
+    def spawn(self, target: Callable[..., object], *args) -> threading.Thread:
+        """Run `target` on a daemon thread that sleeps on this clock."""
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
+
+SYSTEM_CLOCK = SystemClock()
+
+# Virtual seconds FakeClock.wait lets pass before its caller checks again.
+FAKE_WAIT_STEP = 0.25
+
+
+class FakeClock:
+    """Virtual time that only moves when the driving thread sleeps.
+
+    The thread that created the clock drives it: its sleeps return at once
+    after moving time forward and firing any callbacks that came due. Threads
+    started with spawn() run in step with it: the driver stops at the end of
+    each of their sleeps and waits for them to reach their next sleep before
+    moving time on, so their actions land at the right virtual time.
+    """
+
+    __slots__ = ["_epoch", "_elapsed", "_owner", "_timers", "_seq", "_cond", "_running", "_sleepers"]
+
+    def __init__(self, start: Optional[datetime.datetime] = None) -> None:
+        start = start or datetime.datetime.now(datetime.timezone.utc)
+        if start.tzinfo is None:
+            start = start.astimezone()
+        self._epoch = start.timestamp()
+        self._elapsed = 0.0
+        self._owner = threading.get_ident()
+        self._timers: List[Tuple[float, int, Callable[[], None]]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        # Spawned threads that are doing work, and those asleep until a virtual time.
+        self._running: Set[int] = set()
+        self._sleepers: Dict[int, float] = {}
+
+    @property
+    def elapsed(self) -> float:
+        """Virtual seconds since the clock was created."""
+        return self._elapsed
+
+    def sleep(self, seconds: float) -> None:
+        if threading.get_ident() == self._owner:
+            self.advance(seconds)
+            return
+
+        ident = threading.get_ident()
+        with self._cond:
+            self._running.discard(ident)
+            self._sleepers[ident] = self._elapsed + max(0.0, seconds)
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: ident not in self._sleepers)
+
+    def advance(self, seconds: float) -> None:
+        target = self._elapsed + max(0.0, seconds)
+        while True:
+            callback = None
+            with self._cond:
+                self._cond.wait_for(lambda: not self._running)
+                due = min(
+                    target,
+                    self._timers[0][0] if self._timers else target,
+                    min(self._sleepers.values(), default=target),
+                )
+                self._elapsed = max(self._elapsed, due)
+
+                woken = [ident for ident, wake in self._sleepers.items() if wake <= self._elapsed]
+                if woken:
+                    for ident in woken:
+                        del self._sleepers[ident]
+                        self._running.add(ident)
+                    self._cond.notify_all()
+                    continue
+
+                if self._timers and self._timers[0][0] <= self._elapsed:
+                    callback = heapq.heappop(self._timers)[2]
+                elif self._elapsed >= target:
+                    return
+            if callback is not None:
+                callback()
+
+    def spawn(self, target: Callable[..., object], *args) -> threading.Thread:
+        """Start `target` on a thread that runs in step with virtual time."""
+        started = threading.Event()
+
+        def run() -> None:
+            ident = threading.get_ident()
+            with self._cond:
+                self._running.add(ident)
+            started.set()
+            try:
+                target(*args)
+            finally:
+                with self._cond:
+                    self._running.discard(ident)
+                    self._cond.notify_all()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        # Don't let the driver move on before the thread has checked in.
+        started.wait()
+        return thread
+
+    def wait(self, condition: threading.Condition, timeout: float) -> None:
+        """Let up to `timeout` virtual seconds pass with `condition` released.
+
+        Nothing notifies in virtual time, so this moves time on in short
+        steps and leaves the caller to check again.
+        """
+        condition.release()
+        try:
+            self.sleep(min(timeout, FAKE_WAIT_STEP))
+        finally:
+            condition.acquire()
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        """Run `callback` on the driving thread once `delay` virtual seconds pass."""
+        with self._cond:
+            heapq.heappush(self._timers, (self._elapsed + max(0.0, delay), next(self._seq), callback))
+
+    def call_at(self, when: datetime.datetime, callback: Callable[[], None]) -> None:
+        self.call_later(when.timestamp() - self.time(), callback)
+
+    def monotonic(self) -> float:
+        return self._elapsed
+
+    def time(self) -> float:
+        return self._epoch + self._elapsed
+
+    def now(self, tz: Optional[datetime.tzinfo] = None) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.time(), tz)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Tuple
 
 
 def _detect_base_dir() -> Path:
@@ -41,6 +41,15 @@ def _as_bool(value: str | None, default: bool = False) -> bool:
     return value.strip().lower() in {"1", "true", "t", "yes", "y", "on"}
 
 
+def _as_float(value: str | None, default: float = 0.0) -> float:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
 def _as_int(value: str | None, default: int = 0) -> int:
     if value is None:
         return default
@@ -56,13 +65,23 @@ class TraversalOptions:
     journal_directory: Path
     route_file: Path
     route_position: int = 0
+    # Work out route_position from the journals when there is no checkpoint.
+    journal_resume: bool = True
+    # Route files or directories flown back to back. Empty means just route_file.
+    route_queue: Tuple[Path, ...] = ()
     tritium_slot: int = 0
     auto_plot_jumps: bool = True
+    # Check the galaxy map and jump button against screen templates while plotting.
+    screen_check: bool = True
     disable_refuel: bool = False
     power_saving: bool = False
     refuel_mode: int = 0
     single_discord_message: bool = False
     shutdown_on_complete: bool = True
+    journal_watch_mode: str = "auto"
+    input_jitter: float = 0.5
+    telemetry: bool = True
+    profile: bool = False
 
 
 def load_settings(
@@ -83,16 +102,27 @@ def load_settings(
     route_file = Path(settings_values.get("route_file", "route.txt"))
     if not route_file.is_absolute():
         route_file = settings_file.parent / route_file
+    route_queue = tuple(
+        path if path.is_absolute() else settings_file.parent / path
+        for path in (
+            Path(item.strip()).expanduser()
+            for item in settings_values.get("route_queue", "").split(",")
+            if item.strip()
+        )
+    )
 
     return TraversalOptions(
         webhook_url=settings_values.get("webhook_url", ""),
         journal_directory=journal_directory,
         route_file=route_file,
+        route_queue=route_queue,
         route_position=max(
             0, _as_int(settings_values.get("route_position"), default=0)
         ),
+        journal_resume=_as_bool(settings_values.get("journal-resume"), default=True),
         tritium_slot=_as_int(settings_values.get("tritium_slot"), default=0),
         auto_plot_jumps=_as_bool(settings_values.get("auto-plot-jumps"), default=True),
+        screen_check=_as_bool(settings_values.get("screen-check"), default=True),
         disable_refuel=_as_bool(settings_values.get("disable-refuel"), default=False),
         power_saving=_as_bool(settings_values.get("power-saving"), default=False),
         refuel_mode=_as_int(settings_values.get("refuel-mode"), default=0),
@@ -102,4 +132,9 @@ def load_settings(
         shutdown_on_complete=_as_bool(
             settings_values.get("shutdown-on-complete"), default=True
         ),
+        journal_watch_mode=settings_values.get("journal-watch-mode", "auto").strip().lower()
+        or "auto",
+        input_jitter=max(0.0, _as_float(settings_values.get("input-jitter"), default=0.5)),
+        telemetry=_as_bool(settings_values.get("telemetry"), default=True),
+        profile=_as_bool(settings_values.get("profile"), default=False),
     )
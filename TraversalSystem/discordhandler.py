@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import collections
 import random
 import re
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Callable, Deque, Iterable, List, Optional, Tuple
 
-from discord_webhook import DiscordWebhook, DiscordEmbed
 from config import BASE_DIR
+from profiler import PROFILER
+from webhooktransport import WebhookMessage, WebhookTransport
 
 # Define default carrier stage list and maintenance stage list
 CSL = [
@@ -34,13 +39,71 @@ MSL = [
     "Done"
 ]
 
+# Most messages the dispatch queue holds before it starts dropping stale
+# stage updates to make room. Posts are never dropped, so a queue of nothing
+# but posts can grow past this.
+MAX_QUEUED_MESSAGES = 32
+
+
+@dataclass(slots=True)
+class _Dispatch:
+    kind: str
+    send: Callable[[], None]
+    queued: float
+
+
+@dataclass(slots=True)
+class DispatchStats:
+    sent: int = 0
+    failed: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    max_depth: int = 0
+    # Seconds from handing a message over to it being sent, and of the send itself.
+    latencies: List[float] = field(default_factory=list)
+    send_times: List[float] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        def p95(values: List[float]) -> float:
+            if not values:
+                return 0.0
+            ordered = sorted(values)
+            return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+        return (
+            f"{self.sent} sent, {self.failed} failed, {self.coalesced} stage updates coalesced, "
+            f"{self.dropped} stale updates dropped, max queue depth {self.max_depth}, "
+            f"p95 latency {p95(self.latencies):.2f}s (send {p95(self.send_times):.2f}s)"
+        )
+
+
 class DiscordHandler:
-    __slots__ = ["lastHook", "lastEmbed", "photo_list", "single_message"]
+    """Builds and sends the route's webhook messages.
+
+    The public methods only queue the message; a background worker sends them
+    in order, so the traversal loop never waits on Discord. Stage updates that
+    pile up behind a slow send are collapsed into the latest one.
+    """
 
-    def __init__(self, *, single_message: bool = False, photos: Optional[Iterable[str]] = None) -> None:
-        self.lastHook = None
-        self.lastEmbed = None
+    __slots__ = ["lastHook", "lastEmbed", "photo_list", "single_message", "transport", "stats",
+                 "_queue", "_cond", "_worker", "_busy"]
+
+    def __init__(
+        self,
+        *,
+        single_message: bool = False,
+        photos: Optional[Iterable[str]] = None,
+        transport: Optional[WebhookTransport] = None,
+    ) -> None:
+        self.lastHook: Optional[WebhookMessage] = None
+        self.lastEmbed: Optional[dict] = None
         self.single_message = single_message
+        self.transport = transport if transport is not None else WebhookTransport()
+        self.stats = DispatchStats()
+        self._queue: Deque[_Dispatch] = collections.deque()
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._busy = False
 
         if photos is not None:
             self.photo_list: List[str] = list(photos)
@@ -56,71 +119,132 @@ class DiscordHandler:
 
 
     def post_to_discord(self, subject: str, webhook_url: str, routeName: str, *message: str):
-        """Send a simple message to a Discord webhook."""
+        """Queue a simple message for a Discord webhook."""
         if webhook_url == "":
             return
-        try:
-            photo = random.choice(self.photo_list)
-            self._prepare_hook(webhook_url, subject, routeName, message, photo)
-            self._send_or_edit()
-        except Exception as e:
-            print("Discord webhook failed with error: ", e)
-            print("Double-check that the webhook is set up")
+        photo = random.choice(self.photo_list)
+        self._dispatch("post", lambda: self._send_post(webhook_url, subject, routeName, message, photo))
 
 
     def post_with_fields(self, subject: str, webhook_url: str, routeName: str, *message: str):
-        """Send a message to a Discord webhook with status fields attached."""
+        """Queue a message for a Discord webhook with status fields attached."""
         if webhook_url == "":
             return
-        try:
-            photo = random.choice(self.photo_list)
-            self._prepare_hook(webhook_url, subject, routeName, message, photo)
-            self._reset_fields()
-            self._add_fields(("Jump stage", "Wait..."), ("Maintenance stage", "Wait..."))
-            self._send_or_edit()
-        except Exception as e:
-            print("Discord webhook failed with error: ", e)
-            print("Double-check that the webhook is set up")
+        photo = random.choice(self.photo_list)
+        self._dispatch("post", lambda: self._send_post_with_fields(webhook_url, subject, routeName, message, photo))
 
 
     def update_fields(self, carrierStage: int, maintenanceStage: int):
-        if not self.lastHook:
+        """Queue an edit of the stage fields on the last message."""
+        if self._worker is None:
+            # Nothing was ever posted, so there is no message to edit.
             return
-        try:
-            cur_CSL, cur_MSL = [], []  # Define carrier stage list and maintenance stage list for the current field update
-
-            # Add strikethru to every carrier stage before current
-            for c_stage_name in CSL[:carrierStage]:
-                cur_CSL.append(f"~~{c_stage_name}~~")
-            # Bold current stage
-            cur_CSL.append(f"**{CSL[carrierStage]}**")
-            # Add remaining stages as normal text
-            cur_CSL += CSL[carrierStage+1:]
-            
-            # Add strikethru & "...DONE" signifier to every maintenance stage before current
-            for m_stage_name in MSL[:maintenanceStage]:
-                cur_MSL.append(f"~~{m_stage_name}...DONE~~")
-            # Bold current stage and add ellipsis
-            cur_MSL.append(f"**{MSL[maintenanceStage]}...**")
-            # Add remaining stages as normal text
-            cur_MSL += MSL[maintenanceStage+1:]
-
-            # Once the jump is finished, replace all countdowns with a static text blurb
-            if maintenanceStage == 9 and self.lastEmbed.description:
-                while re.search(r"<t:\d*:R>", self.lastEmbed.description):
-                    self.lastEmbed.description = str(re.sub(r"<t:\d*:R>", "Countdown Expired", self.lastEmbed.description))
+        self._dispatch("update", lambda: self._send_update(carrierStage, maintenanceStage))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued message is sent. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def _dispatch(self, kind: str, send: Callable[[], None]) -> None:
+        with self._cond:
+            if kind == "update" and self._queue and self._queue[-1].kind == "update":
+                # The edit still waiting would be overwritten by this one anyway;
+                # keep its place (and queue time) but send the newer state.
+                self._queue[-1].send = send
+                self.stats.coalesced += 1
+                return
+            if len(self._queue) >= MAX_QUEUED_MESSAGES:
+                self._drop_one()
+            self._queue.append(_Dispatch(kind, send, time.monotonic()))
+            self.stats.max_depth = max(self.stats.max_depth, len(self._queue))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="discord-dispatch", daemon=True)
+                self._worker.start()
+            self._cond.notify_all()
+
+    def _drop_one(self) -> None:
+        # A stale stage update is the only thing worth losing; a later update
+        # redraws the stages anyway. Posts are kept even past the limit.
+        for queued in self._queue:
+            if queued.kind == "update":
+                self._queue.remove(queued)
+                self.stats.dropped += 1
+                return
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue)
+                queued = self._queue.popleft()
+                self._busy = True
+            started = time.monotonic()
+            try:
+                with PROFILER.span(f"discord {queued.kind}"):
+                    queued.send()
+                ok = True
+            except Exception as e:
+                print("Discord webhook failed with error: ", e)
+                print("Double-check that the webhook is set up")
+                ok = False
+            finished = time.monotonic()
+            with self._cond:
+                self._busy = False
+                if ok:
+                    self.stats.sent += 1
+                else:
+                    self.stats.failed += 1
+                self.stats.latencies.append(finished - queued.queued)
+                self.stats.send_times.append(finished - started)
+                self._cond.notify_all()
+
+    def _send_post(
+        self, webhook_url: str, subject: str, route_name: str, message: Tuple[str, ...], photo: str
+    ) -> None:
+        self._prepare_hook(webhook_url, subject, route_name, message, photo)
+        self._send_or_edit(webhook_url)
+
+    def _send_post_with_fields(
+        self, webhook_url: str, subject: str, route_name: str, message: Tuple[str, ...], photo: str
+    ) -> None:
+        self._prepare_hook(webhook_url, subject, route_name, message, photo)
+        self._reset_fields()
+        self._add_fields(("Jump stage", "Wait..."), ("Maintenance stage", "Wait..."))
+        self._send_or_edit(webhook_url)
+
+    def _send_update(self, carrierStage: int, maintenanceStage: int) -> None:
+        if not self.lastHook or not self.lastEmbed:
+            return
+        cur_CSL, cur_MSL = [], []  # Define carrier stage list and maintenance stage list for the current field update
+
+        # Add strikethru to every carrier stage before current
+        for c_stage_name in CSL[:carrierStage]:
+            cur_CSL.append(f"~~{c_stage_name}~~")
+        # Bold current stage
+        cur_CSL.append(f"**{CSL[carrierStage]}**")
+        # Add remaining stages as normal text
+        cur_CSL += CSL[carrierStage+1:]
+        
+        # Add strikethru & "...DONE" signifier to every maintenance stage before current
+        for m_stage_name in MSL[:maintenanceStage]:
+            cur_MSL.append(f"~~{m_stage_name}...DONE~~")
+        # Bold current stage and add ellipsis
+        cur_MSL.append(f"**{MSL[maintenanceStage]}...**")
+        # Add remaining stages as normal text
+        cur_MSL += MSL[maintenanceStage+1:]
+
+        # Once the jump is finished, replace all countdowns with a static text blurb
+        if maintenanceStage == 9 and self.lastEmbed.get("description"):
+            while re.search(r"<t:\d*:R>", self.lastEmbed["description"]):
+                self.lastEmbed["description"] = str(re.sub(r"<t:\d*:R>", "Countdown Expired", self.lastEmbed["description"]))
         
         
-            self._reset_fields()
-            self._add_fields(
-                ("Jump stage", "\n".join(cur_CSL)),
-                ("Maintenance stage", "\n".join(cur_MSL)),
-            )
-            self.lastHook.edit()
-        except Exception as e:
-            print("Discord webhook failed with error: ", e)
-            print("Double-check that the webhook is set up")
-            # print(f"DEBUG DATA: lastHook: {self.lastHook}, lastEmbed: {self.lastEmbed}")
+        self._reset_fields()
+        self._add_fields(
+            ("Jump stage", "\n".join(cur_CSL)),
+            ("Maintenance stage", "\n".join(cur_MSL)),
+        )
+        self.transport.edit(self.lastHook, {"embeds": [self.lastEmbed]})
 
     def _prepare_hook(
         self,
@@ -131,45 +255,38 @@ class DiscordHandler:
         photo: str,
     ) -> None:
         if self.single_message and self.lastHook is not None and self.lastEmbed is not None:
-            self.lastHook.remove_embeds()
             embed = self.lastEmbed
-            embed.title = subject
-            embed.description = "\n".join(message)
+            embed["title"] = subject
+            embed["description"] = "\n".join(message)
         else:
-            self.lastHook = DiscordWebhook(url=webhook_url, rate_limit_retry=True)
-            embed = DiscordEmbed(title=subject, description="\n".join(message))
+            # A new message; it only gets a hook to edit once it has been posted.
+            self.lastHook = None
+            embed = {"title": subject, "description": "\n".join(message), "fields": []}
             self.lastEmbed = embed
 
-        embed.set_image(url=photo)
-        embed.set_author(name=route_name)
-        embed.set_footer(text="Carrier Administration and Traversal System")
+        embed["image"] = {"url": photo}
+        embed["author"] = {"name": route_name}
+        embed["footer"] = {"text": "Carrier Administration and Traversal System"}
 
     def _reset_fields(self) -> None:
-        if not self.lastHook or not self.lastEmbed:
+        if not self.lastEmbed:
             return
 
-        self.lastHook.remove_embeds()
-        try:
-            self.lastEmbed.delete_embed_field(0)
-            self.lastEmbed.delete_embed_field(0)
-        except Exception:
-            pass
+        self.lastEmbed["fields"] = []
 
     def _add_fields(self, *fields: tuple[str, str]) -> None:
         if not self.lastEmbed:
             return
 
         for name, value in fields:
-            self.lastEmbed.add_embed_field(name=name, value=value)
-
-        if self.lastHook:
-            self.lastHook.add_embed(self.lastEmbed)
+            self.lastEmbed["fields"].append({"name": name, "value": value, "inline": True})
 
-    def _send_or_edit(self) -> None:
-        if not self.lastHook:
+    def _send_or_edit(self, webhook_url: str) -> None:
+        if not self.lastEmbed:
             return
 
-        if self.single_message and self.lastHook is not None and self.lastEmbed is not None:
-            self.lastHook.edit()
+        payload = {"embeds": [self.lastEmbed]}
+        if self.single_message and self.lastHook is not None:
+            self.transport.edit(self.lastHook, payload)
         else:
-            self.lastHook.execute()
+            self.lastHook = self.transport.execute(webhook_url, payload)
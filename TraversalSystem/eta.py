@@ -0,0 +1,234 @@
+"""Route completion estimates from the carrier's observed jump timings.
+
+A jump cycle has three phases that show up in the journal:
+
+    timer      CarrierJumpRequest to its DepartureTime
+    transit    DepartureTime to the CarrierJump event
+    cooldown   CarrierJump to the next CarrierJumpRequest (plotting included)
+
+plus the tritium restock, which CTS times itself. Samples come from the
+newest journals, read backwards on a background thread at startup, and from
+events as the route is flown, and each
+phase is estimated as the median of its latest samples. Restock timings
+aren't in the journal, so they are kept in eta_history.json between runs.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import statistics
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+from config import BASE_DIR
+from journalevents import (
+    CarrierJump,
+    CarrierJumpCancelled,
+    CarrierJumpRequest,
+    JournalEvent,
+    decode_event,
+    event_name,
+    journal_time,
+)
+from journallocator import get_locator
+from journalscan import reverse_lines
+
+HISTORY_PATH = BASE_DIR / "eta_history.json"
+MAX_SAMPLES = 30
+# Journals read at startup, newest first, and the carrier events kept from
+# them: a jump cycle is a request and a jump, so this fills every phase.
+MAX_JOURNALS = 20
+MAX_EVENTS = 3 * MAX_SAMPLES
+_CARRIER_EVENTS = frozenset({b"CarrierJump", b"CarrierJumpRequest", b"CarrierJumpCancelled"})
+
+# Used until a phase has samples. They add up to the old flat 1320 s a jump.
+DEFAULTS = {"timer": 900.0, "transit": 60.0, "cooldown": 360.0, "restock": 0.0}
+# Samples outside these bounds aren't part of a route (the carrier sat
+# between jumps, or the journal skipped a beat) and are ignored.
+BOUNDS = {
+    "timer": (60.0, 3600.0),
+    "transit": (1.0, 600.0),
+    "cooldown": (1.0, 1800.0),
+    "restock": (1.0, 900.0),
+}
+
+
+class EtaEstimator:
+    """Learns jump phase durations and turns them into completion times."""
+
+    __slots__ = ["samples", "restock_offset", "plot_time", "journals_read", "_request", "_last_jump", "_lock",
+                 "_learner"]
+
+    def __init__(self, restock_offset: float = 0.0, plot_time: float = 0.0) -> None:
+        self.samples: Dict[str, Deque[float]] = {phase: deque(maxlen=MAX_SAMPLES) for phase in DEFAULTS}
+        # Seconds into the cooldown the restock starts, and plotting takes.
+        self.restock_offset = restock_offset
+        self.plot_time = plot_time
+        self.journals_read = 0
+        # The pending request's (timestamp, departure) and the last jump's time.
+        self._request: Optional[Tuple[float, float]] = None
+        self._last_jump: Optional[float] = None
+        self._lock = threading.Lock()
+        self._learner: Optional[threading.Thread] = None
+
+    def add_sample(self, phase: str, seconds: float) -> None:
+        low, high = BOUNDS[phase]
+        if low <= seconds <= high:
+            with self._lock:
+                self.samples[phase].append(seconds)
+
+    def observe(self, event: JournalEvent) -> None:
+        """Feed a journal event, in journal order."""
+        if isinstance(event, CarrierJumpRequest):
+            requested = journal_time(event.timestamp)
+            departure = journal_time(event.departure_time)
+            if requested is None or departure is None:
+                return
+            if self._last_jump is not None:
+                self.add_sample("cooldown", requested - self._last_jump)
+                self._last_jump = None
+            self._request = (requested, departure)
+        elif isinstance(event, CarrierJumpCancelled):
+            self._request = None
+        elif isinstance(event, CarrierJump):
+            jumped = journal_time(event.timestamp)
+            if jumped is None:
+                return
+            if self._request is not None:
+                requested, departure = self._request
+                self.add_sample("timer", departure - requested)
+                self.add_sample("transit", jumped - departure)
+                self._request = None
+            self._last_jump = jumped
+
+    def learn_from_journals(
+        self,
+        journal_dir: Path,
+        max_journals: int = MAX_JOURNALS,
+        max_events: int = MAX_EVENTS,
+        before: Optional[float] = None,
+    ) -> int:
+        """Learn from the newest carrier events in the journals. Returns how many journals were read.
+
+        Journals are read backwards through a memory map, newest first, and
+        only carrier events are decoded, so a huge journal costs neither
+        memory nor a full parse. Events at or after `before` (Unix time) are
+        left to observe(). The samples found are added ahead of any observed
+        since, which is why this is safe to run alongside the route.
+        """
+        try:
+            journals = get_locator(journal_dir).journals()[:max_journals]
+        except OSError:
+            return 0
+        events = []
+        read = 0
+        for path in journals:
+            if len(events) >= max_events:
+                break
+            try:
+                for line in reverse_lines(path):
+                    if event_name(line) not in _CARRIER_EVENTS:
+                        continue
+                    event = decode_event(line)
+                    if event is None:
+                        continue
+                    if before is not None and (journal_time(event.timestamp) or 0.0) >= before:
+                        continue
+                    events.append(event)
+                    if len(events) >= max_events:
+                        break
+            except OSError:
+                continue
+            read += 1
+
+        # Replayed oldest first into a scratch estimator, so the pending
+        # request and last jump observe() tracks are left alone.
+        history = EtaEstimator()
+        for event in reversed(events):
+            history.observe(event)
+        with self._lock:
+            for phase, samples in history.samples.items():
+                learned = self.samples[phase]
+                merged = list(samples) + list(learned)
+                learned.clear()
+                learned.extend(merged)
+            self.journals_read = read
+        return read
+
+    def start_learning(self, journal_dir: Path, before: Optional[float] = None) -> None:
+        """Run learn_from_journals on a background thread; see wait_learning."""
+        self._learner = threading.Thread(
+            target=self.learn_from_journals,
+            args=(journal_dir,),
+            kwargs={"before": before},
+            name="eta-journals",
+            daemon=True,
+        )
+        self._learner.start()
+
+    def wait_learning(self, timeout: Optional[float] = None) -> bool:
+        """Wait for start_learning's journals. False if they are still being read."""
+        if self._learner is None:
+            return True
+        self._learner.join(timeout)
+        return not self._learner.is_alive()
+
+    def load(self, path: Path = HISTORY_PATH) -> None:
+        try:
+            history = json.loads(path.read_text(encoding="utf-8"))
+            restocks = [float(seconds) for seconds in history.get("restock", [])]
+        except (OSError, ValueError, TypeError, AttributeError):
+            return
+        for seconds in restocks:
+            self.add_sample("restock", seconds)
+
+    def save(self, path: Path = HISTORY_PATH) -> None:
+        with self._lock:
+            history = {"restock": list(self.samples["restock"])}
+        try:
+            path.write_text(json.dumps(history), encoding="utf-8")
+        except OSError:
+            pass
+
+    def phase(self, phase: str) -> float:
+        with self._lock:
+            samples = list(self.samples[phase])
+        return statistics.median(samples) if samples else DEFAULTS[phase]
+
+    def cooldown(self) -> float:
+        """Jump to next request, at least as long as a restock and the plot after it."""
+        restock = self.phase("restock")
+        floor = self.restock_offset + restock + self.plot_time if restock else 0.0
+        return max(self.phase("cooldown"), floor)
+
+    def cycle(self) -> float:
+        """Seconds from one jump request to the next."""
+        return self.phase("timer") + self.phase("transit") + self.cooldown()
+
+    def route_eta(self, now: datetime.datetime, jumps: int) -> datetime.datetime:
+        """When the last of `jumps` jumps lands, plotting the first one now."""
+        if jumps <= 0:
+            return now
+        seconds = self.plot_time + jumps * (self.phase("timer") + self.phase("transit"))
+        seconds += (jumps - 1) * self.cooldown()
+        return now + datetime.timedelta(seconds=seconds)
+
+    def eta_after_departure(self, departure: datetime.datetime, jumps_after: int) -> datetime.datetime:
+        """When the route ends, given the current jump's departure and the jumps after it."""
+        seconds = self.phase("transit") + max(0, jumps_after) * self.cycle()
+        return departure + datetime.timedelta(seconds=seconds)
+
+    def describe(self) -> str:
+        def part(phase: str, seconds: float) -> str:
+            count = len(self.samples[phase])
+            minutes, secs = divmod(round(seconds), 60)
+            return f"{phase} {minutes}m{secs:02d}s" + (f" ({count})" if count else " (default)")
+
+        return ", ".join([
+            part("timer", self.phase("timer")),
+            part("transit", self.phase("transit")),
+            part("cooldown", self.cooldown()),
+            part("restock", self.phase("restock")),
+        ])
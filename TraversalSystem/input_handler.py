@@ -1,7 +1,8 @@
 """Cross-platform keyboard and mouse input abstraction.
 
 Uses pydirectinput on Windows (for DirectInput game compatibility)
-and pynput on Linux/macOS.
+and pynput on Linux/macOS. A different backend (e.g. the simulated game in
+simulation.py) can be installed with set_backend().
 """
 from __future__ import annotations
 
@@ -11,19 +12,33 @@ from typing import Optional
 
 IS_WINDOWS = sys.platform == "win32"
 
-if IS_WINDOWS:
-    import pydirectinput
-    # Disable pyautogui failsafe for pydirectinput as well
-    pydirectinput.FAILSAFE = False
-else:
+# The OS input libraries are imported on first use, so runs that never send
+# input (or that use another backend) don't pay for loading them.
+pydirectinput = None
+_keyboard = None
+_mouse = None
+Key = None
+Button = None
+_SPECIAL_KEYS: dict = {}
+
+
+def _load_os_input() -> None:
+    global pydirectinput, _keyboard, _mouse, Key, Button
+    if IS_WINDOWS:
+        if pydirectinput is None:
+            import pydirectinput as _pydirectinput
+            # Disable pyautogui failsafe for pydirectinput as well
+            _pydirectinput.FAILSAFE = False
+            pydirectinput = _pydirectinput
+        return
+    if _keyboard is not None:
+        return
+
     from pynput.keyboard import Key, Controller as KeyboardController
     from pynput.mouse import Button, Controller as MouseController
-    
-    _keyboard = KeyboardController()
-    _mouse = MouseController()
-    
+
     # Map common key names to pynput Key objects
-    _SPECIAL_KEYS = {
+    _SPECIAL_KEYS.update({
         "space": Key.space,
         "enter": Key.enter,
         "return": Key.enter,
@@ -64,7 +79,19 @@ else:
         "win": Key.cmd,
         "command": Key.cmd,
         "menu": Key.menu,
-    }
+    })
+    _keyboard = KeyboardController()
+    _mouse = MouseController()
+
+
+# Replacement backend with the same functions as this module, or None.
+_backend = None
+
+
+def set_backend(backend) -> None:
+    """Route all input to `backend` instead of the OS. None restores the OS input."""
+    global _backend
+    _backend = backend
 
 
 def _get_key(key: str):
@@ -78,6 +105,9 @@ def _get_key(key: str):
 
 def press(key: str) -> None:
     """Press and release a key."""
+    if _backend is not None:
+        return _backend.press(key)
+    _load_os_input()
     if IS_WINDOWS:
         pydirectinput.press(key)
     else:
@@ -89,6 +119,9 @@ def press(key: str) -> None:
 
 def keyDown(key: str) -> None:
     """Press and hold a key."""
+    if _backend is not None:
+        return _backend.keyDown(key)
+    _load_os_input()
     if IS_WINDOWS:
         pydirectinput.keyDown(key)
     else:
@@ -98,6 +131,9 @@ def keyDown(key: str) -> None:
 
 def keyUp(key: str) -> None:
     """Release a key."""
+    if _backend is not None:
+        return _backend.keyUp(key)
+    _load_os_input()
     if IS_WINDOWS:
         pydirectinput.keyUp(key)
     else:
@@ -107,8 +143,12 @@ def keyUp(key: str) -> None:
 
 def click(x: Optional[int] = None, y: Optional[int] = None, button: str = "left") -> None:
     """Click the mouse at the specified position or current position."""
+    if _backend is not None:
+        return _backend.click(x, y, button)
+    _load_os_input()
     if IS_WINDOWS:
         import pyautogui
+        pyautogui.FAILSAFE = False
         if x is not None and y is not None:
             pyautogui.click(x, y)
         else:
@@ -122,8 +162,12 @@ def click(x: Optional[int] = None, y: Optional[int] = None, button: str = "left"
 
 def moveTo(x: int, y: int) -> None:
     """Move the mouse to the specified position."""
+    if _backend is not None:
+        return _backend.moveTo(x, y)
+    _load_os_input()
     if IS_WINDOWS:
         import pyautogui
+        pyautogui.FAILSAFE = False
         pyautogui.moveTo(x, y)
     else:
         _mouse.position = (x, y)
@@ -131,6 +175,9 @@ def moveTo(x: int, y: int) -> None:
 
 def typewrite(text: str, interval: float = 0.0) -> None:
     """Type text character by character."""
+    if _backend is not None:
+        return _backend.typewrite(text, interval)
+    _load_os_input()
     if IS_WINDOWS:
         pydirectinput.typewrite(text, interval=interval)
     else:
@@ -139,3 +186,11 @@ def typewrite(text: str, interval: float = 0.0) -> None:
             _keyboard.release(char)
             if interval > 0:
                 time.sleep(interval)
+
+
+def copy(text: str) -> None:
+    """Put text on the clipboard."""
+    if _backend is not None:
+        return _backend.copy(text)
+    import pyperclip
+    pyperclip.copy(text)
@@ -0,0 +1,162 @@
+"""Runs input steps against a monotonic timeline and measures them.
+
+Every step is given a planned time up front: the previous step's planned
+time plus its wait and a bounded random jitter. The executor sleeps until
+each planned time rather than for each delay, so the time a keypress itself
+takes doesn't pile up over a sequence. Every key event is recorded with its
+planned and actual time, so sequences can be shortened with data to back it.
+"""
+from __future__ import annotations
+
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+from buttonsequence import Copy, Hold, KeyDown, KeyUp, Move, Press, Step, Wait
+from clock import SYSTEM_CLOCK
+import input_handler
+
+# Upper bound of the random delay added to every wait, in seconds.
+DEFAULT_JITTER = 0.5
+
+
+@dataclass(slots=True)
+class InputEvent:
+    sequence: str
+    action: str
+    planned: float
+    actual: float
+
+    @property
+    def lateness(self) -> float:
+        return self.actual - self.planned
+
+
+@dataclass(slots=True)
+class InputRun:
+    sequence: str
+    start: float
+    planned_end: float
+    end: float = 0.0
+    events: List[InputEvent] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def summary(self) -> str:
+        worst = max((event.lateness for event in self.events), default=0.0)
+        return (
+            f"{self.sequence}: {len(self.events)} inputs in {self.duration:.2f}s "
+            f"(planned {self.planned_end - self.start:.2f}s, worst lateness {worst * 1000:.0f} ms)"
+        )
+
+
+@dataclass(slots=True)
+class InputStats:
+    runs: int = 0
+    events: int = 0
+    planned: float = 0.0
+    actual: float = 0.0
+    worst_lateness: float = 0.0
+    worst_sequence: str = ""
+    total_lateness: float = 0.0
+
+    def add(self, run: InputRun) -> None:
+        self.runs += 1
+        self.events += len(run.events)
+        self.planned += run.planned_end - run.start
+        self.actual += run.duration
+        for event in run.events:
+            self.total_lateness += event.lateness
+            if event.lateness > self.worst_lateness:
+                self.worst_lateness = event.lateness
+                self.worst_sequence = event.sequence
+
+    def __str__(self) -> str:
+        mean = self.total_lateness / self.events if self.events else 0.0
+        return (
+            f"{self.events} inputs over {self.runs} sequences, {self.actual:.1f}s "
+            f"(planned {self.planned:.1f}s), lateness mean {mean * 1000:.1f} ms, "
+            f"worst {self.worst_lateness * 1000:.0f} ms ({self.worst_sequence or '-'})"
+        )
+
+
+class InputExecutor:
+    """Sends input steps on schedule through input_handler."""
+
+    __slots__ = ["clock", "jitter", "stats", "keep_runs", "runs", "_random", "_lock"]
+
+    def __init__(
+        self,
+        clock=SYSTEM_CLOCK,
+        jitter: float = DEFAULT_JITTER,
+        seed: Optional[int] = None,
+        keep_runs: int = 50,
+    ) -> None:
+        self.clock = clock
+        self.jitter = max(0.0, jitter)
+        self.stats = InputStats()
+        self.keep_runs = keep_runs
+        # The most recent runs, newest last, with every event's timing.
+        self.runs: List[InputRun] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self, base: float) -> float:
+        """`base` seconds plus the random jitter."""
+        return base + (self._random.uniform(0.0, self.jitter) if self.jitter else 0.0)
+
+    def mean_delay(self, base: float = 0.0) -> float:
+        """Average of delay(base), for estimating how long steps take."""
+        return base + self.jitter / 2
+
+    def wait(self, base: float) -> None:
+        """A jittered pause outside any step list."""
+        self.clock.sleep(self.delay(base))
+
+    def run(self, steps: Iterable[Step], sequence: str = "steps") -> InputRun:
+        clock = self.clock
+        start = clock.monotonic()
+        run = InputRun(sequence, start, start)
+        planned = start
+
+        def fire(action: str, send) -> None:
+            now = clock.monotonic()
+            if planned > now:
+                clock.sleep(planned - now)
+            actual = clock.monotonic()
+            send()
+            run.events.append(InputEvent(sequence, action, planned, actual))
+
+        for step in steps:
+            if isinstance(step, Wait):
+                planned += self.delay(step.seconds)
+            elif isinstance(step, Press):
+                fire(f"press {step.key}", lambda: input_handler.press(step.key))
+            elif isinstance(step, Hold):
+                fire(f"keyDown {step.key}", lambda: input_handler.keyDown(step.key))
+                planned += self.delay(step.seconds)
+                fire(f"keyUp {step.key}", lambda: input_handler.keyUp(step.key))
+            elif isinstance(step, KeyDown):
+                fire(f"keyDown {step.key}", lambda: input_handler.keyDown(step.key))
+            elif isinstance(step, KeyUp):
+                fire(f"keyUp {step.key}", lambda: input_handler.keyUp(step.key))
+            elif isinstance(step, Move):
+                fire(f"moveTo {step.x},{step.y}", lambda: input_handler.moveTo(step.x, step.y))
+            elif isinstance(step, Copy):
+                fire("copy", lambda: input_handler.copy(step.text))
+
+        # A trailing wait still has to pass before the next input.
+        now = clock.monotonic()
+        if planned > now:
+            clock.sleep(planned - now)
+        run.planned_end = planned
+        run.end = clock.monotonic()
+
+        with self._lock:
+            self.stats.add(run)
+            self.runs.append(run)
+            del self.runs[:-self.keep_runs]
+        return run
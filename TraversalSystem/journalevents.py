@@ -0,0 +1,127 @@
+"""Decoding of the journal events CTS acts on.
+
+Most of a journal is events CTS never looks at (music, scans, chat...), so
+lines are first filtered on the raw ``"event":"..."`` bytes and only the
+handful of carrier events are parsed. Parsing uses orjson or msgspec when one
+is installed and the standard library otherwise.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+from dataclasses import dataclass
+from typing import Callable, FrozenSet, Optional, Union
+
+try:
+    import orjson
+
+    _loads: Callable[[bytes], dict] = orjson.loads
+    DECODER_NAME = "orjson"
+    _DECODE_ERRORS: tuple = (orjson.JSONDecodeError,)
+except ImportError:
+    try:
+        import msgspec
+
+        _loads = msgspec.json.Decoder().decode
+        DECODER_NAME = "msgspec"
+        _DECODE_ERRORS = (msgspec.DecodeError,)
+    except ImportError:
+        _loads = json.loads
+        DECODER_NAME = "json"
+        _DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError)
+
+
+@dataclass(slots=True)
+class CarrierJumpRequest:
+    timestamp: str
+    system_name: str
+    departure_time: str
+    body: str = ""
+
+
+@dataclass(slots=True)
+class CarrierJumpCancelled:
+    timestamp: str
+
+
+@dataclass(slots=True)
+class CarrierJump:
+    timestamp: str
+    star_system: str
+
+
+@dataclass(slots=True)
+class CarrierStats:
+    timestamp: str
+    fuel_level: int
+
+
+JournalEvent = Union[CarrierJumpRequest, CarrierJumpCancelled, CarrierJump, CarrierStats]
+
+
+def _carrier_jump_request(event: dict) -> CarrierJumpRequest:
+    return CarrierJumpRequest(
+        event.get("timestamp", ""),
+        event["SystemName"],
+        event["DepartureTime"],
+        event.get("Body", ""),
+    )
+
+
+def _carrier_jump_cancelled(event: dict) -> CarrierJumpCancelled:
+    return CarrierJumpCancelled(event.get("timestamp", ""))
+
+
+def _carrier_jump(event: dict) -> CarrierJump:
+    return CarrierJump(event.get("timestamp", ""), event.get("StarSystem", ""))
+
+
+def _carrier_stats(event: dict) -> CarrierStats:
+    return CarrierStats(event.get("timestamp", ""), int(event["FuelLevel"]))
+
+
+_BUILDERS = {
+    b"CarrierJumpRequest": _carrier_jump_request,
+    b"CarrierJumpCancelled": _carrier_jump_cancelled,
+    b"CarrierJump": _carrier_jump,
+    b"CarrierStats": _carrier_stats,
+}
+HANDLED_EVENTS: FrozenSet[bytes] = frozenset(_BUILDERS)
+
+_EVENT_KEY = b'"event"'
+JOURNAL_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def event_name(line: bytes) -> Optional[bytes]:
+    """The raw value of the "event" field, found without parsing the line."""
+    start = line.find(_EVENT_KEY)
+    if start < 0:
+        return None
+    start = line.find(b'"', start + len(_EVENT_KEY))
+    if start < 0:
+        return None
+    end = line.find(b'"', start + 1)
+    if end < 0:
+        return None
+    return line[start + 1:end]
+
+
+def journal_time(stamp: str) -> Optional[float]:
+    """A journal timestamp (or DepartureTime) as a Unix time; None if it doesn't parse."""
+    try:
+        return datetime.datetime.strptime(stamp, JOURNAL_TIME_FORMAT).replace(
+            tzinfo=datetime.timezone.utc
+        ).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def decode_event(line: bytes) -> Optional[JournalEvent]:
+    """Decode one journal line into a typed event, or None if CTS ignores it."""
+    builder = _BUILDERS.get(event_name(line))
+    if builder is None:
+        return None
+    try:
+        return builder(_loads(line))
+    except (KeyError, TypeError, ValueError, *_DECODE_ERRORS):
+        return None
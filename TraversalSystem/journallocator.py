@@ -0,0 +1,133 @@
+"""Index of the journal files in the journal directory.
+
+Elite names its journals after the session start time, either
+``Journal.2024-01-31T201530.01.log`` or the older ``Journal.240131201530.01.log``,
+so the newest journal can be found from the file names alone. The index is
+built once per directory, kept in memory and only rescanned when the
+directory itself changes.
+"""
+from __future__ import annotations
+
+import bisect
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_JOURNAL_NAME = re.compile(
+    r"^Journal(?:Beta)?\.(?:(\d{4})-(\d{2})-(\d{2})T(\d{6})|(\d{12}))\.(\d+)\.log$"
+)
+
+JournalKey = Tuple[str, int, str]
+
+
+def journal_sort_key(name: str, directory: Optional[Path] = None) -> Optional[JournalKey]:
+    """Sort key for a journal file name, or None if it isn't a journal."""
+    if not name.startswith("Journal"):
+        return None
+
+    match = _JOURNAL_NAME.match(name)
+    if match:
+        year, month, day, clock, legacy, part = match.groups()
+        stamp = f"{year}{month}{day}{clock}" if legacy is None else f"20{legacy}"
+        return stamp, int(part), name
+
+    # Unrecognised journal naming: fall back to the modification time.
+    if directory is None:
+        return None
+    try:
+        mtime = (directory / name).stat().st_mtime
+    except OSError:
+        return None
+    return f"{mtime:020.6f}", 0, name
+
+
+class JournalLocator:
+    """Keeps the journals of one directory sorted by their session time."""
+
+    __slots__ = ["directory", "_keys", "_names", "_dir_mtime", "_lock"]
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory).expanduser()
+        self._keys: List[JournalKey] = []
+        self._names: Dict[str, JournalKey] = {}
+        self._dir_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Rescan the directory if it changed since the last scan.
+
+        Returns True if the newest journal changed.
+        """
+        try:
+            dir_mtime = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Journal directory not found: {self.directory}") from None
+
+        with self._lock:
+            if dir_mtime == self._dir_mtime:
+                return False
+
+            previous = self._keys[-1] if self._keys else None
+            with os.scandir(self.directory) as entries:
+                present = {entry.name for entry in entries if entry.name.startswith("Journal")}
+
+            for name in set(self._names) - present:
+                self._keys.remove(self._names.pop(name))
+            for name in present - set(self._names):
+                self._insert(name)
+
+            self._dir_mtime = dir_mtime
+            return (self._keys[-1] if self._keys else None) != previous
+
+    def add(self, name: str) -> bool:
+        """Record a journal reported by the file watcher without rescanning.
+
+        Returns True if it is now the newest journal.
+        """
+        with self._lock:
+            if name in self._names or not (self.directory / name).is_file():
+                return False
+            key = self._insert(name)
+            return key is not None and self._keys[-1] == key
+
+    def latest(self) -> Path:
+        """The newest journal, refreshing the index first if it is stale."""
+        self.refresh()
+        with self._lock:
+            if not self._keys:
+                raise FileNotFoundError(f"No journal files found in {self.directory}")
+            return self.directory / self._keys[-1][2]
+
+    def journals(self, newest_first: bool = True) -> List[Path]:
+        """All indexed journals in session order."""
+        self.refresh()
+        with self._lock:
+            keys = reversed(self._keys) if newest_first else iter(self._keys)
+            return [self.directory / key[2] for key in keys]
+
+    def _insert(self, name: str) -> Optional[JournalKey]:
+        key = journal_sort_key(name, self.directory)
+        if key is None:
+            return None
+        self._names[name] = key
+        bisect.insort(self._keys, key)
+        return key
+
+
+_locators: Dict[Path, JournalLocator] = {}
+_locators_lock = threading.Lock()
+
+
+def get_locator(journal_dir: Path) -> JournalLocator:
+    """The shared locator for `journal_dir`, created on first use."""
+    directory = Path(journal_dir).expanduser()
+    with _locators_lock:
+        locator = _locators.get(directory)
+        if locator is None:
+            if not directory.is_dir():
+                raise FileNotFoundError(f"Journal directory not found: {directory}")
+            locator = JournalLocator(directory)
+            _locators[directory] = locator
+        return locator
@@ -0,0 +1,162 @@
+"""Change notification for the journal directory.
+
+On Linux the journal thread blocks on inotify and only wakes when the game
+writes to the journal directory. Everywhere else (and whenever inotify cannot
+be set up) it falls back to the fixed one second poll CTS has always used.
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+from pathlib import Path
+from typing import Optional, Set
+
+from platform_utils import IS_LINUX
+
+WATCH_MODES = ("auto", "inotify", "poll")
+POLL_INTERVAL = 1.0
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+
+class PollingNotifier:
+    """Wakes up every `interval` seconds whether or not anything changed."""
+
+    __slots__ = ["interval", "_closed"]
+
+    def __init__(self, interval: float = POLL_INTERVAL) -> None:
+        self.interval = interval
+        self._closed = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Set[str]]:
+        """Block until the next poll. Returns None: the caller must check everything."""
+        self._closed.wait(self.interval if timeout is None else min(timeout, self.interval))
+        return None
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+class InotifyNotifier:
+    """Blocks on inotify until a file in `directory` is created or written."""
+
+    __slots__ = ["directory", "_fd", "_wake_r", "_wake_w", "_closed", "_waiting", "_lock"]
+
+    def __init__(self, directory: Path) -> None:
+        if not IS_LINUX:
+            raise OSError("inotify is only available on Linux")
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.directory = Path(directory)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(str(self.directory)), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed on {self.directory}: {os.strerror(errno)}")
+
+        self._wake_r, self._wake_w = os.pipe()
+        self._closed = False
+        # The descriptors are released by whichever of close() and wait()
+        # comes last, never while wait() is using them.
+        self._waiting = False
+        self._lock = threading.Lock()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Set[str]]:
+        """Block until the directory changes.
+
+        Returns the names of the files that were touched, an empty set on
+        timeout, or None if the kernel queue overflowed and events were lost.
+        """
+        with self._lock:
+            if self._closed:
+                return set()
+            self._waiting = True
+        try:
+            ready, _, _ = select.select([self._fd, self._wake_r], [], [], timeout)
+            if self._fd not in ready or self._closed:
+                return set()
+            return self._read_events()
+        finally:
+            with self._lock:
+                self._waiting = False
+                if self._closed:
+                    self._release()
+
+    def _read_events(self) -> Optional[Set[str]]:
+        names: Set[str] = set()
+        overflowed = False
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buffer:
+                break
+
+            pos = 0
+            while pos + _EVENT_HEADER.size <= len(buffer):
+                _, mask, _, name_len = _EVENT_HEADER.unpack_from(buffer, pos)
+                pos += _EVENT_HEADER.size
+                name = buffer[pos:pos + name_len].rstrip(b"\0")
+                pos += name_len
+
+                if mask & IN_Q_OVERFLOW:
+                    overflowed = True
+                elif name:
+                    names.add(os.fsdecode(name))
+
+        return None if overflowed else names
+
+    def close(self) -> None:
+        """Release the descriptors, or wake the waiting thread to release them on its way out."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._waiting:
+                os.write(self._wake_w, b"\0")
+            else:
+                self._release()
+
+    def _release(self) -> None:
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fd = self._wake_r = self._wake_w = -1
+
+
+def create_notifier(directory: Path, mode: str = "auto"):
+    """Create the notifier for `mode` ("auto", "inotify" or "poll")."""
+    if mode not in WATCH_MODES:
+        print(f"Unknown journal watch mode '{mode}', falling back to polling")
+        return PollingNotifier()
+
+    if mode == "poll" or (mode == "auto" and not IS_LINUX):
+        return PollingNotifier()
+
+    try:
+        return InotifyNotifier(directory)
+    except (OSError, AttributeError) as exc:
+        print(f"inotify unavailable ({exc}), falling back to polling")
+        return PollingNotifier()
@@ -0,0 +1,227 @@
+"""Replay recorded journals into a scratch journal directory.
+
+Reproduces a game session without the game: lines from recorded
+``Journal.*.log`` files are appended to fresh journals in a temporary
+directory, one file per source so rotation happens as it did in the session.
+A JournalWatcher follows the directory the same way the traversal does and
+the replay reports how fast events were processed and how long each one took
+to be picked up after it was written.
+
+    python journalreplay.py --speed 60 "~/Saved Games/.../Journal.2024-01-31T201530.01.log" ...
+
+``--speed 1`` replays in real time, ``--speed N`` N times faster and
+``--speed 0`` (the default) as fast as possible.
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import datetime
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, Iterable, List, Optional
+
+from journalevents import decode_event
+from journallocator import get_locator, journal_sort_key
+from journalnotifier import create_notifier
+from journalwatcher import JournalWatcher, watch_journal
+
+_TIMESTAMP = re.compile(rb'"timestamp"\s*:\s*"([0-9T:\-]+)Z"')
+_FILEHEADER = (
+    b'{ "timestamp":"%s", "event":"Fileheader", "part":1, "language":"English/UK", '
+    b'"Odyssey":true, "gameversion":"4.0.0.1904", "build":"r303000/r0 " }\r\n'
+)
+
+
+@dataclass(slots=True)
+class ReplayReport:
+    lines: int = 0
+    events: int = 0
+    detected: int = 0
+    files: int = 0
+    elapsed: float = 0.0
+    lags: List[float] = field(default_factory=list)
+
+    @property
+    def events_per_second(self) -> float:
+        return self.detected / self.elapsed if self.elapsed else 0.0
+
+    def lag_percentile(self, percent: float) -> float:
+        if not self.lags:
+            return 0.0
+        ordered = sorted(self.lags)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def summary(self) -> str:
+        return (
+            f"Replayed {self.lines} lines from {self.files} journal(s) in {self.elapsed:.2f}s\n"
+            f"Carrier events: {self.detected}/{self.events} detected "
+            f"({self.events_per_second:.1f} events/s, {self.lines / self.elapsed if self.elapsed else 0:.0f} lines/s)\n"
+            f"Append-to-detection lag: p50 {self.lag_percentile(50) * 1000:.1f} ms, "
+            f"p95 {self.lag_percentile(95) * 1000:.1f} ms, max {max(self.lags, default=0) * 1000:.1f} ms"
+        )
+
+
+def _line_time(line: bytes) -> Optional[float]:
+    match = _TIMESTAMP.search(line)
+    if match is None:
+        return None
+    stamp = datetime.datetime.strptime(match.group(1).decode(), "%Y-%m-%dT%H:%M:%S")
+    return stamp.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+class JournalReplayer:
+    """Appends recorded journal lines to `target_dir`, paced by their timestamps."""
+
+    __slots__ = ["sources", "target_dir", "speed", "written", "_pending", "_pending_lock"]
+
+    def __init__(self, sources: Iterable[Path], target_dir: Path, speed: float = 0.0) -> None:
+        self.sources = sorted(
+            (Path(source).expanduser() for source in sources),
+            key=lambda path: journal_sort_key(path.name) or ("", 0, path.name),
+        )
+        self.target_dir = Path(target_dir)
+        self.speed = speed
+        self.written = 0
+        # Append times of the carrier events not yet seen by the watcher.
+        self._pending: Deque[float] = collections.deque()
+        self._pending_lock = threading.Lock()
+
+    def target_for(self, source: Path) -> Path:
+        return self.target_dir / source.name
+
+    def create_first(self) -> Path:
+        """Create the first journal empty so a watcher can attach before the replay starts."""
+        first = self.target_for(self.sources[0])
+        first.touch()
+        return first
+
+    def run(self, stop: Optional[threading.Event] = None) -> ReplayReport:
+        report = ReplayReport()
+        start = time.monotonic()
+        first_line_time: Optional[float] = None
+
+        for source in self.sources:
+            if stop is not None and stop.is_set():
+                break
+            report.files += 1
+            with source.open("rb") as recorded, self.target_for(source).open("ab") as journal:
+                first = True
+                for line in recorded:
+                    if not line.strip():
+                        continue
+                    line_time = _line_time(line)
+
+                    if first and b'"Fileheader"' not in line:
+                        # open_game waits for a Fileheader; make sure every journal has one.
+                        stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(line_time or time.time()))
+                        journal.write(_FILEHEADER % stamp.encode())
+                        journal.flush()
+                    first = False
+
+                    if self.speed > 0 and line_time is not None:
+                        if first_line_time is None:
+                            first_line_time = line_time
+                        due = start + (line_time - first_line_time) / self.speed
+                        delay = due - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+
+                    if not line.endswith(b"\n"):
+                        line += b"\r\n"
+                    if decode_event(line.rstrip()) is not None:
+                        # Queued before the write so the watcher can never see
+                        # the event ahead of its timestamp.
+                        with self._pending_lock:
+                            self._pending.append(time.monotonic())
+                        report.events += 1
+                    journal.write(line)
+                    journal.flush()
+                    report.lines += 1
+                    self.written += 1
+
+        report.elapsed = time.monotonic() - start
+        return report
+
+    def detected(self) -> Optional[float]:
+        """Called when the watcher handles an event; returns its lag in seconds."""
+        with self._pending_lock:
+            if not self._pending:
+                return None
+            appended = self._pending.popleft()
+        return time.monotonic() - appended
+
+
+def replay_session(
+    sources: Iterable[Path],
+    speed: float = 0.0,
+    watch_mode: str = "auto",
+    target_dir: Optional[Path] = None,
+    on_event: Optional[Callable[[object], None]] = None,
+    settle: float = 2.0,
+) -> ReplayReport:
+    """Replay `sources` into `target_dir` (a temporary directory by default) under a live watcher."""
+    with tempfile.TemporaryDirectory(prefix="cts-replay-") as scratch:
+        directory = Path(target_dir or scratch)
+        directory.mkdir(parents=True, exist_ok=True)
+        replayer = JournalReplayer(sources, directory, speed)
+        if not replayer.sources:
+            raise ValueError("No journals to replay")
+        replayer.create_first()
+
+        lags: List[float] = []
+        watcher = JournalWatcher()
+
+        def listener(event) -> None:
+            lag = replayer.detected()
+            if lag is not None:
+                lags.append(lag)
+            if on_event is not None:
+                on_event(event)
+
+        watcher.add_listener(listener)
+
+        # Same path the traversal takes: locate the newest journal, then follow it.
+        journal = get_locator(directory).latest()
+        watcher.process_journal(journal)
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=watch_journal,
+            args=(watcher, journal, create_notifier(directory, watch_mode), get_locator(directory), stop, 0.5),
+            daemon=True,
+        )
+        thread.start()
+
+        report = replayer.run()
+        deadline = time.monotonic() + settle
+        while len(lags) < report.events and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stop.set()
+        thread.join(timeout=2)
+
+        report.detected = len(lags)
+        report.lags = lags
+        report.elapsed = max(report.elapsed, 1e-9)
+        return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded Elite Dangerous journals")
+    parser.add_argument("journals", nargs="+", type=Path, help="recorded Journal.*.log files")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="1 = real time, N = N times faster, 0 = as fast as possible")
+    parser.add_argument("--watch-mode", default="auto", choices=["auto", "inotify", "poll"])
+    parser.add_argument("--target-dir", type=Path, default=None,
+                        help="write the replayed journals here instead of a temporary directory")
+    args = parser.parse_args()
+
+    report = replay_session(args.journals, args.speed, args.watch_mode, args.target_dir)
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Where the carrier is, read backwards from the newest journals.
+
+Resuming without a checkpoint needs only the carrier's last few events: the
+last CarrierJump says where it is, and a CarrierJumpRequest after it (not
+cancelled) is a jump already scheduled. Journals are memory-mapped and walked
+from the end a line at a time, so only the tail of each file is paged in,
+and the scan stops at the newest CarrierJump however many journals the
+folder holds.
+"""
+from __future__ import annotations
+
+import mmap
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from journalevents import CarrierJump, CarrierJumpRequest, decode_event, event_name, journal_time
+from journallocator import get_locator
+
+# Journals looked at before giving up on finding a carrier jump.
+MAX_JOURNALS = 200
+_CARRIER_EVENTS = frozenset({b"CarrierJump", b"CarrierJumpRequest", b"CarrierJumpCancelled"})
+
+
+@dataclass(frozen=True, slots=True)
+class CarrierState:
+    """The carrier's last jump and the jump it has scheduled, if any."""
+    # Where the last jump landed, when, and that jump's departure (Unix times).
+    system: Optional[str] = None
+    jumped_at: Optional[float] = None
+    jump_departure: Optional[float] = None
+    # A jump requested since and not cancelled.
+    destination: Optional[str] = None
+    requested_at: Optional[float] = None
+    departure: Optional[float] = None
+    journals_read: int = 0
+
+    @property
+    def updated_at(self) -> Optional[float]:
+        """Time of the newest carrier event found."""
+        times = [time for time in (self.jumped_at, self.requested_at) if time is not None]
+        return max(times) if times else None
+
+
+def reverse_lines(path: Path) -> Iterator[bytes]:
+    """The lines of `path`, last first, read through a memory map."""
+    with path.open("rb") as journal:
+        try:
+            mapped = mmap.mmap(journal.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped.
+            return
+        with mapped:
+            end = len(mapped)
+            while end > 0:
+                start = mapped.rfind(b"\n", 0, end) + 1
+                line = mapped[start:end].strip()
+                if line:
+                    yield line
+                end = start - 1
+
+
+def scan_carrier_state(journal_dir: Path, max_journals: int = MAX_JOURNALS) -> CarrierState:
+    """Walk the newest journals backwards to the carrier's last jump and the request before it."""
+    try:
+        journals: List[Path] = get_locator(journal_dir).journals()[:max_journals]
+    except OSError:
+        return CarrierState()
+
+    # Newest first: the first request or cancellation decides whether a jump
+    # is pending, and the first jump is where the carrier is. The scan ends
+    # at the request that jump answered.
+    pending_decided = False
+    destination = requested_at = departure = None
+    jump: Optional[CarrierJump] = None
+    jump_journal = 0
+    read = 0
+    for path in journals:
+        if jump is not None and read > jump_journal:
+            # A game restart can put the request in the journal before the jump's, but no further back.
+            break
+        read += 1
+        try:
+            for line in reverse_lines(path):
+                if event_name(line) not in _CARRIER_EVENTS:
+                    continue
+                event = decode_event(line)
+                if event is None:
+                    continue
+                if jump is not None:
+                    if isinstance(event, CarrierJumpRequest):
+                        return CarrierState(
+                            jump.star_system or None, journal_time(jump.timestamp),
+                            journal_time(event.departure_time),
+                            destination, requested_at, departure, read,
+                        )
+                    if isinstance(event, CarrierJump):
+                        # The jump before it: no request between them.
+                        jump_journal = -1
+                        break
+                elif isinstance(event, CarrierJump):
+                    jump = event
+                    jump_journal = read
+                elif not pending_decided:
+                    pending_decided = True
+                    if isinstance(event, CarrierJumpRequest):
+                        destination = event.system_name
+                        requested_at = journal_time(event.timestamp)
+                        departure = journal_time(event.departure_time)
+        except OSError:
+            continue
+    if jump is None:
+        return CarrierState(None, None, None, destination, requested_at, departure, read)
+    return CarrierState(
+        jump.star_system or None, journal_time(jump.timestamp), None,
+        destination, requested_at, departure, read,
+    )
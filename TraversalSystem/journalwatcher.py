@@ -1,67 +1,172 @@
 from __future__ import annotations
 
-import json
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Deque, List, Optional, Tuple
+
+from clock import SYSTEM_CLOCK
+from journalevents import CarrierJump, CarrierJumpRequest, CarrierStats, JournalEvent, decode_event
+from journallocator import JournalLocator
+from profiler import PROFILER
+
+# Upper bound on an unterminated trailing line kept between polls. Journal
+# lines are a few KB at most, so anything larger is a corrupt write.
+MAX_PARTIAL_LINE = 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+# Handled events kept for wait_for_event. Carrier events are a few per jump.
+EVENT_HISTORY = 64
+
+
+@dataclass(frozen=True, slots=True)
+class JournalMark:
+    """A point in the journal, to wait for events written after it."""
+    event_seq: int
+    bytes_read: int
+
 
 class JournalWatcher:
-    __slots__ = ["firstRun", "lastJournalText", "lastCarrierRequest", "hasJumped", "departureTime", "lastFuel", "lastUsedFileName"]
-    
+    __slots__ = ["firstRun", "lastCarrierRequest", "hasJumped", "departureTime", "lastFuel", "lastUsedFileName",
+                 "_offset", "_partial", "_file_id", "_lock", "_changed", "_listeners",
+                 "_history", "_event_seq", "_bytes_read"]
+
     def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._listeners: List[Callable[[JournalEvent], None]] = []
+        self._history: Deque[Tuple[int, JournalEvent]] = deque(maxlen=EVENT_HISTORY)
+        # Both only ever grow, so marks stay valid across resets.
+        self._event_seq = 0
+        self._bytes_read = 0
+        self.lastUsedFileName = ""
         self.reset_all()
 
 
     def reset_all(self) -> None:
         self.firstRun = True
-        self.lastJournalText = ""
         self.lastCarrierRequest = ""
         self.hasJumped = False
         self.departureTime = ""
         self.lastFuel = 1000
+        self._offset = 0
+        self._partial = b""
+        self._file_id = None
+        self._history.clear()
 
 
+    @PROFILER.timed("process_journal")
     def process_journal(self, file_name) -> bool:
-        self.lastUsedFileName = str(file_name)
+        """Read the bytes appended to the journal since the last call.
+
+        On the first call the existing contents are skipped, so only events
+        written after CTS attached are acted on. Switching to another file,
+        truncation or the file being replaced starts reading from the top.
+        """
+        with self._lock:
+            if str(file_name) != self.lastUsedFileName and not self.firstRun:
+                self._offset = 0
+                self._partial = b""
+                self._file_id = None
+            self.lastUsedFileName = str(file_name)
+
+            journal_path = Path(file_name)
+            try:
+                with journal_path.open("rb") as journal:
+                    stat = os.fstat(journal.fileno())
+                    file_id = (stat.st_dev, stat.st_ino)
+
+                    if self.firstRun:
+                        self._offset = stat.st_size
+                        self._partial = b""
+                    elif file_id != self._file_id or stat.st_size < self._offset:
+                        # Rotated or truncated underneath us: start over.
+                        self._offset = 0
+                        self._partial = b""
+                    self._file_id = file_id
+
+                    if stat.st_size > self._offset:
+                        journal.seek(self._offset)
+                        while True:
+                            chunk = journal.read(READ_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            self._offset += len(chunk)
+                            self._bytes_read += len(chunk)
+                            self._consume(chunk)
+            except OSError:
+                print(f"Journal file not found: {journal_path}")
+                return False
+
+            self.firstRun = False
+            return True
+
+
+    def follow(self, file_name) -> bool:
+        """Switch to a journal the game has just started, reading it from the top.
+
+        Whatever is still unread in the current journal is processed first so
+        no event is lost at the boundary.
+        """
+        with self._lock:
+            if self.lastUsedFileName and not self.firstRun:
+                self.process_journal(self.lastUsedFileName)
+            self.lastUsedFileName = str(file_name)
+            self.firstRun = False
+            self._offset = 0
+            self._partial = b""
+            self._file_id = None
+            return self.process_journal(file_name)
+
+
+    def _consume(self, chunk: bytes) -> None:
+        data = self._partial + chunk
+        complete, _, self._partial = data.rpartition(b"\n")
+
+        if len(self._partial) > MAX_PARTIAL_LINE:
+            print("Discarding oversized journal line")
+            self._partial = b""
+
+        if not complete:
+            return
 
-        journal_path = Path(file_name)
-        if not journal_path.exists():
-            print(f"Journal file not found: {journal_path}")
-            return False
+        for raw_line in complete.split(b"\n"):
+            event = decode_event(raw_line)
+            if event is not None:
+                self._handle_event(event)
 
-        with journal_path.open("r", encoding="utf-8") as journal:
-            journalText = journal.read()
 
-        if journalText != self.lastJournalText and not self.firstRun:
-            newText = journalText.replace(self.lastJournalText, "").strip()
+    def _handle_event(self, event: JournalEvent) -> None:
+        if isinstance(event, CarrierJumpRequest):
+            destination = event.system_name
 
-            for line in newText.split("\n"):
-                try:
-                    event = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
+            self.lastCarrierRequest = destination
+            print("Carrier destination: " + destination)
+            self.departureTime = event.departure_time
+            print("Departure time: " + self.departureTime)
 
-                if event['event'] == "CarrierJumpRequest":
-                    destination = event['SystemName']
+        elif isinstance(event, CarrierStats):
+            fuel = event.fuel_level
+            print("Fuel: " + str(fuel))
 
-                    if not self.firstRun:
-                        self.lastCarrierRequest = destination
-                        print("Carrier destination: " + destination)
-                        self.departureTime = event['DepartureTime']
-                        print("Departure time: " + self.departureTime)
+            if fuel < self.lastFuel and fuel < 100:
+                print("alert:Your Tritium is running low.")
 
-                elif event['event'] == "CarrierStats":
-                    fuel = event['FuelLevel']
-                    print("Fuel: " + str(fuel)) 
+            self.lastFuel = fuel
+        elif isinstance(event, CarrierJump):
+            self.hasJumped = True
 
-                    if fuel < self.lastFuel and fuel < 100:
-                        print("alert:Your Tritium is running low.")
+        self._event_seq += 1
+        self._history.append((self._event_seq, event))
+        for listener in self._listeners:
+            listener(event)
+        self._changed.notify_all()
 
-                    self.lastFuel = fuel
-                elif event['event'] == "CarrierJump":
-                    self.hasJumped = True
 
-            self.lastJournalText = journalText
-        self.firstRun = False
-        return True
+    def add_listener(self, listener: Callable[[JournalEvent], None]) -> None:
+        """Call `listener` with every handled event, on the thread that read it."""
+        self._listeners.append(listener)
 
 
     def last_carrier_request(self) -> str:
@@ -76,3 +181,114 @@ class JournalWatcher:
     def get_jumped(self) -> bool:
         self.process_journal(self.lastUsedFileName)
         return self.hasJumped
+
+
+    def wait_for_jump(self, timeout: float, clock=SYSTEM_CLOCK) -> bool:
+        """Block until a CarrierJump is seen or `timeout` seconds pass on `clock`.
+
+        Wakes as soon as the journal thread processes the event instead of
+        sleeping out the whole interval.
+        """
+        deadline = clock.monotonic() + timeout
+        while True:
+            self.process_journal(self.lastUsedFileName)
+            with self._changed:
+                if self.hasJumped:
+                    return True
+                remaining = deadline - clock.monotonic()
+                if remaining <= 0:
+                    return False
+                clock.wait(self._changed, remaining)
+
+
+    def mark(self) -> JournalMark:
+        """The current position, for waiting on events that come after it."""
+        self.process_journal(self.lastUsedFileName)
+        with self._lock:
+            return JournalMark(self._event_seq, self._bytes_read)
+
+
+    def bytes_since(self, mark: JournalMark) -> int:
+        """Bytes the game has written to the journal since `mark`."""
+        with self._lock:
+            return self._bytes_read - mark.bytes_read
+
+
+    def wait_for_event(
+        self,
+        predicate: Callable[[JournalEvent], bool],
+        timeout: float,
+        since: Optional[JournalMark] = None,
+        clock=SYSTEM_CLOCK,
+    ) -> Optional[JournalEvent]:
+        """The first event after `since` that `predicate` accepts.
+
+        Returns as soon as the journal thread (or this call) reads a matching
+        event, or None once `timeout` seconds pass on `clock`. Without
+        `since`, every event still in the history counts.
+        """
+        after = since.event_seq if since is not None else 0
+        deadline = clock.monotonic() + timeout
+        while True:
+            self.process_journal(self.lastUsedFileName)
+            with self._changed:
+                for seq, event in self._history:
+                    if seq > after and predicate(event):
+                        return event
+                if self._history:
+                    after = max(after, self._history[-1][0])
+                remaining = deadline - clock.monotonic()
+                if remaining <= 0:
+                    return None
+                clock.wait(self._changed, remaining)
+
+
+def _newer_journal(locator: JournalLocator, current: Path, changed) -> Optional[Path]:
+    if changed:
+        for name in changed:
+            if name != current.name and name.startswith("Journal"):
+                locator.add(name)
+    newest = locator.latest()
+    return newest if newest != current else None
+
+
+def watch_journal(
+    journal_watcher: JournalWatcher,
+    journal_path: Path,
+    notifier,
+    locator: JournalLocator,
+    stop: threading.Event,
+    idle_timeout: float = 30.0,
+    on_switch: Optional[Callable[[Path], None]] = None,
+) -> bool:
+    """Feed `journal_path` to the watcher whenever `notifier` reports a write.
+
+    Follows the game onto new journals until `stop` is set. Returns False if
+    the journal or the journal folder could no longer be read.
+    """
+    current = Path(journal_path)
+    try:
+        changed = None
+        while not stop.is_set():
+            # None means the notifier can't tell what changed (polling or
+            # a lost inotify queue), so always look at the file.
+            if changed is None or not changed or current.name in changed:
+                if not journal_watcher.process_journal(current):
+                    return False
+
+            try:
+                newer = _newer_journal(locator, current, changed)
+            except OSError as exc:
+                print(f"Could not look for a newer journal: {exc}")
+                return False
+            if newer is not None:
+                print(f"Game started a new journal, following {newer.name}")
+                current = newer
+                if on_switch is not None:
+                    on_switch(newer)
+                journal_watcher.follow(newer)
+
+            changed = notifier.wait(idle_timeout)
+    finally:
+        notifier.close()
+    return True
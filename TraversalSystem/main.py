@@ -1,98 +1,72 @@
 from __future__ import annotations
 
+# First, so the startup timer starts before the heavy imports below.
+from startup import STARTUP
+
 import datetime
-import json
+import functools
 import os
-import random
 import threading
-import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, Tuple
-import urllib.error
-import urllib.request
-
-import psutil
-import pyautogui
-import pyperclip
-import pytz
-import tzlocal
-
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from buttonsequence import (
+    Copy,
+    KeyDown,
+    KeyUp,
+    Move,
+    Press,
+    SequenceError,
+    Step,
+    Wait,
+    get_library,
+    split_trailing_wait,
+    steps_duration,
+)
+from checkpoint import (
+    CHECKPOINT_PATH,
+    LEGACY_SAVE_NAME,
+    Checkpoint,
+    read_checkpoint,
+    route_hash,
+    write_checkpoint,
+)
+from clock import SYSTEM_CLOCK
 from config import BASE_DIR, TraversalOptions, load_settings
 from discordhandler import DiscordHandler
-from journalwatcher import JournalWatcher
+from eta import HISTORY_PATH, EtaEstimator
+from inputexecutor import InputExecutor
+from journallocator import get_locator
+from journalnotifier import create_notifier
+from journalevents import CarrierJumpCancelled, CarrierJumpRequest, JournalEvent
+from journalscan import scan_carrier_state
+from journalwatcher import JournalWatcher, watch_journal
+from profiler import PROFILER
 from reshandler import Reshandler
+from route import RouteQueue, load_route_queue
+from scheduler import StageScheduler
+from screencheck import ScreenVerifier, load_verifier
 from platform_utils import (
-    get_screen_resolution,
+    kill_game_launcher,
     open_steam_game,
     system_shutdown,
-    get_game_process_names,
     IS_WINDOWS,
 )
+from resolution import ResolutionProbe, start_resolution_probe
+from startup import StartupTimer
+from telemetry import DB_PATH, JumpRecord, TelemetryStore
+from versioncheck import start_version_check
 import input_handler
 
-# Get the screen resolution in a cross-platform manner
-screen_width, screen_height = get_screen_resolution()
-pyautogui.FAILSAFE = False
-
 SEQUENCE_DIR = BASE_DIR / "sequences"
-SAVE_PATH = BASE_DIR / "save.txt"
-
-
-def parse_version_tag(tag: str) -> int:
-    cleaned_tag = tag.strip().lstrip("vV")
-    parts = cleaned_tag.split(".")
-    if len(parts) != 3 or not all(part.isdigit() for part in parts):
-        raise ValueError(f"Invalid version tag: {tag}")
-    return int("".join(parts))
-
-
-GITHUB_REPO_OWNER = "congenial-acorn"
-GITHUB_REPO_NAME = "CATS"
-GITHUB_RELEASES_API = (
-    f"https://api.github.com/repos/{GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}/releases/latest"
-)
-LOCAL_VERSION_TAG = "v1.4.0"
-LOCAL_VERSION = parse_version_tag(LOCAL_VERSION_TAG)
-VERSION_CHECK_USER_AGENT = "CTS-Version-Check"
-
-
-def fetch_latest_release_version() -> Tuple[int, str]:
-    request = urllib.request.Request(
-        GITHUB_RELEASES_API,
-        headers={
-            "Accept": "application/vnd.github+json",
-            "User-Agent": VERSION_CHECK_USER_AGENT,
-        },
-    )
-    with urllib.request.urlopen(request, timeout=5) as response:
-        payload = json.load(response)
-
-    tag_name = payload.get("tag_name")
-    if not tag_name:
-        raise ValueError("No tag_name in GitHub release response.")
-
-    return parse_version_tag(tag_name), tag_name
-
-
-def warn_if_outdated() -> None:
-    try:
-        latest_version, latest_tag = fetch_latest_release_version()
-    except (urllib.error.URLError, ValueError, json.JSONDecodeError, TimeoutError) as exc:
-        print(f"Version check skipped: {exc}")
-        return
-    except Exception as exc:  # safeguard against unexpected errors
-        print(f"Version check skipped: {exc}")
-        return
-
-    if latest_version > LOCAL_VERSION:
-        print(
-            f"Update available. You are on {LOCAL_VERSION_TAG}, but the latest release is "
-            f"{latest_tag}. Please download the newest version from GitHub. "
-            f"https://github.com/congenial-acorn/CTS/releases/latest"
-        )
-        time.sleep(3)
-    
+# With inotify the journal thread only wakes on writes; this is the longest it
+# sleeps before re-checking the file anyway.
+JOURNAL_IDLE_TIMEOUT = 30.0
+# How long to wait for queued Discord messages to go out before exiting.
+DISCORD_FLUSH_TIMEOUT = 15.0
+# And for queued jump telemetry to be written after a critical error.
+TELEMETRY_FLUSH_TIMEOUT = 3.0
 
 
 @dataclass(slots=True)
@@ -103,187 +77,513 @@ class TraversalState:
     game_ready: bool = False
     stop_journal: threading.Event = field(default_factory=threading.Event)
     journal_thread: threading.Thread | None = None
+    journal_notifier: object | None = None
     route_complete: bool = False
+    phase: str = "starting"
+    on_phase: Callable[[str], None] | None = None
+    checkpoint_path: Path = CHECKPOINT_PATH
+    route_queue: RouteQueue | None = None
+    route_hash: str = ""
+    # The jump in flight, for the checkpoint.
+    destination: str | None = None
+    departure: datetime.datetime | None = None
+    jumped_at: float | None = None
+    restocked: bool = False
+    clock: object = SYSTEM_CLOCK
+    # Flushed by handle_critical_error, which exits without unwinding.
+    telemetry: TelemetryStore | None = None
+
+
+def set_phase(state: TraversalState, phase: str) -> None:
+    """Record the traversal moving into a new stage of the jump cycle."""
+    state.phase = phase
+    if state.route_queue is not None and phase != "complete":
+        save_checkpoint(state)
+    if phase == "plotting" and STARTUP.elapsed("first navigation") is None:
+        STARTUP.mark("first navigation")
+        print(STARTUP.report())
+    if state.on_phase is not None:
+        state.on_phase(phase)
+
+
+# Discord stage updates around a jump: seconds from departure (negative while
+# counting down), then the carrier and maintenance stage shown from then on.
+PRE_JUMP_STAGES = (
+    (-600, 1, 1),
+    (-200, 2, 2),
+    (-190, 2, 3),
+    (-144, 2, 4),
+    (-103, 2, 5),
+    (-90, 2, 6),
+    (-75, 2, 7),
+    (-60, 3, 7),
+    (-30, 4, 7),
+)
+JUMPING_STAGES = (
+    (22, 6, 7),
+    (42, 7, 7),
+)
+JUMP_CONFIRM_DELAY = 62
+# Nominal time from departure to the next plot, for the console countdown.
+NEXT_JUMP_AFTER_DEPARTURE = 362
+FINAL_JUMP_DURATION = 60
 
 
-def slight_random_time(base: float) -> float:
-    return random.random() + base
-
+@dataclass(frozen=True, slots=True)
+class CooldownPlan:
+    """Stages after the jump is confirmed, in seconds from the confirmation."""
 
-def load_route_list(route_file: Path) -> List[str]:
-    if route_file.suffix.lower() == ".csv":
-        return _load_carrier_csv(route_file)
+    stages: Tuple[Tuple[int, int, int], ...]
+    restock: float
+    end: float
 
-    content = route_file.read_text(encoding="utf-8").strip()
-    route = [line.strip() for line in content.splitlines() if line.strip()]
-    if not route:
-        raise ValueError("Route file is empty. Exiting...")
-    return route
 
+COOLDOWN_STAGES = CooldownPlan(stages=((149, 8, 8), (200, 8, 9)), restock=152, end=300)
+# With power saving the game has just been reopened, so less of the cooldown is left.
+POWER_SAVING_COOLDOWN_STAGES = CooldownPlan(stages=((1, 8, 8), (52, 8, 9)), restock=4, end=152)
 
-def _load_carrier_csv(route_file: Path) -> List[str]:
-    def extract_names(rows: Iterable[str]) -> List[str]:
-        systems: List[str] = []
-        for row in rows:
-            parts = row.split(",")
-            if not parts:
-                continue
-            name = parts[0].strip().strip('"')
-            if name and name.lower() != "system name":
-                systems.append(name)
-        return systems
 
-    lines = route_file.read_text(encoding="utf-8").splitlines()
-    route = extract_names(lines[1:])  # skip header if present
-    if not route:
-        raise ValueError("Route file is empty. Exiting...")
-    return route
+def schedule_stages(
+    scheduler: StageScheduler,
+    anchor: float,
+    stages: Iterable[Tuple[int, int, int]],
+    discord_messenger: DiscordHandler,
+    skip_missed: bool = False,
+) -> None:
+    """Schedule Discord stage updates at `anchor` plus each offset."""
+    for offset, carrier_stage, maintenance_stage in stages:
+        scheduler.at(
+            anchor + offset,
+            f"stage {carrier_stage}/{maintenance_stage}",
+            functools.partial(discord_messenger.update_fields, carrier_stage, maintenance_stage),
+            skip_missed=skip_missed,
+        )
 
 
-def latest_journal_path(journal_dir: Path) -> Path:
-    directory = journal_dir.expanduser()
-    if not directory.is_dir():
-        raise FileNotFoundError(f"Journal directory not found: {directory}")
-
-    files = [
-        p
-        for p in directory.iterdir()
-        if p.is_file() and p.name.startswith("Journal")
-    ]
-    if not files:
-        raise FileNotFoundError(f"No journal files found in {directory}")
+RESTOCK_SEQUENCES = ("restock_fc", "open_cargo_transfer", "restock_cargo")
+# Longest wait for CarrierJumpRequest after pressing jump. It usually lands
+# within a second, and the wait ends as soon as it does.
+JUMP_REQUEST_TIMEOUT = 15
+# Longest the first route estimate waits for the journals' jump timings.
+ETA_JOURNAL_TIMEOUT = 2
+# With screen checks, the longest to wait for the galaxy map after the
+# navigation sequence's last pause, and for the jump button to show.
+GALAXY_MAP_TIMEOUT = 10
+JUMP_BUTTON_TIMEOUT = 5
 
-    return max(files, key=lambda p: p.stat().st_mtime)
 
+def latest_journal_path(journal_dir: Path) -> Path:
+    return get_locator(journal_dir).latest()
 
-def follow_button_sequence(sequence_dir: Path, sequence_name: str) -> None:
-    sequence_path = sequence_dir / sequence_name
-    if sequence_path.suffix == "":
-        sequence_path = sequence_path.with_suffix(".txt")
 
-    if not sequence_path.exists():
-        print(f"Sequence file missing: {sequence_path}")
+def follow_button_sequence(sequence_dir: Path, sequence_name: str, inputs: InputExecutor) -> None:
+    try:
+        program = get_library(sequence_dir).get(sequence_name)
+    except FileNotFoundError:
+        print(f"Sequence file missing: {sequence_dir / sequence_name}")
         return
 
-    for line in sequence_path.read_text(encoding="utf-8").splitlines():
-        if ":" in line:
-            key, duration = line.split(":", 1)
-            input_handler.keyDown(key)
-            time.sleep(slight_random_time(float(duration)))
-            input_handler.keyUp(key)
-        else:
-            wait_time = 0.1
-            key = line
+    with PROFILER.span(f"sequence {program.name}"):
+        inputs.run(program.steps, program.name)
+
+
+def sequence_for(options: TraversalOptions, sequence_dir: Path, name: str) -> str:
+    """`name`, or its squadron carrier override when refuelling from a squadron carrier."""
+    if options.refuel_mode == 2 and get_library(sequence_dir).has(f"squadron/{name}"):
+        return f"squadron/{name}.txt"
+    return f"{name}.txt"
+
+
+def tritium_slot_steps(options: TraversalOptions) -> List[Step]:
+    """Moves down the cargo transfer list to the tritium slot."""
+    steps: List[Step] = []
+    if options.refuel_mode == 1:
+        steps += [Press("w"), Wait(0.1)]
+    key = "s" if options.refuel_mode in (1, 2) else "w"
+    for _ in range(options.tritium_slot):
+        steps += [Press(key), Wait(0.1)]
+    return steps
+
+
+def plot_steps(system_name: str, res_handler: Reshandler) -> List[Step]:
+    """Entering the system name and pressing jump, after the navigation sequence."""
+    return search_steps(system_name, res_handler) + jump_button_steps(res_handler)
+
+
+def search_steps(system_name: str, res_handler: Reshandler) -> List[Step]:
+    """Searching the galaxy map for the system and selecting it."""
+    return [
+        Move(res_handler.sysNameX, res_handler.sysNameUpperY),
+        Wait(0.1),
+        Press("space"),
+        Copy(system_name.lower()),
+        Wait(1.0),
+        KeyDown("ctrl"),
+        Wait(0.1),
+        Press("v"),
+        Wait(0.1),
+        KeyUp("ctrl"),
+        Wait(3.0),
+        Move(res_handler.sysNameX, res_handler.sysNameLowerY),
+        Wait(0.1),
+        Press("space"),
+        Wait(0.1),
+    ]
 
-            if "-" in line:
-                key, wait_raw = line.split("-", 1)
-                wait_time = float(wait_raw)
 
-            input_handler.press(key)
-            time.sleep(slight_random_time(wait_time))
+def jump_button_steps(res_handler: Reshandler) -> List[Step]:
+    return [
+        Move(res_handler.jumpButtonX, res_handler.jumpButtonY),
+        Wait(0.1),
+        Press("space"),
+    ]
 
 
-def restock_tritium(options: TraversalOptions, sequence_dir: Path) -> None:
+def restock_duration(options: TraversalOptions, sequence_dir: Path, inputs: InputExecutor) -> float:
+    """Expected seconds a tritium restock takes."""
     if not options.auto_plot_jumps or options.disable_refuel:
-        return
+        return 0.0
+    jitter = inputs.mean_delay()
+    sequences = get_library(sequence_dir).expected_duration(
+        (sequence_for(options, sequence_dir, step) for step in RESTOCK_SEQUENCES), jitter
+    )
+    return sequences + steps_duration(tritium_slot_steps(options), jitter)
 
-    restock_order = ["restock_fc", "open_cargo_transfer", "restock_cargo"]
 
-    for step in restock_order:
-        if options.refuel_mode == 2 and (sequence_dir / "squadron" / f"{step}.txt").exists():
-            follow_button_sequence(sequence_dir, f"squadron/{step}.txt")
-        else:
-            follow_button_sequence(sequence_dir, f"{step}.txt")
+def plot_duration(
+    options: TraversalOptions, sequence_dir: Path, res_handler: Reshandler, inputs: InputExecutor
+) -> float:
+    """Expected seconds from starting to plot a jump to pressing the jump button."""
+    jitter = inputs.mean_delay()
+    navigation = get_library(sequence_dir).get(sequence_for(options, sequence_dir, "jump_nav_1"))
+    return navigation.expected_duration(jitter) + steps_duration(plot_steps("", res_handler), jitter)
 
-        if step == "open_cargo_transfer":
-            if options.refuel_mode == 1:
-                input_handler.press("w")
-                time.sleep(slight_random_time(0.1))
 
-            for _ in range(options.tritium_slot):
-                if options.refuel_mode in (1, 2):
-                    input_handler.press("s")
-                else:
-                    input_handler.press("w")
-                time.sleep(slight_random_time(0.1))
+def load_sequences(
+    options: TraversalOptions, sequence_dir: Path, res_handler: Reshandler, inputs: InputExecutor
+) -> bool:
+    """Compile every button sequence up front so a bad file fails before the route starts."""
+    try:
+        programs = get_library(sequence_dir).preload()
+    except SequenceError as exc:
+        print(f"A button sequence file is invalid: {exc}")
+        return False
+    print(f"Loaded {len(programs)} button sequences")
+    if options.auto_plot_jumps:
+        restock = restock_duration(options, sequence_dir, inputs)
+        print(f"Plotting takes about {plot_duration(options, sequence_dir, res_handler, inputs):.0f}s"
+              + (f", restocking about {restock:.0f}s" if restock else ""))
+        window = COOLDOWN_STAGES.end - COOLDOWN_STAGES.restock
+        if restock > window:
+            print(f"Warning: restocking is expected to take longer than the {window:.0f}s left in the cooldown")
+    return True
+
+
+@PROFILER.timed("restock_tritium")
+def restock_tritium(options: TraversalOptions, sequence_dir: Path, inputs: InputExecutor) -> bool:
+    """Restock from the carrier's market. Returns False if restocking is off."""
+    if not options.auto_plot_jumps or options.disable_refuel:
+        return False
+
+    for step in RESTOCK_SEQUENCES:
+        follow_button_sequence(sequence_dir, sequence_for(options, sequence_dir, step), inputs)
+
+        if step == "open_cargo_transfer":
+            inputs.run(tritium_slot_steps(options), "tritium slot")
 
     print("Refuel process completed.")
+    return True
 
 
+def plot_failure_reason(event: Optional[JournalEvent], journal_written: int) -> str:
+    """Why a plot produced no CarrierJumpRequest for its system.
+
+    `event` is the request or cancellation that ended the wait early, if any,
+    and `journal_written` the bytes the game wrote to the journal meanwhile.
+    """
+    if isinstance(event, CarrierJumpCancelled):
+        return "the jump was cancelled"
+    if isinstance(event, CarrierJumpRequest):
+        return f"the carrier was sent to {event.system_name} instead"
+    if journal_written == 0:
+        return f"the game wrote nothing to the journal in {JUMP_REQUEST_TIMEOUT}s (is it focused?)"
+    return f"no jump request within {JUMP_REQUEST_TIMEOUT}s (the plot was not accepted)"
+
+
+def time_to_departure(request: CarrierJumpRequest, clock=SYSTEM_CLOCK) -> Tuple[int, datetime.datetime]:
+    departure_time = datetime.datetime.strptime(
+        request.departure_time, "%Y-%m-%dT%H:%M:%SZ"
+    ).replace(tzinfo=datetime.timezone.utc)
+    delta = departure_time - clock.now(datetime.timezone.utc)
+    return int(delta.total_seconds()), departure_time
+
+
+@PROFILER.timed("jump_to_system")
 def jump_to_system(
     system_name: str,
     options: TraversalOptions,
     res_handler: Reshandler,
     journal_watcher: JournalWatcher,
     sequence_dir: Path,
+    inputs: InputExecutor,
+    screen: Optional[ScreenVerifier] = None,
 ) -> Tuple[int, datetime.datetime]:
+    clock = inputs.clock
     if not options.auto_plot_jumps:
-        pyperclip.copy(system_name.lower())
+        input_handler.copy(system_name.lower())
         print(f"alert:Please plot the jump to {system_name}. It has been copied to your clipboard.")
-        while journal_watcher.last_carrier_request() != system_name:
-            time.sleep(1)
-
-        current_time = datetime.datetime.now(datetime.timezone.utc)
-        departure_time_str = journal_watcher.departureTime
-        departure_time = datetime.datetime.strptime(
-            departure_time_str, "%Y-%m-%dT%H:%M:%SZ"
-        ).replace(tzinfo=pytz.UTC)
-
-        delta = departure_time - current_time
-
-        return int(delta.total_seconds()), departure_time
-
-    if options.refuel_mode == 2:
-        follow_button_sequence(sequence_dir, "squadron/jump_nav_1.txt")
+        request = None
+        while request is None:
+            request = journal_watcher.wait_for_event(
+                lambda event: isinstance(event, CarrierJumpRequest) and event.system_name == system_name,
+                60,
+                clock=clock,
+            )
+        return time_to_departure(request, clock)
+
+    mark = journal_watcher.mark()
+    navigation = sequence_for(options, sequence_dir, "jump_nav_1")
+    library = get_library(sequence_dir)
+    if screen is not None and screen.has("galaxy_map") and library.has(navigation):
+        # The sequence's last pause, for the galaxy map to load, ends as soon as it shows.
+        program = library.get(navigation)
+        steps, pause = split_trailing_wait(program.steps)
+        with PROFILER.span(f"sequence {program.name}"):
+            inputs.run(steps, program.name)
+        if screen.wait_for("galaxy_map", pause + GALAXY_MAP_TIMEOUT, clock) is False:
+            print("Jump appears to have failed: the galaxy map did not open.")
+            follow_button_sequence(sequence_dir, "jump_fail.txt", inputs)
+            return 0, 0
     else:
-        follow_button_sequence(sequence_dir, "jump_nav_1.txt")
-
-    input_handler.moveTo(res_handler.sysNameX, res_handler.sysNameUpperY)
-    time.sleep(slight_random_time(0.1))
-    input_handler.press("space")
-    pyperclip.copy(system_name.lower())
-    time.sleep(slight_random_time(1.0))
-    input_handler.keyDown("ctrl")
-    time.sleep(slight_random_time(0.1))
-    input_handler.press("v")
-    time.sleep(slight_random_time(0.1))
-    input_handler.keyUp("ctrl")
-    time.sleep(slight_random_time(3.0))
-    input_handler.moveTo(res_handler.sysNameX, res_handler.sysNameLowerY)
-    time.sleep(slight_random_time(0.1))
-    input_handler.press("space")
-    time.sleep(slight_random_time(0.1))
-    input_handler.moveTo(res_handler.jumpButtonX, res_handler.jumpButtonY)
-    time.sleep(slight_random_time(0.1))
-    input_handler.press("space")
-
-    time.sleep(6)
-
-    if journal_watcher.last_carrier_request() != system_name:
-        print("Jump appears to have failed.")
-        follow_button_sequence(sequence_dir, "jump_fail.txt")
+        follow_button_sequence(sequence_dir, navigation, inputs)
+    inputs.run(search_steps(system_name, res_handler), "plot")
+    if screen is not None and screen.wait_for("jump_button", JUMP_BUTTON_TIMEOUT, clock) is False:
+        print(f"Jump appears to have failed: no jump button after selecting {system_name}.")
+        follow_button_sequence(sequence_dir, "jump_fail.txt", inputs)
+        return 0, 0
+    inputs.run(jump_button_steps(res_handler), "plot jump")
+
+    # Any request or cancellation settles the plot, so a wrong destination
+    # fails at once instead of after the timeout.
+    pressed = clock.monotonic()
+    event = journal_watcher.wait_for_event(
+        lambda event: isinstance(event, (CarrierJumpRequest, CarrierJumpCancelled)),
+        JUMP_REQUEST_TIMEOUT,
+        since=mark,
+        clock=clock,
+    )
+    if not isinstance(event, CarrierJumpRequest) or event.system_name != system_name:
+        reason = plot_failure_reason(event, journal_watcher.bytes_since(mark))
+        print(f"Jump appears to have failed: {reason}.")
+        follow_button_sequence(sequence_dir, "jump_fail.txt", inputs)
         return 0, 0
+    print(f"Jump request confirmed after {clock.monotonic() - pressed:.1f}s")
 
-    current_time = datetime.datetime.now(datetime.timezone.utc)
-    departure_time_str = journal_watcher.departureTime
-    departure_time = datetime.datetime.strptime(
-        departure_time_str, "%Y-%m-%dT%H:%M:%SZ"
-    ).replace(tzinfo=pytz.UTC)
+    inputs.run([Press("backspace"), Wait(0.1), Press("backspace")], "close plot")
 
-    delta = departure_time - current_time
+    return time_to_departure(event, clock)
 
-    input_handler.press("backspace")
-    time.sleep(slight_random_time(0.1))
-    input_handler.press("backspace")
 
-    return int(delta.total_seconds()), departure_time
+def save_checkpoint(state: TraversalState) -> None:
+    queue = state.route_queue
+    if queue is None:
+        return
+    leg, leg_position = queue.leg_position(state.line_no)
+    checkpoint = Checkpoint(
+        state.route_hash,
+        state.line_no,
+        state.phase,
+        route_files=[route.path.name for route in queue.legs if route.path is not None],
+        leg=queue.legs[leg].path.name if queue.legs[leg].path is not None else None,
+        leg_position=leg_position,
+        destination=state.destination,
+        departure=state.departure.timestamp() if state.departure is not None else None,
+        jumped_at=state.jumped_at,
+        restocked=state.restocked,
+        saved_at=state.clock.time(),
+    )
+    try:
+        write_checkpoint(state.checkpoint_path, checkpoint)
+    except OSError as exc:
+        print(f"Could not save progress: {exc}")
 
 
 def save_progress(state: TraversalState) -> None:
-    SAVE_PATH.write_text(str(state.line_no), encoding="utf-8")
+    save_checkpoint(state)
     print("Progress saved...")
 
 
+def read_saved_position(save_path: Path, queue: RouteQueue) -> int:
+    """Position in the queue's joined route from an old save.txt.
+
+    It holds the position, and for route queues the leg's file name on a
+    second line; a bare number counts from the start of the first leg.
+    """
+    lines = save_path.read_text(encoding="utf-8").splitlines()
+    leg_position = int(lines[0])
+    leg = 0
+    if len(lines) > 1 and lines[1].strip():
+        found = queue.find_leg(lines[1].strip())
+        if found is None:
+            print(f"The saved leg {lines[1].strip()} is not in the route queue. Counting from the first leg.")
+        else:
+            leg = found
+    return queue.position(leg, leg_position)
+
+
+def cycle_end(checkpoint: Checkpoint) -> float:
+    """Roughly when the checkpoint's jump cycle ends and the next plot is due (Unix time)."""
+    landed = checkpoint.jumped_at
+    if landed is None:
+        landed = checkpoint.departure + NEXT_JUMP_AFTER_DEPARTURE
+    return landed + COOLDOWN_STAGES.end
+
+
+def read_progress(state: TraversalState, queue: RouteQueue) -> Optional[Checkpoint]:
+    """The checkpoint for this route, or None.
+
+    An old save file, or a checkpoint for a leg that has been edited since,
+    only gives a position, which is set on `state` directly.
+    """
+    legacy_save = state.checkpoint_path.with_name(LEGACY_SAVE_NAME)
+    try:
+        checkpoint = read_checkpoint(state.checkpoint_path)
+    except ValueError as exc:
+        print(f"{exc}. Ignoring it.")
+        checkpoint = None
+    if checkpoint is None:
+        if legacy_save.exists():
+            print("Save file found. Setting up...")
+            state.line_no = read_saved_position(legacy_save, queue)
+            state.saved_resume = True
+            legacy_save.unlink(missing_ok=True)
+        return None
+
+    if checkpoint.route_hash != state.route_hash:
+        leg = queue.find_leg(checkpoint.leg) if checkpoint.leg is not None else None
+        if leg is None:
+            print("Checkpoint found, but it is for a different route. Ignoring it.")
+            return None
+        # The leg's file was edited: keep the place in it, but not the jump in flight.
+        print(f"Checkpoint found, but {checkpoint.leg} has changed since. Resuming at the same place in it.")
+        state.line_no = queue.position(leg, checkpoint.leg_position)
+        state.saved_resume = True
+        return None
+
+    print("Checkpoint found. Setting up...")
+    return checkpoint
+
+
+def carrier_target(checkpoint: Checkpoint, route_list: List[str]) -> Optional[str]:
+    """The system `checkpoint` has the carrier at or jumping to."""
+    if checkpoint.in_flight:
+        return checkpoint.destination.lower()
+    if 0 < checkpoint.line_no <= len(route_list):
+        return route_list[checkpoint.line_no - 1].lower()
+    return None
+
+
+def journal_progress(
+    state: TraversalState, queue: RouteQueue, journal_dir: Path, clock=SYSTEM_CLOCK
+) -> Optional[Checkpoint]:
+    """A checkpoint rebuilt from the carrier's last journal events, if they put it on this route."""
+    started = clock.monotonic()
+    carrier = scan_carrier_state(journal_dir)
+    route_list = queue.route.names
+    lowered = [name.lower() for name in route_list]
+
+    def find(system: Optional[str], start: int = 0) -> Optional[int]:
+        # From `start` on first, for routes that pass through a system twice.
+        if not system:
+            return None
+        for first in (start, 0):
+            try:
+                return lowered.index(system.lower(), first)
+            except ValueError:
+                continue
+        return None
+
+    landed = find(carrier.system, max(0, state.line_no - 1))
+    print(f"Read the carrier's last jumps from {carrier.journals_read} journals "
+          f"in {(clock.monotonic() - started) * 1000:.0f}ms")
+    if carrier.destination is not None:
+        position = find(carrier.destination, landed + 1 if landed is not None else 0)
+        if position is not None:
+            print(f"The journal shows a jump to {route_list[position]} scheduled.")
+            return Checkpoint(
+                state.route_hash, position, "countdown",
+                destination=route_list[position], departure=carrier.departure, saved_at=carrier.updated_at or 0.0,
+            )
+    if landed is None:
+        if carrier.system:
+            print(f"The carrier's last jump was to {carrier.system}, which is not on the route.")
+        return None
+
+    print(f"The journal shows the carrier at {route_list[landed]}.")
+    if carrier.jump_departure is None or carrier.jumped_at is None:
+        return Checkpoint(state.route_hash, landed + 1, "cooldown", saved_at=carrier.updated_at or 0.0)
+    # The cycle after the jump may still be running. Whether its restock ran
+    # isn't in the journal, so past the restock time it counts as unknown.
+    restock_due = carrier.jumped_at + COOLDOWN_STAGES.restock
+    return Checkpoint(
+        state.route_hash, landed + 1, "cooldown" if clock.time() < restock_due else "restocking",
+        destination=route_list[landed], departure=carrier.jump_departure,
+        jumped_at=carrier.jumped_at, saved_at=carrier.updated_at or 0.0,
+    )
+
+
+def resume_progress(
+    state: TraversalState, queue: RouteQueue, clock=SYSTEM_CLOCK, journal_dir: Optional[Path] = None
+) -> Optional[Checkpoint]:
+    """Pick up the position from the checkpoint, an old save file or the journals.
+
+    With `journal_dir`, the journals stand in for a missing checkpoint (when
+    no route_position is set) and overrule one the carrier has moved on from.
+    Returns the checkpoint when its jump is still in flight on this route, so
+    the traversal can rejoin it instead of plotting it again.
+    """
+    route_list = queue.route.names
+    checkpoint = read_progress(state, queue)
+    if journal_dir is not None and (checkpoint is not None or not state.saved_resume):
+        from_journal = journal_progress(state, queue, journal_dir, clock)
+        if from_journal is not None and checkpoint is not None:
+            if (
+                from_journal.saved_at > checkpoint.saved_at
+                and carrier_target(from_journal, route_list) != carrier_target(checkpoint, route_list)
+            ):
+                print("The carrier has moved since the checkpoint was saved. Going by the journal.")
+            else:
+                from_journal = None
+        if from_journal is not None:
+            checkpoint = from_journal
+    if checkpoint is None:
+        return None
+
+    state.line_no = min(checkpoint.line_no, len(route_list))
+    state.saved_resume = state.saved_resume or state.line_no > 1 or checkpoint.in_flight
+    if not checkpoint.in_flight:
+        return None
+    # line_no counts the jump in flight once the carrier has departed.
+    position = state.line_no if checkpoint.phase == "countdown" else state.line_no - 1
+    if not 0 <= position < len(route_list) or route_list[position].lower() != checkpoint.destination.lower():
+        return None
+    if clock.time() >= cycle_end(checkpoint):
+        print(f"The jump to {checkpoint.destination} finished its cycle while CTS was stopped.")
+        state.line_no = position + 1
+        return None
+    state.line_no = position
+    return checkpoint
+
+
+def rejoined_jump_landed(checkpoint: Checkpoint, clock=SYSTEM_CLOCK) -> bool:
+    """Whether a rejoined jump has already landed.
+
+    Its CarrierJump may have been written before CTS restarted, and the
+    journal watcher skips what was already there, so it is judged by time.
+    """
+    return checkpoint.jumped_at is not None or clock.time() >= checkpoint.departure + JUMP_CONFIRM_DELAY
+
+
 def handle_critical_error(
     message: str,
     state: TraversalState,
@@ -302,6 +602,11 @@ def handle_critical_error(
         "o7",
     )
     save_progress(state)
+    # The jumps leading up to the error are the ones most worth keeping.
+    if state.telemetry is not None and not state.telemetry.close(TELEMETRY_FLUSH_TIMEOUT):
+        print("Some jump telemetry could not be written before exiting")
+    discord_messenger.flush(DISCORD_FLUSH_TIMEOUT)
+    PROFILER.dump("critical error")
     os._exit(2)
 
 
@@ -313,28 +618,54 @@ def start_journal_thread(
     discord_messenger: DiscordHandler,
     route_name: str,
 ) -> None:
-    state.stop_journal.clear()
+    # Each thread gets its own stop flag so a thread that is still winding down
+    # can't be revived by the next start.
+    stop_journal = threading.Event()
+    state.stop_journal = stop_journal
     state.latest_journal = journal_path
+    notifier = create_notifier(journal_path.parent, options.journal_watch_mode)
+    state.journal_notifier = notifier
+    locator = get_locator(journal_path.parent)
+    # Attach before returning so the skip over existing history can't race
+    # with events the caller triggers next.
+    journal_watcher.process_journal(journal_path)
 
     def runner():
-        while not state.stop_journal.is_set():
-            ok = journal_watcher.process_journal(journal_path)
-            if not ok:
-                handle_critical_error(
-                    "An error has occurred with the Flight Computer.",
-                    state,
-                    options,
-                    discord_messenger,
-                    route_name,
-                )
-                return
-            time.sleep(1)
+        def on_switch(path: Path) -> None:
+            state.latest_journal = path
+
+        ok = watch_journal(
+            journal_watcher,
+            journal_path,
+            notifier,
+            locator,
+            stop_journal,
+            JOURNAL_IDLE_TIMEOUT,
+            on_switch,
+        )
+        if not ok:
+            handle_critical_error(
+                "An error has occurred with the Flight Computer.",
+                state,
+                options,
+                discord_messenger,
+                route_name,
+            )
+            return
         print("Journal thread halted")
 
     state.journal_thread = threading.Thread(target=runner, daemon=True)
     state.journal_thread.start()
 
 
+def stop_journal_thread(state: TraversalState) -> None:
+    state.stop_journal.set()
+    if state.journal_notifier is not None:
+        state.journal_notifier.close()
+        state.journal_notifier = None
+
+
+@PROFILER.timed("open_game")
 def open_game(
     state: TraversalState,
     options: TraversalOptions,
@@ -342,11 +673,19 @@ def open_game(
     journal_watcher: JournalWatcher,
     discord_messenger: DiscordHandler,
     route_name: str,
+    inputs: InputExecutor,
 ) -> None:
+    clock = inputs.clock
     print("Re-opening game...")
+    relaunch = StartupTimer("Game relaunch")
+    probe = start_resolution_probe()
+    if probe.display_changed():
+        print("Warning: the monitors changed since CTS started; screen positions may be off.")
+    relaunch.mark("display checked")
+    relaunch.note(f"display identity check instead of a full resolution detection ({probe.describe()})")
 
     open_steam_game("359320")
-    time.sleep(60)
+    clock.sleep(60)
 
     journal_path = latest_journal_path(options.journal_directory)
 
@@ -358,14 +697,15 @@ def open_game(
             menu_loaded = True
         else:
             print("Menu not loaded...")
-            time.sleep(10)
+            clock.sleep(10)
+    relaunch.mark("menu loaded")
 
-    time.sleep(10)
+    clock.sleep(10)
 
     print("Starting game...")
     input_handler.moveTo(res_handler.sysNameX, res_handler.sysNameLowerY)
     input_handler.click()
-    follow_button_sequence(SEQUENCE_DIR, "start_game.txt")
+    follow_button_sequence(SEQUENCE_DIR, "start_game.txt", inputs)
 
     loaded = False
     while not loaded:
@@ -376,13 +716,13 @@ def open_game(
         else:
             print("Game not loaded...")
             input_handler.press("space")
-            time.sleep(10)
+            clock.sleep(10)
 
+    relaunch.mark("game loaded")
     print("Switching to new journal...")
     journal_watcher.reset_all()
     new_journal = latest_journal_path(options.journal_directory)
 
-    state.stop_journal.clear()
     start_journal_thread(
         state,
         journal_watcher,
@@ -391,14 +731,79 @@ def open_game(
         discord_messenger,
         route_name,
     )
+    relaunch.mark("journal attached")
+    print(relaunch.report())
 
     state.game_ready = True
 
 
-def run_traversal(options: TraversalOptions) -> bool:
+def reopen_game_after(
+    delay: float,
+    state: TraversalState,
+    options: TraversalOptions,
+    res_handler: Reshandler,
+    journal_watcher: JournalWatcher,
+    discord_messenger: DiscordHandler,
+    route_name: str,
+    inputs: InputExecutor,
+) -> None:
+    """open_game once `delay` seconds pass on the inputs' clock; run with clock.spawn."""
+    inputs.clock.sleep(delay)
+    open_game(state, options, res_handler, journal_watcher, discord_messenger, route_name, inputs)
+
+
+def confirm_resolution(
+    probe: ResolutionProbe,
+    res_handler: Reshandler,
+    screen: Optional[ScreenVerifier],
+    options: TraversalOptions,
+) -> Tuple[Reshandler, Optional[ScreenVerifier]]:
+    """Rebuild the screen positions if detection disagrees with the cached resolution."""
+    detected = probe.confirm()
+    if detected is None:
+        return res_handler, screen
+    width, height = detected
+    cached_width, cached_height = probe.cached
+    print(f"Screen resolution is now {width}x{height}, not the cached "
+          f"{cached_width}x{cached_height}. Using the new resolution.")
+    res_handler = Reshandler(width, height)
+    screen = None
+    if res_handler.supported_res and options.screen_check and options.auto_plot_jumps:
+        screen = load_verifier(res_handler, width, height)
+    return res_handler, screen
+
+
+def run_traversal(
+    options: TraversalOptions,
+    *,
+    clock=SYSTEM_CLOCK,
+    discord_messenger: DiscordHandler | None = None,
+    res_handler: Reshandler | None = None,
+    checkpoint_path: Path = CHECKPOINT_PATH,
+    eta_history_path: Path = HISTORY_PATH,
+    telemetry_path: Path = DB_PATH,
+    on_phase: Callable[[str], None] | None = None,
+) -> bool:
+    """Fly the route in `options`.
+
+    The keyword arguments exist so simulation.py can run the loop against a
+    virtual clock and fake Discord/screen; normal runs leave them alone.
+    """
     journal_watcher = JournalWatcher()
-    discord_messenger = DiscordHandler(single_message=options.single_discord_message)
-    res_handler = Reshandler(screen_width, screen_height)
+    if discord_messenger is None:
+        discord_messenger = DiscordHandler(single_message=options.single_discord_message)
+    # Screen checks need the real screen; simulated runs pass their own res_handler.
+    screen: Optional[ScreenVerifier] = None
+    probe: Optional[ResolutionProbe] = None
+    if res_handler is None:
+        probe = start_resolution_probe()
+        screen_width, screen_height = probe.resolution()
+        STARTUP.mark("resolution")
+        STARTUP.note(probe.describe())
+        print(f"Screen resolution: {screen_width}x{screen_height}")
+        res_handler = Reshandler(screen_width, screen_height)
+        if res_handler.supported_res and options.screen_check and options.auto_plot_jumps:
+            screen = load_verifier(res_handler, screen_width, screen_height)
 
     if not res_handler.supported_res:
         print("Resolution not supported, exiting...")
@@ -407,6 +812,9 @@ def run_traversal(options: TraversalOptions) -> bool:
     state = TraversalState(
         line_no=options.route_position,
         saved_resume=options.route_position > 0,
+        on_phase=on_phase,
+        checkpoint_path=checkpoint_path,
+        clock=clock,
     )
     route_length = 0
     progress_saved = False
@@ -422,24 +830,38 @@ def run_traversal(options: TraversalOptions) -> bool:
         save_progress(state)
         progress_saved = True
 
-    time.sleep(5)
+    if options.profile:
+        PROFILER.enable()
+    inputs = InputExecutor(clock, options.input_jitter)
+    telemetry = TelemetryStore(telemetry_path) if options.telemetry else None
+    state.telemetry = telemetry
+    if not load_sequences(options, SEQUENCE_DIR, res_handler, inputs):
+        return False
+
+    clock.sleep(5)
 
     try:
         try:
-            route_list = load_route_list(options.route_file)
+            route_queue = load_route_queue(options.route_queue or (options.route_file,))
         except Exception as exc:
             print(exc)
             return False
-        route_length = len(route_list)
-
-        route_name = f"Carrier Updates: Route to {route_list[-1]}"
-        print(f"Destination: {route_list[-1]}")
-
-        if SAVE_PATH.exists():
-            print("Save file found. Setting up...")
-            state.line_no = int(SAVE_PATH.read_text(encoding="utf-8"))
-            state.saved_resume = True
-            SAVE_PATH.unlink(missing_ok=True)
+        state.route_queue = route_queue
+        state.route_hash = route_hash(route_queue.route.names)
+        # The legs are flown as one route; the queue maps positions back to legs.
+        route = route_queue.route
+        route_list = route.names
+        route_length = len(route)
+
+        route_name = f"Carrier Updates: Route to {route.destination}"
+        print(f"Destination: {route.destination}")
+        if len(route_queue) > 1:
+            for number, leg in enumerate(route_queue.legs, start=1):
+                print(f"Leg {number}: {leg.path.name}, {leg.summary()}")
+
+        rejoin = resume_progress(
+            state, route_queue, clock, options.journal_directory if options.journal_resume else None
+        )
 
         if state.line_no > len(route_list):
             print(
@@ -453,6 +875,18 @@ def run_traversal(options: TraversalOptions) -> bool:
         except Exception as exc:
             print(exc)
             return False
+
+        cooldown_stages = POWER_SAVING_COOLDOWN_STAGES if options.power_saving else COOLDOWN_STAGES
+        eta = EtaEstimator(
+            cooldown_stages.restock,
+            plot_duration(options, SEQUENCE_DIR, res_handler, inputs) if options.auto_plot_jumps else 0.0,
+        )
+        eta.load(eta_history_path)
+        # The journals are read during the countdown. Events from before now
+        # come from them, and later ones from the journal thread, which skips
+        # what is already written, so no event is counted twice.
+        eta.start_learning(options.journal_directory, before=clock.now().timestamp())
+        journal_watcher.add_listener(eta.observe)
         start_journal_thread(
             state,
             journal_watcher,
@@ -464,49 +898,100 @@ def run_traversal(options: TraversalOptions) -> bool:
 
         for countdown in range(5, 0, -1):
             print(f"Beginning in {countdown}...")
-            time.sleep(1)
+            clock.sleep(1)
 
         jumps_left = len(route_list) + 1
         final_line = route_list[-1]
 
-        delta = datetime.timedelta()
-        current_time = datetime.datetime.fromtimestamp(
-            time.mktime(time.localtime()), tzlocal.get_localzone()
-        )
-
-        for idx, system in enumerate(route_list):
-            if idx < state.line_no:
-                continue
-            delta = delta + datetime.timedelta(seconds=1320)
-
-        arrival_time = current_time + delta
+        if eta.wait_learning(ETA_JOURNAL_TIMEOUT):
+            print(f"Jump timings from {eta.journals_read} journals: {eta.describe()}")
+        else:
+            print(f"Still reading jump timings from the journals; estimating with {eta.describe()}")
+        print(f"Route: {route.summary(state.line_no)}")
+        current_time = clock.now().astimezone()
+        arrival_time = eta.route_eta(current_time, route.jumps_from(state.line_no))
         arrival_time_discord = (
             f"<t:{arrival_time.timestamp():.0f}:f> (<t:{arrival_time.timestamp():.0f}:R>)"
         )
 
+        if probe is not None:
+            # The route may have started from a cached resolution; make sure it
+            # still holds before the first click.
+            res_handler, screen = confirm_resolution(probe, res_handler, screen, options)
+            if not res_handler.supported_res:
+                print("Resolution not supported, exiting...")
+                return False
+
         done_first = False
+        current_leg = -1
+        rejoin_at = state.line_no if rejoin is not None else -1
         for idx, system in enumerate(route_list):
             jumps_left -= 1
             if idx < state.line_no:
                 continue
+            # The checkpointed jump this cycle rejoins, if any.
+            resumed = rejoin if idx == rejoin_at else None
 
-            time.sleep(3)
+            clock.sleep(3)
 
+            leg = route_queue.leg_at(idx)
+            if leg != current_leg and len(route_queue) > 1:
+                print(f"Leg {leg + 1} of {len(route_queue)}: {route_queue.legs[leg].path.name}")
+            current_leg = leg
             print(f"Next stop: {system}")
             print("Beginning navigation.")
             print("Please do not change windows until navigation is complete.")
             print(f"ETA: {arrival_time.strftime('%A, %I:%M%p (UTC%z)')}")
-
+            if route.has_details:
+                jump = route.jump(idx)
+                print(f"Jump: {jump.distance:.1f} ly, {jump.fuel_used} t of tritium, "
+                      f"{jump.distance_remaining:,.0f} ly left after it")
+                if journal_watcher.lastFuel < jump.fuel_used:
+                    print(f"alert:The carrier has {journal_watcher.lastFuel} t of tritium, "
+                          f"but the jump to {system} needs {jump.fuel_used} t.")
+
+            discord_before = (
+                len(discord_messenger.stats.latencies),
+                discord_messenger.stats.failed,
+                discord_messenger.transport.stats.retries,
+            )
             try:
-                time_to_jump, departing_time = jump_to_system(
-                    system, options, res_handler, journal_watcher, SEQUENCE_DIR
-                )
-
-                while time_to_jump == 0 or departing_time == 0:
+                state.destination = system
+                state.departure = None
+                state.jumped_at = resumed.jumped_at if resumed is not None else None
+                state.restocked = resumed is not None and resumed.restocked
+                plot_started = clock.monotonic()
+                if resumed is not None:
+                    attempts = 0
+                    departing_time = datetime.datetime.fromtimestamp(resumed.departure, datetime.timezone.utc)
+                    time_to_jump = max(0, int(resumed.departure - clock.time()))
+                    print(f"The jump to {system} is already scheduled. Rejoining it...")
+                else:
+                    set_phase(state, "plotting")
+                    attempts = 1
                     time_to_jump, departing_time = jump_to_system(
-                        system, options, res_handler, journal_watcher, SEQUENCE_DIR
+                        system, options, res_handler, journal_watcher, SEQUENCE_DIR, inputs, screen
                     )
 
+                    while time_to_jump == 0 or departing_time == 0:
+                        attempts += 1
+                        time_to_jump, departing_time = jump_to_system(
+                            system, options, res_handler, journal_watcher, SEQUENCE_DIR, inputs, screen
+                        )
+                state.departure = departing_time
+                if resumed is None or resumed.phase == "countdown":
+                    set_phase(state, "countdown")
+                record = JumpRecord(
+                    route_name,
+                    system,
+                    idx,
+                    requested_at=clock.time() if resumed is None else None,
+                    departure_at=departing_time.timestamp(),
+                    plot_seconds=clock.monotonic() - plot_started if resumed is None else None,
+                    plot_attempts=attempts,
+                    plot_failures=max(0, attempts - 1),
+                )
+
                 formatted_time = str(datetime.timedelta(seconds=time_to_jump))
                 departure_time_discord = f"<t:{departing_time.timestamp():.0f}:R>"
 
@@ -515,40 +1000,34 @@ def run_traversal(options: TraversalOptions) -> bool:
                 )
                 if options.power_saving:
                     print("Power saving mode is active. Closing game...")
-                    state.stop_journal.set()
-                    follow_button_sequence(SEQUENCE_DIR, "close_game.txt")
-                    threading.Timer(
-                        time_to_jump,
-                        open_game,
-                        args=(
-                            state,
-                            options,
-                            res_handler,
-                            journal_watcher,
-                            discord_messenger,
-                            route_name,
-                        ),
-                    ).start()
+                    stop_journal_thread(state)
+                    follow_button_sequence(SEQUENCE_DIR, "close_game.txt", inputs)
                     state.game_ready = False
+                    clock.spawn(
+                        reopen_game_after,
+                        time_to_jump,
+                        state,
+                        options,
+                        res_handler,
+                        journal_watcher,
+                        discord_messenger,
+                        route_name,
+                        inputs,
+                    )
                     print("Game open scheduled")
-                    game_process_names = get_game_process_names()
-                    for proc in psutil.process_iter():
-                        if proc.name() in game_process_names:
-                            proc.kill()
+                    kill_game_launcher()
                     print("Launcher killed")
 
                 journal_watcher.reset_jump()
 
-                total_time = time_to_jump - 6
-
-                if total_time > 900:
-                    arrival_time = arrival_time + datetime.timedelta(
-                        seconds=total_time - 900
-                    )
-                    arrival_time_discord = (
-                        f"<t:{arrival_time.timestamp():.0f}:f> "
-                        f"(<t:{arrival_time.timestamp():.0f}:R>)"
-                    )
+                # Re-estimated from this jump's real departure and what was learned so far.
+                arrival_time = eta.eta_after_departure(
+                    departing_time, route.jumps_from(idx + 1)
+                ).astimezone()
+                arrival_time_discord = (
+                    f"<t:{arrival_time.timestamp():.0f}:f> "
+                    f"(<t:{arrival_time.timestamp():.0f}:R>)"
+                )
 
                 if done_first:
                     previous_system = route_list[idx - 1]
@@ -563,7 +1042,6 @@ def run_traversal(options: TraversalOptions) -> bool:
                         f"Estimated time of route completion: {arrival_time_discord}",
                         "o7",
                     )
-                    time.sleep(2)
                     discord_messenger.update_fields(0, 0)
                 else:
                     if not state.saved_resume:
@@ -578,7 +1056,6 @@ def run_traversal(options: TraversalOptions) -> bool:
                             f"Estimated time of route completion: {arrival_time_discord}",
                             "o7",
                         )
-                        time.sleep(2)
                         discord_messenger.update_fields(0, 0)
                     else:
                         discord_messenger.post_with_fields(
@@ -590,7 +1067,6 @@ def run_traversal(options: TraversalOptions) -> bool:
                             f"Estimated time of route completion: {arrival_time_discord}",
                             "o7",
                         )
-                        time.sleep(2)
                         discord_messenger.update_fields(0, 0)
 
             except Exception as exc:
@@ -603,99 +1079,141 @@ def run_traversal(options: TraversalOptions) -> bool:
                     route_name,
                 )
 
-            while total_time > 0:
-                print(f"Jump in {total_time:>4}s", end="\r", flush=True)
-                time.sleep(1)
-
-                match total_time:
-                    case 600:
-                        discord_messenger.update_fields(1, 1)
-                    case 200:
-                        discord_messenger.update_fields(2, 2)
-                    case 190:
-                        discord_messenger.update_fields(2, 3)
-                    case 144:
-                        discord_messenger.update_fields(2, 4)
-                    case 103:
-                        discord_messenger.update_fields(2, 5)
-                    case 90:
-                        discord_messenger.update_fields(2, 6)
-                    case 75:
-                        discord_messenger.update_fields(2, 7)
-                    case 60:
-                        discord_messenger.update_fields(3, 7)
-                    case 30:
-                        discord_messenger.update_fields(4, 7)
-
-                total_time -= 1
+            scheduler = StageScheduler(clock)
+            departure_deadline = scheduler.deadline_for(departing_time)
+            schedule_stages(
+                scheduler, departure_deadline, PRE_JUMP_STAGES, discord_messenger, skip_missed=True
+            )
+            scheduler.at(departure_deadline, "departure", lambda: None)
+            scheduler.run(
+                departure_deadline,
+                lambda left: print(f"Jump in {left:>4}s", end="\r", flush=True),
+            )
             print()
 
             print("Jumping!")
+            # Counted as done from departure on; a checkpoint past this point rejoins the cycle after it.
+            state.line_no += 1
+            if resumed is None or resumed.phase in ("countdown", "jumping"):
+                set_phase(state, "jumping")
 
             discord_messenger.update_fields(5, 7)
 
-            state.line_no += 1
-
-            if system == final_line and options.power_saving:
+            if idx == len(route_list) - 1 and options.power_saving:
                 print("Counting down until jump finishes...")
 
-                total_time = 60
-                while total_time > 0:
-                    print(total_time)
-                    time.sleep(1)
-                    total_time -= 1
+                finished = departure_deadline + FINAL_JUMP_DURATION
+                scheduler.at(finished, "jump finished", lambda: None)
+                scheduler.run(finished, print)
 
                 discord_messenger.update_fields(9, 9)
             else:
                 print("Counting down until next jump...")
-                total_time = 362
-                while total_time > 0:
-                    print(f"Next jump in {total_time:>4}s", end="\r", flush=True)
-
-                    match total_time:
-                        case 340:
-                            discord_messenger.update_fields(6, 7)
-                        case 320:
-                            discord_messenger.update_fields(7, 7)
-                        case 300:
-                            if not options.power_saving:
-                                print("\nPausing execution until jump is confirmed...")
-                                completed = False
-                                while not completed:
-                                    completed = journal_watcher.get_jumped()
-                                    if not completed:
-                                        print("Jump not complete...")
-                                        time.sleep(10)
-                            else:
-                                print("\nPausing execution until game is open and ready...")
-                                while not state.game_ready:
-                                    print("Game not ready...")
-                                    time.sleep(10)
-                                total_time = 152
-                            print("Jump complete!")
-                            discord_messenger.update_fields(8, 7)
-                        case 151:
-                            discord_messenger.update_fields(8, 8)
-                        case 100:
-                            discord_messenger.update_fields(8, 9)
-                        case 150:
-                            print("Restocking tritium...")
-                            time.sleep(2)
-                            threading.Thread(
-                                target=restock_tritium,
-                                args=(options, SEQUENCE_DIR),
-                                daemon=True,
-                            ).start()
-
-                    time.sleep(1)
-                    total_time -= 1
+                next_jump = departure_deadline + NEXT_JUMP_AFTER_DEPARTURE
+                schedule_stages(
+                    scheduler, departure_deadline, JUMPING_STAGES, discord_messenger,
+                    skip_missed=resumed is not None,
+                )
+                scheduler.at(departure_deadline + JUMP_CONFIRM_DELAY, "jump check", lambda: None)
+                scheduler.run(
+                    next_jump,
+                    lambda left: print(f"Next jump in {left:>4}s", end="\r", flush=True),
+                )
+
+                if not options.power_saving:
+                    print("\nPausing execution until jump is confirmed...")
+                    completed = resumed is not None and rejoined_jump_landed(resumed, clock)
+                    while not completed:
+                        completed = journal_watcher.wait_for_jump(10, clock)
+                        if not completed:
+                            print("Jump not complete...")
+                    cooldown_stages = COOLDOWN_STAGES
+                else:
+                    print("\nPausing execution until game is open and ready...")
+                    while not state.game_ready:
+                        print("Game not ready...")
+                        clock.sleep(10)
+                    cooldown_stages = POWER_SAVING_COOLDOWN_STAGES
+                print("Jump complete!")
+                # The rest of the cycle runs from when the jump was confirmed.
+                confirmed = clock.monotonic()
+                if state.jumped_at is None:
+                    state.jumped_at = clock.time()
+                else:
+                    confirmed -= max(0.0, clock.time() - state.jumped_at)
+                record.jumped_at = state.jumped_at
+                if resumed is None or resumed.phase != "restocking":
+                    set_phase(state, "cooldown")
+                discord_messenger.update_fields(8, 7)
+
+                restock_at, cooldown_end = cooldown_stages.restock, cooldown_stages.end
+                schedule_stages(
+                    scheduler, confirmed, cooldown_stages.stages, discord_messenger,
+                    skip_missed=resumed is not None,
+                )
+
+                def timed_restock(record: JumpRecord) -> None:
+                    started = clock.monotonic()
+                    if restock_tritium(options, SEQUENCE_DIR, inputs):
+                        record.restock_seconds = clock.monotonic() - started
+                        state.restocked = True
+                        save_checkpoint(state)
+                        eta.add_sample("restock", record.restock_seconds)
+                        eta.save(eta_history_path)
+
+                def start_restock() -> None:
+                    print("\nRestocking tritium...")
+                    set_phase(state, "restocking")
+                    clock.spawn(timed_restock, record)
+
+                if state.restocked:
+                    print("Tritium was already restocked this cycle.")
+                elif resumed is not None and resumed.phase == "restocking":
+                    # Redoing a button sequence that may have run, or stopped halfway, is worse than skipping it.
+                    print("alert:CTS can't tell whether this cycle's restock finished. "
+                          "Check the carrier's tritium before the next jump.")
+                else:
+                    scheduler.at(confirmed + restock_at, "restock", start_restock)
+                scheduler.at(confirmed + cooldown_end, "cooldown end", lambda: None)
+                scheduler.run(
+                    confirmed + cooldown_end,
+                    lambda left: print(f"Next jump in {left:>4}s", end="\r", flush=True),
+                )
                 print()
                 discord_messenger.update_fields(9, 9)
 
+            drift = scheduler.drift_summary()
+            if drift is not None:
+                print(f"Stage timing: {drift}")
+
+            if telemetry is not None:
+                latencies = discord_messenger.stats.latencies[discord_before[0]:]
+                record.discord_messages = len(latencies)
+                record.discord_latency = max(latencies) if latencies else None
+                record.discord_failures = discord_messenger.stats.failed - discord_before[1]
+                record.discord_retries = discord_messenger.transport.stats.retries - discord_before[2]
+                telemetry.record(record, clock.time())
+
+            if idx + 1 == route_queue.leg_end(leg) and leg + 1 < len(route_queue):
+                next_leg = route_queue.legs[leg + 1]
+                print(f"Leg {leg + 1} of {len(route_queue)} complete.")
+                discord_messenger.post_to_discord(
+                    "Leg Complete",
+                    options.webhook_url,
+                    route_name,
+                    f"Leg {leg + 1} of {len(route_queue)} is complete, and the carrier has arrived at {system}.",
+                    f"Next leg: {next_leg.summary(route_queue.leg_position(idx + 1)[1])}",
+                    f"Jumps remaining: {jumps_left - 1}",
+                    "o7",
+                )
+
             done_first = True
 
         state.route_complete = True
+        set_phase(state, "complete")
+        state.checkpoint_path.unlink(missing_ok=True)
         print("Route complete!")
+        PROFILER.dump("route complete")
         discord_messenger.post_to_discord(
             "Carrier Arrived",
             options.webhook_url,
@@ -712,7 +1230,8 @@ def run_traversal(options: TraversalOptions) -> bool:
             "o7",
         )
             print("Shutting down system in 30 seconds...")
-            time.sleep(5)
+            discord_messenger.flush(DISCORD_FLUSH_TIMEOUT)
+            clock.sleep(5)
             system_shutdown(30)
         else:
             print("Shutdown on completion is disabled. Exiting without powering off.")
@@ -720,15 +1239,34 @@ def run_traversal(options: TraversalOptions) -> bool:
     except KeyboardInterrupt:
         print("\nTraversal interrupted. Saving progress before exiting...")
         maybe_save_progress()
+        PROFILER.dump("interrupted")
         return False
     finally:
+        stop_journal_thread(state)
         maybe_save_progress()
+        if not discord_messenger.flush(DISCORD_FLUSH_TIMEOUT):
+            print("Some Discord messages could not be sent before exiting")
+        if discord_messenger.stats.sent or discord_messenger.stats.failed:
+            print(f"Discord: {discord_messenger.stats}")
+            print(f"Discord HTTP: {discord_messenger.transport.stats}")
+        if inputs.stats.runs:
+            print(f"Input timing: {inputs.stats}")
+        if telemetry is not None and not telemetry.close():
+            print("Some jump telemetry could not be written before exiting")
+
+
+def go_online() -> None:
+    """Start the background startup work and announce that CTS is running."""
+    # Detect the screen and check for updates while settings, the route and
+    # the journal load.
+    start_resolution_probe()
+    start_version_check()
+    print("Autopilot Script Online")
+    STARTUP.mark("online")
 
 
 def main() -> None:
-    print("Autopilot Script Online")
-    print(f"Screen resolution: {screen_width}x{screen_height}")
-    warn_if_outdated()
+    go_online()
 
     try:
         options = load_settings()
@@ -739,6 +1277,7 @@ def main() -> None:
         )
         print(exc)
         os._exit(1)
+    STARTUP.mark("settings")
 
     if not run_traversal(options):
         os._exit(1)
@@ -3,12 +3,55 @@ from __future__ import annotations
 
 import subprocess
 import sys
-from typing import Tuple
+from typing import Optional, Tuple
 
 IS_WINDOWS = sys.platform == "win32"
 IS_LINUX = sys.platform.startswith("linux")
 IS_MACOS = sys.platform == "darwin"
 
+# Where game launches and launcher kills go instead of the OS, like
+# input_handler.set_backend; simulation.py plays the game this way.
+_game_backend = None
+
+
+def set_game_backend(backend) -> None:
+    """Route open_steam_game and kill_game_launcher to `backend`. None restores the OS."""
+    global _game_backend
+    _game_backend = backend
+
+
+def _parse_size(part: str) -> Optional[Tuple[int, int]]:
+    if "x" not in part or not part[0].isdigit():
+        return None
+    w, h = part.split("+")[0].split("x", 1)
+    try:
+        return int(w), int(h.split("_")[0])  # Handle refresh rate suffix
+    except ValueError:
+        return None
+
+
+def parse_xrandr_resolution(output: str) -> Optional[Tuple[int, int]]:
+    """Screen size from `xrandr --current` output, read in a single pass.
+
+    Prefers the primary output's geometry, then any connected output's, then
+    the first current mode (marked with an asterisk).
+    """
+    primary = connected = current = None
+    for line in output.splitlines():
+        if " connected" in line:
+            geometry = next(filter(None, map(_parse_size, line.split())), None)
+            if " connected primary" in line and primary is None:
+                primary = geometry
+            elif connected is None:
+                connected = geometry
+        elif current is None and "*" in line:
+            current = next(filter(None, map(_parse_size, line.split())), None)
+    if primary is not None:
+        return primary
+    if connected is not None and current is not None:
+        return connected
+    return current
+
 
 def get_screen_resolution() -> Tuple[int, int]:
     """Get the primary screen resolution in a cross-platform manner."""
@@ -25,23 +68,9 @@ def get_screen_resolution() -> Tuple[int, int]:
                 stderr=subprocess.DEVNULL,
                 text=True
             )
-            for line in output.splitlines():
-                if " connected primary" in line or (" connected" in line and "*" in output):
-                    # Find the resolution in the next part or same line
-                    parts = line.split()
-                    for part in parts:
-                        if "x" in part and part[0].isdigit():
-                            res = part.split("+")[0]  # Remove position offset
-                            w, h = res.split("x")
-                            return int(w), int(h)
-            # Fallback: look for line with asterisk (current mode)
-            for line in output.splitlines():
-                if "*" in line:
-                    parts = line.split()
-                    for part in parts:
-                        if "x" in part and part[0].isdigit():
-                            w, h = part.split("x")
-                            return int(w), int(h.split("_")[0])  # Handle refresh rate suffix
+            resolution = parse_xrandr_resolution(output)
+            if resolution is not None:
+                return resolution
         except (subprocess.CalledProcessError, FileNotFoundError):
             pass
         
@@ -86,6 +115,9 @@ def get_screen_resolution() -> Tuple[int, int]:
 
 def open_steam_game(app_id: str = "359320") -> None:
     """Open a Steam game by app ID in a cross-platform manner."""
+    if _game_backend is not None:
+        _game_backend.open_game(app_id)
+        return
     steam_url = f"steam://rungameid/{app_id}"
     
     if IS_WINDOWS:
@@ -145,3 +177,21 @@ def get_game_process_names() -> list[str]:
     else:
         # On Linux, check for both native wine process names and potential variants
         return ["EDLaunch.exe", "EDLaunch", "steam", "reaper"]
+
+
+def kill_game_launcher() -> int:
+    """Kill the game launcher's processes. Returns how many were killed."""
+    if _game_backend is not None:
+        return _game_backend.kill_launcher()
+    import psutil
+
+    names = get_game_process_names()
+    killed = 0
+    for proc in psutil.process_iter():
+        try:
+            if proc.name() in names:
+                proc.kill()
+                killed += 1
+        except psutil.Error:
+            continue
+    return killed
@@ -0,0 +1,166 @@
+"""Wall time per phase of the traversal loop.
+
+Spans around plotting, button sequences, restocking, journal reads, Discord
+sends and game relaunches feed a histogram per phase: a count, total, maximum
+and power-of-two buckets, so recording costs a few additions and memory
+stays flat however long the route. When profiling is off (the default) a
+span is a shared no-op.
+
+    with PROFILER.span("restock"):
+        ...
+
+    @PROFILER.timed("jump_to_system")
+    def jump_to_system(...):
+        ...
+"""
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, TypeVar
+
+_F = TypeVar("_F", bound=Callable)
+# Bucket n holds durations below 2**n microseconds; the last one holds the rest.
+BUCKETS = 40
+
+
+class Histogram:
+    __slots__ = ["count", "total", "maximum", "buckets"]
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+        self.buckets[min(BUCKETS - 1, int(seconds * 1_000_000).bit_length())] += 1
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound of the bucket the percentile falls in, capped at the maximum."""
+        if not self.count:
+            return 0.0
+        wanted = self.count * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= wanted:
+                return min(self.maximum, (1 << bucket) / 1_000_000)
+        return self.maximum
+
+
+class _Span:
+    __slots__ = ["profiler", "name", "started"]
+
+    def __init__(self, profiler: Profiler, name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> _Span:
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.add(self.name, time.perf_counter() - self.started)
+
+
+class _NoSpan:
+    __slots__ = []
+
+    def __enter__(self) -> _NoSpan:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Profiler:
+    """Histograms of wall time per named phase, safe to record from any thread."""
+
+    __slots__ = ["enabled", "started", "_histograms", "_lock"]
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        if enabled:
+            self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self.started = time.perf_counter()
+
+    def span(self, name: str):
+        """Context manager timing its body as `name`."""
+        return _Span(self, name) if self.enabled else _NO_SPAN
+
+    def timed(self, name: str) -> Callable[[_F], _F]:
+        """Decorator timing every call of the function as `name`."""
+        def decorate(function: _F) -> _F:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.add(name, time.perf_counter() - started)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def histogram(self, name: str) -> Optional[Histogram]:
+        return self._histograms.get(name)
+
+    def report(self, reason: str = "") -> str:
+        with self._lock:
+            phases = sorted(self._histograms.items(), key=lambda item: item[1].total, reverse=True)
+        elapsed = time.perf_counter() - self.started
+        title = f"Profile after {elapsed:.0f}s" + (f" ({reason})" if reason else "")
+        if not phases:
+            return f"{title}: nothing recorded"
+        width = max(len(name) for name, _ in phases)
+        lines: List[str] = [title, f"  {'phase':<{width}}  {'count':>6}  {'total':>9}  {'mean':>8}  "
+                                   f"{'p50':>8}  {'p95':>8}  {'max':>8}"]
+        for name, histogram in phases:
+            lines.append(
+                f"  {name:<{width}}  {histogram.count:>6}  {histogram.total:>8.2f}s  "
+                f"{_ms(histogram.total / histogram.count)}  {_ms(histogram.percentile(50))}  "
+                f"{_ms(histogram.percentile(95))}  {_ms(histogram.maximum)}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, reason: str = "") -> None:
+        """Print the report if profiling is on."""
+        if self.enabled:
+            print(self.report(reason))
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:>6.1f}ms" if seconds < 10 else f"{seconds:>7.1f}s"
+
+
+PROFILER = Profiler()
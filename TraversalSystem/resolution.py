@@ -0,0 +1,180 @@
+"""Screen resolution, detected off the startup path and cached per display.
+
+Detecting the resolution on Linux means running xrandr (and maybe xdpyinfo
+or pyautogui after it), which costs tens to hundreds of milliseconds on every
+launch. The probe runs detection on a background thread while the rest of
+startup carries on, and remembers the result in resolution_cache.json keyed
+on the display's identity: the X/Wayland display name and the EDIDs of the
+connected monitors. A launch on the same display starts with the cached size
+at once; the resolution can change without the monitor changing, so the
+route confirms it against the detection before the first click and rebuilds
+its screen positions if the two differ.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from config import BASE_DIR
+from platform_utils import IS_LINUX, get_screen_resolution
+
+CACHE_PATH = BASE_DIR / "resolution_cache.json"
+DRM_DIR = Path("/sys/class/drm")
+
+
+def display_identity() -> str:
+    """A fingerprint of the display setup that changes when a monitor does."""
+    digest = hashlib.sha1()
+    for name in ("DISPLAY", "WAYLAND_DISPLAY", "XDG_SESSION_TYPE"):
+        digest.update(f"{name}={os.environ.get(name, '')};".encode())
+    if IS_LINUX:
+        try:
+            connectors = sorted(DRM_DIR.iterdir())
+        except OSError:
+            connectors = []
+        for connector in connectors:
+            try:
+                if (connector / "status").read_text().strip() != "connected":
+                    continue
+                digest.update(connector.name.encode())
+                digest.update((connector / "edid").read_bytes())
+            except OSError:
+                continue
+    return digest.hexdigest()
+
+
+def load_cached(identity: str, path: Path = CACHE_PATH) -> Optional[Tuple[int, int]]:
+    try:
+        cached = json.loads(path.read_text(encoding="utf-8"))
+        if cached["display"] == identity:
+            return int(cached["width"]), int(cached["height"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def save_cached(identity: str, resolution: Tuple[int, int], path: Path = CACHE_PATH) -> None:
+    try:
+        path.write_text(
+            json.dumps({"display": identity, "width": resolution[0], "height": resolution[1]}),
+            encoding="utf-8",
+        )
+    except OSError:
+        pass
+
+
+class ResolutionProbe:
+    """Detects the resolution on a background thread; answers from cache meanwhile."""
+
+    __slots__ = ["cache_path", "identity", "cached", "detected", "detect_seconds", "waited", "source",
+                 "_thread", "_done"]
+
+    def __init__(self, cache_path: Optional[Path] = CACHE_PATH) -> None:
+        self.cache_path = cache_path
+        self.identity = ""
+        self.cached: Optional[Tuple[int, int]] = None
+        self.detected: Optional[Tuple[int, int]] = None
+        self.detect_seconds: Optional[float] = None
+        # Seconds the caller spent blocked waiting for detection.
+        self.waited = 0.0
+        # Where the answer given to the caller came from: "cache", "detected" or "default".
+        self.source = ""
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+
+    def start(self) -> "ResolutionProbe":
+        self.identity = display_identity()
+        if self.cache_path is not None:
+            self.cached = load_cached(self.identity, self.cache_path)
+        self._thread = threading.Thread(target=self._detect, name="resolution-probe", daemon=True)
+        self._thread.start()
+        return self
+
+    def _detect(self) -> None:
+        started = time.perf_counter()
+        try:
+            self.detected = get_screen_resolution()
+            self.detect_seconds = time.perf_counter() - started
+            if self.cache_path is not None and self.detected is not None and self.detected != self.cached:
+                save_cached(self.identity, self.detected, self.cache_path)
+        finally:
+            if self.detect_seconds is None:
+                self.detect_seconds = time.perf_counter() - started
+            self._done.set()
+
+    def resolution(self) -> Tuple[int, int]:
+        """The screen size, without waiting for detection when the cache has it.
+
+        A cached size may be out of date even on the same display, so callers
+        that start from it check `confirm()` before relying on it.
+        """
+        if self._thread is None:
+            self.start()
+        if not self._done.is_set() and self.cached is not None:
+            self.source = "cache"
+            return self.cached
+        started = time.perf_counter()
+        self._done.wait()
+        self.waited = time.perf_counter() - started
+        if self.detected is not None:
+            self.source = "detected"
+            return self.detected
+        if self.cached is not None:
+            self.source = "cache"
+            return self.cached
+        self.source = "default"
+        return (1920, 1080)
+
+    def confirm(self) -> Optional[Tuple[int, int]]:
+        """Wait for detection and return its size if it differs from the one handed out, else None."""
+        self._done.wait()
+        if self.source != "cache" or self.detected is None or self.detected == self.cached:
+            return None
+        self.source = "detected"
+        return self.detected
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for background detection to finish, e.g. so the cache gets written."""
+        return self._done.wait(timeout)
+
+    def display_changed(self) -> bool:
+        """Whether the monitors have changed since the probe started."""
+        return display_identity() != self.identity
+
+    def describe(self) -> str:
+        """What resolving the resolution cost the caller, for the startup report."""
+        if self.source == "cache":
+            if not self._done.is_set():
+                return "resolution from cache, detection still running in the background"
+            if self.detected is None:
+                return "resolution detection failed, using the cached resolution"
+            return f"resolution from cache, saved the {self.detect_seconds * 1000:.0f} ms detection"
+        if self.source == "default":
+            return "resolution detection failed, assuming 1920x1080"
+        if self.source == "detected" and self.detect_seconds is not None:
+            overlapped = max(0.0, self.detect_seconds - self.waited)
+            return (
+                f"resolution detected in {self.detect_seconds * 1000:.0f} ms, "
+                f"{overlapped * 1000:.0f} ms of it alongside other startup work"
+            )
+        return "resolution not resolved yet"
+
+
+_probe: Optional[ResolutionProbe] = None
+
+
+def start_resolution_probe() -> ResolutionProbe:
+    """Start detecting the resolution in the background, once per process."""
+    global _probe
+    if _probe is None:
+        _probe = ResolutionProbe().start()
+    return _probe
+
+
+def screen_resolution() -> Tuple[int, int]:
+    return start_resolution_probe().resolution()
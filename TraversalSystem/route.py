@@ -0,0 +1,330 @@
+"""Carrier routes: plain lists of systems or Spansh fleet carrier CSV exports.
+
+A Spansh export has a row per system with the jump's distance, the distance
+left, the tritium in the tank and market, the fuel the jump uses and whether
+to restock there. Columns are found by their header name and stored in flat
+arrays, one entry per system, with prefix sums so distance and fuel from any
+point to the end of the route are a subtraction. Plain ``.txt`` routes load
+into the same structure without the per-jump figures.
+
+Several route files can be queued and flown back to back as one route; see
+RouteQueue.
+"""
+from __future__ import annotations
+
+import csv
+import re
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Spansh header names, lowercased, for each column kept.
+COLUMNS = {
+    "system name": "name",
+    "distance": "distance",
+    "distance remaining": "distance_remaining",
+    "tritium in tank": "tritium_in_tank",
+    "tritium in market": "tritium_in_market",
+    "fuel used": "fuel_used",
+    "icy ring": "icy_ring",
+    "pristine": "pristine",
+    "restock tritium": "restock",
+}
+_FLAGS = {"yes", "true", "1", "y"}
+
+
+@dataclass(frozen=True, slots=True)
+class RouteJump:
+    """One row of a route: the jump that arrives at `name`."""
+    index: int
+    name: str
+    distance: float
+    distance_remaining: float
+    tritium_in_tank: int
+    tritium_in_market: int
+    fuel_used: int
+    icy_ring: bool
+    pristine: bool
+    restock: bool
+
+
+class Route:
+    """The systems of a route in order, with Spansh's per-jump figures when known."""
+
+    __slots__ = ["path", "names", "has_details", "distance", "distance_remaining", "tritium_in_tank",
+                 "tritium_in_market", "fuel_used", "flags", "_distance_sum", "_fuel_sum"]
+
+    # Bits of `flags`.
+    ICY_RING = 1
+    PRISTINE = 2
+    RESTOCK = 4
+
+    def __init__(self, path: Optional[Path] = None, has_details: bool = False) -> None:
+        self.path = path
+        self.names: List[str] = []
+        self.has_details = has_details
+        self.distance = array("d")
+        self.distance_remaining = array("d")
+        self.tritium_in_tank = array("l")
+        self.tritium_in_market = array("l")
+        self.fuel_used = array("l")
+        self.flags = bytearray()
+        # _distance_sum[i] is the distance of jumps before system i.
+        self._distance_sum = array("d", [0.0])
+        self._fuel_sum = array("l", [0])
+
+    def append(
+        self,
+        name: str,
+        distance: float = 0.0,
+        distance_remaining: float = 0.0,
+        tritium_in_tank: int = 0,
+        tritium_in_market: int = 0,
+        fuel_used: int = 0,
+        flags: int = 0,
+    ) -> None:
+        self.names.append(name)
+        self.distance.append(distance)
+        self.distance_remaining.append(distance_remaining)
+        self.tritium_in_tank.append(tritium_in_tank)
+        self.tritium_in_market.append(tritium_in_market)
+        self.fuel_used.append(fuel_used)
+        self.flags.append(flags)
+        self._distance_sum.append(self._distance_sum[-1] + distance)
+        self._fuel_sum.append(self._fuel_sum[-1] + fuel_used)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __getitem__(self, index: int) -> str:
+        return self.names[index]
+
+    @property
+    def destination(self) -> str:
+        return self.names[-1]
+
+    def jump(self, index: int) -> RouteJump:
+        flags = self.flags[index]
+        return RouteJump(
+            index,
+            self.names[index],
+            self.distance[index],
+            self.distance_remaining[index],
+            self.tritium_in_tank[index],
+            self.tritium_in_market[index],
+            self.fuel_used[index],
+            bool(flags & self.ICY_RING),
+            bool(flags & self.PRISTINE),
+            bool(flags & self.RESTOCK),
+        )
+
+    def jumps_from(self, position: int) -> int:
+        """Jumps still to make when `position` systems of the route are done."""
+        return max(0, len(self.names) - position)
+
+    def distance_from(self, position: int) -> float:
+        """Light years left when `position` systems of the route are done."""
+        position = min(max(position, 0), len(self.names))
+        return self._distance_sum[-1] - self._distance_sum[position]
+
+    def fuel_from(self, position: int, end: Optional[int] = None) -> int:
+        """Tritium the jumps from `position` up to `end` (default: the end) use."""
+        end = len(self.names) if end is None else min(max(end, 0), len(self.names))
+        position = min(max(position, 0), end)
+        return self._fuel_sum[end] - self._fuel_sum[position]
+
+    def restock_stops(self, position: int = 0) -> List[int]:
+        """Indexes from `position` on where Spansh plans a tritium restock."""
+        return [index for index in range(max(position, 0), len(self.flags)) if self.flags[index] & self.RESTOCK]
+
+    def summary(self, position: int = 0) -> str:
+        jumps = self.jumps_from(position)
+        if not self.has_details:
+            return f"{jumps} jumps to {self.destination}"
+        restocks = len(self.restock_stops(position))
+        return (
+            f"{jumps} jumps, {self.distance_from(position):,.0f} ly and {self.fuel_from(position):,} t "
+            f"of tritium to {self.destination}"
+            + (f", {restocks} restock stop{'s' if restocks != 1 else ''}" if restocks else "")
+        )
+
+
+def _number(value: str) -> float:
+    try:
+        return float(value.replace(",", "")) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _flag(value: str) -> int:
+    return 1 if value.strip().lower() in _FLAGS else 0
+
+
+def load_spansh_csv(route_file: Path) -> Route:
+    """Stream a Spansh fleet carrier CSV into a Route.
+
+    Columns are matched by header, so exports with extra or reordered columns
+    load the same. A file without a recognisable header is read as system
+    names in the first column.
+    """
+    route = Route(route_file, has_details=True)
+    # utf-8-sig drops the byte order mark spreadsheet programs add.
+    with route_file.open(newline="", encoding="utf-8-sig") as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader, None)
+        if header is None:
+            return route
+        positions: Dict[str, int] = {}
+        for position, title in enumerate(header):
+            field = COLUMNS.get(title.strip().lower())
+            if field is not None:
+                positions.setdefault(field, position)
+        if "name" not in positions:
+            # No header: the first row is a system too.
+            route.has_details = False
+            positions = {"name": 0}
+            reader = _chain_row(header, reader)
+
+        def column(row: List[str], field: str) -> str:
+            position = positions.get(field)
+            return row[position].strip() if position is not None and position < len(row) else ""
+
+        for row in reader:
+            name = column(row, "name")
+            if not name:
+                continue
+            route.append(
+                name,
+                _number(column(row, "distance")),
+                _number(column(row, "distance_remaining")),
+                int(_number(column(row, "tritium_in_tank"))),
+                int(_number(column(row, "tritium_in_market"))),
+                int(_number(column(row, "fuel_used"))),
+                _flag(column(row, "icy_ring")) * Route.ICY_RING
+                | _flag(column(row, "pristine")) * Route.PRISTINE
+                | _flag(column(row, "restock")) * Route.RESTOCK,
+            )
+    return route
+
+
+def _chain_row(first: List[str], rows: Iterator[List[str]]) -> Iterator[List[str]]:
+    yield first
+    yield from rows
+
+
+def load_text_route(route_file: Path) -> Route:
+    """One system per line; blank lines are skipped."""
+    route = Route(route_file)
+    with route_file.open(encoding="utf-8") as text_file:
+        for line in text_file:
+            name = line.strip()
+            if name:
+                route.append(name)
+    return route
+
+
+def load_route(route_file: Path) -> Route:
+    """Load a .csv (Spansh) or plain text route. Raises ValueError if it is empty."""
+    route_file = Path(route_file)
+    if route_file.suffix.lower() == ".csv":
+        route = load_spansh_csv(route_file)
+    else:
+        route = load_text_route(route_file)
+    if not route:
+        raise ValueError("Route file is empty. Exiting...")
+    return route
+
+
+def _natural_key(path: Path) -> List[object]:
+    # "leg 10" sorts after "leg 9".
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path.name.lower())]
+
+
+def expand_route_queue(paths: Iterable[Path]) -> List[Path]:
+    """Route files in flying order; a directory stands for its .csv and .txt files, in natural order."""
+    files: List[Path] = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            found = [item for item in path.iterdir() if item.is_file() and item.suffix.lower() in {".csv", ".txt"}]
+            if not found:
+                raise ValueError(f"No route files in {path}. Exiting...")
+            files.extend(sorted(found, key=_natural_key))
+        else:
+            files.append(path)
+    return files
+
+
+class RouteQueue:
+    """Routes flown back to back, joined into one long route.
+
+    A leg that starts in the system the previous one ends in (Spansh exports
+    start at the carrier's current system) has that first row dropped, so
+    the carrier doesn't plot a jump to where it already is.
+    """
+
+    __slots__ = ["legs", "route", "_offsets", "_ends"]
+
+    def __init__(self, legs: Sequence[Route]) -> None:
+        if not legs:
+            raise ValueError("The route queue is empty. Exiting...")
+        self.legs = list(legs)
+        self.route = Route(legs[0].path if len(legs) == 1 else None,
+                           has_details=all(leg.has_details for leg in legs))
+        # Row r of leg i is system _offsets[i] + r of the joined route.
+        self._offsets: List[int] = []
+        self._ends: List[int] = []
+        for leg in self.legs:
+            skip = 1 if len(self.route) and leg[0].lower() == self.route.destination.lower() else 0
+            self._offsets.append(len(self.route) - skip)
+            for index in range(skip, len(leg)):
+                self.route.append(
+                    leg.names[index],
+                    leg.distance[index],
+                    leg.distance_remaining[index],
+                    leg.tritium_in_tank[index],
+                    leg.tritium_in_market[index],
+                    leg.fuel_used[index],
+                    leg.flags[index],
+                )
+            self._ends.append(len(self.route))
+
+    def __len__(self) -> int:
+        return len(self.legs)
+
+    def leg_end(self, leg: int) -> int:
+        """Position in the joined route once `leg` is flown."""
+        return self._ends[leg]
+
+    def leg_at(self, position: int) -> int:
+        """The leg the jump at `position` of the joined route belongs to."""
+        for leg, end in enumerate(self._ends):
+            if position < end:
+                return leg
+        return len(self.legs) - 1
+
+    def leg_position(self, position: int) -> Tuple[int, int]:
+        """(leg, systems of that leg done) for `position` of the joined route."""
+        leg = self.leg_at(position)
+        return leg, position - self._offsets[leg]
+
+    def position(self, leg: int, leg_position: int) -> int:
+        """Position in the joined route when `leg_position` systems of `leg` are done."""
+        start = self._ends[leg - 1] if leg else 0
+        return min(max(self._offsets[leg] + leg_position, start), self._ends[leg])
+
+    def find_leg(self, name: str) -> Optional[int]:
+        """The leg loaded from a file called `name`."""
+        for leg, route in enumerate(self.legs):
+            if route.path is not None and route.path.name == name:
+                return leg
+        return None
+
+
+def load_route_queue(paths: Iterable[Path]) -> RouteQueue:
+    """Load every route file in `paths` (directories expanded) as one queue."""
+    return RouteQueue([load_route(path) for path in expand_route_queue(paths)])
@@ -0,0 +1,118 @@
+"""Deadline-anchored scheduling of the jump stages.
+
+Stage updates are pinned to absolute deadlines on the monotonic clock,
+derived once from the carrier's DepartureTime, and kept in a heap. A slow
+callback delays only itself: the next stage still fires at its own deadline
+rather than one second after the previous callback returned.
+"""
+from __future__ import annotations
+
+import datetime
+import heapq
+import itertools
+import math
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from clock import SYSTEM_CLOCK
+
+
+@dataclass(slots=True)
+class StageDrift:
+    name: str
+    planned: float
+    actual: float
+
+    @property
+    def drift(self) -> float:
+        """Seconds the stage fired after its deadline."""
+        return self.actual - self.planned
+
+
+@dataclass(slots=True)
+class DriftSummary:
+    stages: int
+    mean: float
+    worst: float
+    worst_stage: str
+
+    def __str__(self) -> str:
+        return (
+            f"{self.stages} stages, mean drift {self.mean * 1000:.0f} ms, "
+            f"worst {self.worst * 1000:.0f} ms ({self.worst_stage})"
+        )
+
+
+class StageScheduler:
+    """Timer heap of jump stages, run against a clock's monotonic time."""
+
+    __slots__ = ["clock", "drifts", "_timers", "_seq"]
+
+    def __init__(self, clock=SYSTEM_CLOCK) -> None:
+        self.clock = clock
+        self.drifts: List[StageDrift] = []
+        self._timers: List[Tuple[float, int, str, Callable[[], None]]] = []
+        self._seq = itertools.count()
+
+    def deadline_for(self, moment: datetime.datetime) -> float:
+        """Monotonic deadline of a wall-clock moment such as a DepartureTime."""
+        return self.clock.monotonic() + (moment - self.clock.now(moment.tzinfo)).total_seconds()
+
+    def at(self, deadline: float, name: str, callback: Callable[[], None], skip_missed: bool = False) -> bool:
+        """Schedule `callback` for `deadline`.
+
+        With `skip_missed`, a stage whose deadline has already passed is
+        dropped instead of firing late. Returns whether it was scheduled.
+        """
+        if skip_missed and deadline < self.clock.monotonic():
+            return False
+        heapq.heappush(self._timers, (deadline, next(self._seq), name, callback))
+        return True
+
+    def pending(self) -> int:
+        return len(self._timers)
+
+    def clear(self) -> None:
+        self._timers.clear()
+
+    def run(
+        self,
+        countdown_to: Optional[float] = None,
+        on_tick: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        """Fire every scheduled stage at its deadline, then return.
+
+        If `on_tick` is given it is called with the whole seconds left until
+        `countdown_to` on each second boundary before it, for the console
+        countdown.
+        """
+        while self._timers:
+            now = self.clock.monotonic()
+            deadline = self._timers[0][0]
+
+            if on_tick is not None and countdown_to is not None and countdown_to > now:
+                seconds_left = math.ceil(countdown_to - now - 1e-6)
+                on_tick(seconds_left)
+                next_tick = countdown_to - (seconds_left - 1)
+                deadline = min(deadline, next_tick)
+
+            if deadline > now:
+                self.clock.sleep(deadline - now)
+                continue
+
+            planned, _, name, callback = heapq.heappop(self._timers)
+            self.drifts.append(StageDrift(name, planned, self.clock.monotonic()))
+            callback()
+
+    def drift_summary(self) -> Optional[DriftSummary]:
+        """Drift of the stages fired since the last call, or None if none fired."""
+        if not self.drifts:
+            return None
+        drifts, self.drifts = self.drifts, []
+        worst = max(drifts, key=lambda stage: stage.drift)
+        return DriftSummary(
+            stages=len(drifts),
+            mean=sum(stage.drift for stage in drifts) / len(drifts),
+            worst=worst.drift,
+            worst_stage=worst.name,
+        )
@@ -0,0 +1,295 @@
+"""Checks that the game shows what CTS expects before it clicks.
+
+Plotting clicks at fixed points: the galaxy map's search field and the jump
+button from Reshandler. Small regions around those points are grabbed from
+the screen and compared, as grayscale arrays, with reference templates
+captured from the same screen: a normalised cross-correlation at every
+offset within a few pixels, computed in one NumPy pass. A grab and match
+takes milliseconds, so CTS polls until the screen matches and moves on as
+soon as it does, and gives up on a plot at once when it never does.
+
+Templates live in screen_templates/<width>x<height>/<name>.npy and are made
+from the game itself:
+
+    python screencheck.py capture galaxy_map     (galaxy map open)
+    python screencheck.py capture jump_button    (a system selected, jump button showing)
+    python screencheck.py score                  (how well the screen matches now)
+    python screencheck.py selftest               (the matcher on synthetic images)
+
+NumPy (in requirements.txt and bundled with the release) is only imported
+once templates are found, so runs without them don't pay for loading it.
+Without templates for the screen's resolution the checks are skipped and
+plotting runs on its fixed pauses as before.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+from clock import SYSTEM_CLOCK
+from config import BASE_DIR
+from profiler import PROFILER
+
+if TYPE_CHECKING:
+    import numpy
+
+TEMPLATE_DIR = BASE_DIR / "screen_templates"
+# Template size in pixels, and how far from its spot the template may be found.
+TEMPLATE_WIDTH = 96
+TEMPLATE_HEIGHT = 32
+SEARCH_MARGIN = 6
+MATCH_THRESHOLD = 0.8
+POLL_INTERVAL = 0.05
+# Below this standard deviation a template is a flat patch of colour, which
+# any similar patch would match.
+MIN_TEMPLATE_CONTRAST = 4.0
+# The Reshandler point each check's region is centred on.
+CHECKS = {
+    "galaxy_map": ("sysNameX", "sysNameUpperY"),
+    "jump_button": ("jumpButtonX", "jumpButtonY"),
+}
+
+# NumPy is imported on first use, so runs without screen checks don't load it.
+# The release build bundles it explicitly (--hidden-import numpy) since
+# nothing imports it at module level.
+np = None
+
+
+def _load_numpy() -> None:
+    global np
+    if np is None:
+        import numpy as _numpy
+
+        np = _numpy
+
+
+def match_template(region: numpy.ndarray, template: numpy.ndarray) -> float:
+    """Best normalised cross-correlation of `template` at any offset inside `region`.
+
+    1.0 is a perfect match; unrelated images score near 0. Uniform changes
+    in brightness and contrast don't affect the score. -1.0 if `region` is
+    smaller than `template`, and 0.0 for a flat template, which can't match.
+    """
+    _load_numpy()
+    region = np.asarray(region, dtype=np.float32)
+    template = np.asarray(template, dtype=np.float32)
+    height, width = template.shape
+    if region.shape[0] < height or region.shape[1] < width:
+        return -1.0
+    count = height * width
+    centred = template - template.mean()
+    template_norm = float(np.sqrt(np.einsum("ij,ij->", centred, centred)))
+    if template_norm < 1e-6:
+        return 0.0
+
+    # Every placement of the template at once: (offsets y, offsets x, height, width).
+    windows = np.lib.stride_tricks.sliding_window_view(region, (height, width))
+    # The template is zero-mean, so the window means drop out of the numerator.
+    numerator = np.einsum("abij,ij->ab", windows, centred)
+    sums = windows.sum(axis=(2, 3))
+    squares = np.einsum("abij,abij->ab", windows, windows)
+    window_norm = np.sqrt(np.maximum(squares - sums * sums / count, 0.0))
+    denominator = window_norm * template_norm
+    scores = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 1e-6)
+    return float(scores.max())
+
+
+def grab_region(left: int, top: int, width: int, height: int) -> numpy.ndarray:
+    """Grayscale pixels of a screen region."""
+    import pyautogui
+
+    image = pyautogui.screenshot(region=(left, top, width, height))
+    return np.asarray(image.convert("L"))
+
+
+def template_box(x: int, y: int, margin: int = 0) -> Tuple[int, int, int, int]:
+    """(left, top, width, height) of the template centred on (x, y), widened by `margin`."""
+    left = max(0, x - TEMPLATE_WIDTH // 2 - margin)
+    top = max(0, y - TEMPLATE_HEIGHT // 2 - margin)
+    return left, top, TEMPLATE_WIDTH + 2 * margin, TEMPLATE_HEIGHT + 2 * margin
+
+
+class ScreenVerifier:
+    """Waits for the screen around Reshandler's click points to match their templates."""
+
+    __slots__ = ["points", "templates", "threshold", "grab", "checks", "matched"]
+
+    def __init__(
+        self,
+        res_handler,
+        templates: Dict[str, numpy.ndarray],
+        threshold: float = MATCH_THRESHOLD,
+        grab: Optional[Callable[[int, int, int, int], numpy.ndarray]] = None,
+    ) -> None:
+        _load_numpy()
+        self.points = {name: (getattr(res_handler, x), getattr(res_handler, y)) for name, (x, y) in CHECKS.items()}
+        self.templates = dict(templates)
+        self.threshold = threshold
+        self.grab = grab or grab_region
+        self.checks = 0
+        self.matched = 0
+
+    def has(self, name: str) -> bool:
+        return name in self.templates
+
+    def capture(self, name: str) -> numpy.ndarray:
+        """The screen around `name`'s click point, with room for the template to be off by SEARCH_MARGIN."""
+        return self.grab(*template_box(*self.points[name], SEARCH_MARGIN))
+
+    def score(self, name: str, pixels: Optional[numpy.ndarray] = None) -> float:
+        with PROFILER.span("screen check"):
+            self.checks += 1
+            if pixels is None:
+                pixels = self.capture(name)
+            return match_template(pixels, self.templates[name])
+
+    def wait_for(self, name: str, timeout: float, clock=SYSTEM_CLOCK) -> Optional[bool]:
+        """Poll until `name` matches: True when it does, False after `timeout`, None if it can't be checked."""
+        if not self.has(name):
+            return None
+        deadline = clock.monotonic() + timeout
+        while True:
+            try:
+                pixels = self.capture(name)
+            except Exception as exc:
+                # A screen that can't be grabbed now won't be later either.
+                print(f"Screen checks disabled, the screen could not be read: {exc}")
+                self.templates.clear()
+                return None
+            score = self.score(name, pixels)
+            if score >= self.threshold:
+                self.matched += 1
+                return True
+            if clock.monotonic() >= deadline:
+                print(f"Screen check {name} failed (best match {score:.2f})")
+                return False
+            clock.sleep(POLL_INTERVAL)
+
+
+def template_path(width: int, height: int, name: str, template_dir: Path = TEMPLATE_DIR) -> Path:
+    return template_dir / f"{width}x{height}" / f"{name}.npy"
+
+
+def load_verifier(
+    res_handler, width: int, height: int, template_dir: Path = TEMPLATE_DIR
+) -> Optional[ScreenVerifier]:
+    """A verifier for the templates captured at this resolution, or None if there are none."""
+    paths = {name: template_path(width, height, name, template_dir) for name in CHECKS}
+    paths = {name: path for name, path in paths.items() if path.exists()}
+    if not paths:
+        return None
+    _load_numpy()
+    templates = {}
+    for name, path in paths.items():
+        try:
+            templates[name] = np.load(path, allow_pickle=False)
+        except (OSError, ValueError) as exc:
+            print(f"Could not load the {name} screen template: {exc}")
+    if not templates:
+        return None
+    print(f"Screen checks: {', '.join(sorted(templates))}")
+    return ScreenVerifier(res_handler, templates)
+
+
+def synthetic_screen(rng: numpy.random.Generator) -> numpy.ndarray:
+    """A search region's worth of blocky shapes on noise, a little like UI text and borders."""
+    _load_numpy()
+    size = (TEMPLATE_HEIGHT + 2 * SEARCH_MARGIN, TEMPLATE_WIDTH + 2 * SEARCH_MARGIN)
+    image = rng.integers(0, 40, size).astype(np.float32)
+    for _ in range(6):
+        top, left = rng.integers(0, size[0] - 4), rng.integers(0, size[1] - 8)
+        image[top:top + rng.integers(2, 10), left:left + rng.integers(4, 40)] += rng.integers(80, 200)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def centre_template(screen: numpy.ndarray) -> numpy.ndarray:
+    """The template a capture of `screen` would give: its middle, without the search margin."""
+    return screen[SEARCH_MARGIN:SEARCH_MARGIN + TEMPLATE_HEIGHT, SEARCH_MARGIN:SEARCH_MARGIN + TEMPLATE_WIDTH]
+
+
+def seen_again(rng: numpy.random.Generator, screen: numpy.ndarray) -> numpy.ndarray:
+    """`screen` as a later grab might see it: a few pixels off, dimmer or brighter, with sensor noise."""
+    _load_numpy()
+    dy, dx = rng.integers(-SEARCH_MARGIN, SEARCH_MARGIN + 1, 2)
+    shifted = np.roll(screen, (dy, dx), axis=(0, 1)).astype(np.float32)
+    shifted = shifted * rng.uniform(0.7, 1.3) + rng.uniform(-20, 20) + rng.normal(0, 6, screen.shape)
+    return np.clip(shifted, 0, 255).astype(np.uint8)
+
+
+def synthetic_scores(rounds: int = 200, seed: int = 1) -> Tuple[float, float, float]:
+    """Worst score of a matching screen, best of a different one, and seconds per match."""
+    _load_numpy()
+    rng = np.random.default_rng(seed)
+    worst_match, best_mismatch = 1.0, -1.0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        source = synthetic_screen(rng)
+        template = centre_template(source)
+        worst_match = min(worst_match, match_template(seen_again(rng, source), template))
+        best_mismatch = max(best_mismatch, match_template(synthetic_screen(rng), template))
+    return worst_match, best_mismatch, (time.perf_counter() - started) / (2 * rounds)
+
+
+def selftest(rounds: int = 200, seed: int = 1) -> bool:
+    """Print synthetic_scores against MATCH_THRESHOLD; test_screencheck.py checks the same."""
+    worst_match, best_mismatch, per_match = synthetic_scores(rounds, seed)
+    ok = worst_match >= MATCH_THRESHOLD > best_mismatch
+    print(f"Worst score of a matching screen: {worst_match:.3f}")
+    print(f"Best score of a different screen: {best_mismatch:.3f}")
+    print(f"Threshold {MATCH_THRESHOLD}: {'ok' if ok else 'FAILED'}, {per_match * 1000:.2f} ms per match")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Screen templates for CTS's plotting checks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    capture_parser = commands.add_parser("capture", help="save the screen around a click point as its template")
+    capture_parser.add_argument("name", choices=sorted(CHECKS))
+    capture_parser.add_argument("--delay", type=float, default=5.0, help="seconds to switch to the game first")
+    commands.add_parser("score", help="score the screen against every template")
+    commands.add_parser("selftest", help="check the matcher against synthetic images")
+    args = parser.parse_args()
+
+    _load_numpy()
+    if args.command == "selftest":
+        sys.exit(0 if selftest() else 1)
+
+    from reshandler import Reshandler
+    from resolution import start_resolution_probe
+
+    # Templates are saved per resolution, so this waits for the detected size
+    # rather than trusting the cache.
+    probe = start_resolution_probe()
+    probe.wait()
+    width, height = probe.resolution()
+    res_handler = Reshandler(width, height)
+    if not res_handler.supported_res:
+        parser.exit(1, f"{width}x{height} is not a supported resolution\n")
+
+    if args.command == "capture":
+        print(f"Capturing {args.name} in {args.delay:.0f}s...")
+        time.sleep(args.delay)
+        x_name, y_name = CHECKS[args.name]
+        pixels = grab_region(*template_box(getattr(res_handler, x_name), getattr(res_handler, y_name)))
+        if float(pixels.std()) < MIN_TEMPLATE_CONTRAST:
+            parser.exit(1, "That region is a flat colour, so it can't tell screens apart. Is the game showing it?\n")
+        path = template_path(width, height, args.name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, pixels, allow_pickle=False)
+        print(f"Saved {path}")
+        return
+
+    verifier = load_verifier(res_handler, width, height)
+    if verifier is None:
+        parser.exit(1, f"No screen templates for {width}x{height}\n")
+    for name in sorted(verifier.templates):
+        started = time.perf_counter()
+        score = verifier.score(name)
+        print(f"{name}: {score:.3f} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""Full-route simulation of run_traversal.
+
+Runs the real traversal loop against a virtual clock, a simulated game that
+answers the jump button with journal lines, and a Discord handler that only
+records what it would have sent. A 20 jump route finishes in seconds and
+leaves a timeline of every stage transition, Discord call and input action,
+so route throughput can be checked without the game.
+
+    python simulation.py route.txt --jump-timer 900
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import io
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from clock import FakeClock
+from config import TraversalOptions
+from discordhandler import DiscordHandler
+import input_handler
+import platform_utils
+
+JOURNAL_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# With power saving: from launching the game to its main menu, and from
+# clicking into the menu to being loaded in.
+GAME_LAUNCH_SECONDS = 40.0
+GAME_LOAD_SECONDS = 30.0
+
+
+@dataclass(slots=True)
+class TimelineEntry:
+    at: float
+    kind: str
+    detail: str
+
+
+class Timeline:
+    """Everything the simulated run did, stamped with virtual seconds since start."""
+
+    __slots__ = ["clock", "entries", "_lock"]
+
+    def __init__(self, clock: FakeClock) -> None:
+        self.clock = clock
+        self.entries: List[TimelineEntry] = []
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, detail: str) -> None:
+        with self._lock:
+            self.entries.append(TimelineEntry(self.clock.elapsed, kind, detail))
+
+    def of_kind(self, kind: str) -> List[TimelineEntry]:
+        return [entry for entry in self.entries if entry.kind == kind]
+
+    def jump_cycles(self) -> List[float]:
+        """Virtual seconds between the start of consecutive plots."""
+        plots = [entry.at for entry in self.entries if entry.kind == "phase" and entry.detail == "plotting"]
+        return [later - earlier for earlier, later in zip(plots, plots[1:])]
+
+    def dump(self) -> str:
+        return "\n".join(f"{entry.at:10.1f}s  {entry.kind:<8} {entry.detail}" for entry in self.entries)
+
+
+class SimulatedGame:
+    """Input backend standing in for Elite: plots jumps and writes the journal."""
+
+    __slots__ = ["clock", "timeline", "journal_path", "res_handler", "jump_timer", "jump_duration",
+                 "fail_plots", "clipboard", "mouse", "plots", "running", "location", "launches",
+                 "_on_jump_button", "_in_menu", "_systems", "_lock"]
+
+    def __init__(
+        self,
+        clock: FakeClock,
+        timeline: Timeline,
+        journal_path: Path,
+        res_handler,
+        route: Sequence[str],
+        jump_timer: float = 900.0,
+        jump_duration: float = 50.0,
+        fail_plots: Iterable[int] = (),
+    ) -> None:
+        self.clock = clock
+        self.timeline = timeline
+        self.journal_path = journal_path
+        self.res_handler = res_handler
+        self.jump_timer = jump_timer
+        self.jump_duration = jump_duration
+        # Plot attempts (counted from 0) that the game should ignore.
+        self.fail_plots = set(fail_plots)
+        self.clipboard = ""
+        self.mouse = (0, 0)
+        self.plots = 0
+        # Space only confirms the jump right after the cursor lands on the button.
+        self._on_jump_button = False
+        self._systems = {name.lower(): name for name in route}
+        self._lock = threading.Lock()
+        # Power saving closes and relaunches the game; the carrier jumps either way.
+        self.running = True
+        self.location = ""
+        self.launches = 0
+        self._in_menu = False
+        self.write_event("Fileheader", part=1, language="English/UK", Odyssey=True)
+
+    def write_event(self, event: str, **fields) -> None:
+        stamp = self.clock.now(datetime.timezone.utc).strftime(JOURNAL_TIME_FORMAT)
+        body = "".join(f', "{key}":{_json_value(value)}' for key, value in fields.items())
+        with self._lock, self.journal_path.open("a", encoding="utf-8") as journal:
+            journal.write(f'{{ "timestamp":"{stamp}", "event":"{event}"{body} }}\r\n')
+
+    def press(self, key: str) -> None:
+        self.timeline.record("input", f"press {key}")
+        if key == "space" and self._on_jump_button:
+            self._plot()
+        self._on_jump_button = False
+
+    def keyDown(self, key: str) -> None:
+        self.timeline.record("input", f"keyDown {key}")
+
+    def keyUp(self, key: str) -> None:
+        self.timeline.record("input", f"keyUp {key}")
+
+    def click(self, x=None, y=None, button: str = "left") -> None:
+        if x is not None and y is not None:
+            self.mouse = (x, y)
+        self.timeline.record("input", f"click {button} at {self.mouse}")
+        if self._in_menu:
+            # Clicking into the main menu starts the game, which takes a while to load.
+            self._in_menu = False
+            self.clock.call_later(GAME_LOAD_SECONDS, self._loaded)
+
+    # platform_utils game backend, for power saving.
+    def open_game(self, app_id: str) -> None:
+        self.launches += 1
+        self.timeline.record("game", f"launching ({self.launches})")
+        self.clock.call_later(GAME_LAUNCH_SECONDS, self._menu)
+
+    def kill_launcher(self) -> int:
+        self.running = False
+        self.timeline.record("game", "closed")
+        return 1
+
+    def _menu(self) -> None:
+        # Every launch writes a new journal.
+        self.journal_path = self.journal_path.with_name(f"Journal.{self.clock.now():%Y-%m-%dT%H%M%S}.01.log")
+        self.write_event("Fileheader", part=1, language="English/UK", Odyssey=True)
+        self._in_menu = True
+        self.timeline.record("game", "main menu")
+
+    def _loaded(self) -> None:
+        self.running = True
+        self.write_event("Location", Docked=True, StarSystem=self.location)
+        self.timeline.record("game", f"loaded in {self.location}")
+
+    def moveTo(self, x: int, y: int) -> None:
+        self.mouse = (x, y)
+        self._on_jump_button = self.mouse == (self.res_handler.jumpButtonX, self.res_handler.jumpButtonY)
+        self.timeline.record("input", f"moveTo {x},{y}")
+
+    def typewrite(self, text: str, interval: float = 0.0) -> None:
+        self.timeline.record("input", f"typewrite {text}")
+
+    def copy(self, text: str) -> None:
+        self.clipboard = text
+        self.timeline.record("input", f"copy {text}")
+
+    def _plot(self) -> None:
+        attempt = self.plots
+        self.plots += 1
+        system = self._systems.get(self.clipboard)
+        if system is None or attempt in self.fail_plots:
+            self.timeline.record("game", f"plot {attempt} ignored")
+            return
+
+        departure = self.clock.now(datetime.timezone.utc) + datetime.timedelta(seconds=self.jump_timer)
+        departure = departure.replace(microsecond=0)
+        self.write_event(
+            "CarrierJumpRequest",
+            CarrierID=3700000000,
+            SystemName=system,
+            Body=system,
+            DepartureTime=departure.strftime(JOURNAL_TIME_FORMAT),
+        )
+        self.timeline.record("game", f"jump to {system} scheduled for {departure:%H:%M:%S}")
+
+        def jump() -> None:
+            self.location = system
+            if not self.running:
+                self.timeline.record("game", f"jumped to {system} (game closed, not in the journal)")
+                return
+            self.write_event("CarrierJump", Docked=True, StarSystem=system)
+            self.timeline.record("game", f"jumped to {system}")
+
+        self.clock.call_at(departure + datetime.timedelta(seconds=self.jump_duration), jump)
+
+
+def _json_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return '"' + str(value).replace('"', '\\"') + '"'
+
+
+class RecordingDiscordHandler(DiscordHandler):
+    """DiscordHandler that records its calls instead of sending them."""
+
+    __slots__ = ["timeline"]
+
+    def __init__(self, timeline: Timeline, *, single_message: bool = False) -> None:
+        super().__init__(single_message=single_message, photos=["https://example.invalid/photo.png"])
+        self.timeline = timeline
+
+    def post_to_discord(self, subject: str, webhook_url: str, routeName: str, *message: str):
+        self.timeline.record("discord", f"post {subject}")
+
+    def post_with_fields(self, subject: str, webhook_url: str, routeName: str, *message: str):
+        self.timeline.record("discord", f"post_with_fields {subject}")
+
+    def update_fields(self, carrierStage: int, maintenanceStage: int):
+        self.timeline.record("discord", f"update_fields {carrierStage},{maintenanceStage}")
+
+
+@dataclass(slots=True)
+class SimulationResult:
+    completed: bool
+    timeline: Timeline
+    virtual_seconds: float
+    wall_seconds: float
+    plots: int = 0
+    output: str = ""
+    jump_cycles: List[float] = field(default_factory=list)
+
+    def summary(self) -> str:
+        cycles = self.jump_cycles
+        mean_cycle = sum(cycles) / len(cycles) if cycles else 0.0
+        return (
+            f"Route {'completed' if self.completed else 'FAILED'} in "
+            f"{datetime.timedelta(seconds=round(self.virtual_seconds))} simulated "
+            f"({self.wall_seconds:.2f}s wall)\n"
+            f"Plot attempts: {self.plots}, Discord calls: {len(self.timeline.of_kind('discord'))}, "
+            f"input actions: {len(self.timeline.of_kind('input'))}\n"
+            f"Mean jump cycle: {mean_cycle:.0f}s over {len(cycles)} cycles"
+        )
+
+
+def simulate_route(
+    route: Sequence[str],
+    *,
+    jump_timer: float = 900.0,
+    jump_duration: float = 50.0,
+    fail_plots: Iterable[int] = (),
+    refuel: bool = True,
+    single_discord_message: bool = False,
+    quiet: bool = True,
+    route_file: Optional[Path] = None,
+    legs: int = 1,
+    interrupt: Optional[Tuple[str, int]] = None,
+    forget_checkpoint: bool = False,
+    power_saving: bool = False,
+) -> SimulationResult:
+    """Fly `route` through run_traversal in virtual time.
+
+    With `route_file` (the file `route` was loaded from) the traversal reads
+    that file, so CSV routes keep their per-jump figures. With `legs` above
+    one the route is split into that many files, each starting where the one
+    before ends, and flown as a route queue. With `interrupt` (a phase and
+    n) the run is stopped as with Ctrl+C the nth time that phase begins, and
+    started again from its checkpoint, or with `forget_checkpoint` from what
+    the journal says. With `power_saving` the game is closed after every
+    plot and relaunched for the cooldown, as on a real PC.
+    """
+    import main
+    from reshandler import Reshandler
+
+    route = list(route)
+    clock = FakeClock(datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0))
+    timeline = Timeline(clock)
+    output = io.StringIO()
+
+    with tempfile.TemporaryDirectory(prefix="cts-sim-") as scratch:
+        scratch_dir = Path(scratch)
+        if route_file is None:
+            route_file = scratch_dir / "route.txt"
+            route_file.write_text("\n".join(route), encoding="utf-8")
+        route_queue: tuple = ()
+        if legs > 1:
+            legs_dir = scratch_dir / "legs"
+            legs_dir.mkdir()
+            size = -(-len(route) // legs)
+            for leg, start in enumerate(range(0, len(route), size), start=1):
+                # Like Spansh exports, each leg after the first starts at the previous destination.
+                systems = route[max(0, start - 1):start + size]
+                (legs_dir / f"leg {leg}.txt").write_text("\n".join(systems), encoding="utf-8")
+            route_queue = (legs_dir,)
+        journal_dir = scratch_dir / "journals"
+        journal_dir.mkdir()
+        journal_path = journal_dir / f"Journal.{clock.now():%Y-%m-%dT%H%M%S}.01.log"
+
+        options = TraversalOptions(
+            webhook_url="",
+            journal_directory=journal_dir,
+            route_file=route_file,
+            route_queue=route_queue,
+            tritium_slot=1,
+            auto_plot_jumps=True,
+            disable_refuel=not refuel,
+            power_saving=power_saving,
+            single_discord_message=single_discord_message,
+            shutdown_on_complete=False,
+            journal_watch_mode="poll",
+        )
+
+        with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+            res_handler = Reshandler(1920, 1080)
+            game = SimulatedGame(
+                clock, timeline, journal_path, res_handler, route,
+                jump_timer=jump_timer, jump_duration=jump_duration, fail_plots=fail_plots,
+            )
+            input_handler.set_backend(game)
+            platform_utils.set_game_backend(game)
+            phases_seen: dict = {}
+
+            def on_phase(phase: str) -> None:
+                timeline.record("phase", phase)
+                phases_seen[phase] = phases_seen.get(phase, 0) + 1
+                if interrupt is not None and interrupt == (phase, phases_seen[phase]):
+                    timeline.record("sim", f"interrupted at {phase} {phases_seen[phase]}")
+                    raise KeyboardInterrupt
+
+            def run() -> bool:
+                return main.run_traversal(
+                    options,
+                    clock=clock,
+                    discord_messenger=RecordingDiscordHandler(
+                        timeline, single_message=single_discord_message
+                    ),
+                    res_handler=res_handler,
+                    checkpoint_path=scratch_dir / "checkpoint.json",
+                    eta_history_path=scratch_dir / "eta_history.json",
+                    telemetry_path=scratch_dir / "telemetry.db",
+                    on_phase=on_phase,
+                )
+
+            started = time.perf_counter()
+            try:
+                completed = run()
+                if not completed and interrupt is not None:
+                    if forget_checkpoint:
+                        (scratch_dir / "checkpoint.json").unlink()
+                    timeline.record("sim", "restarted")
+                    completed = run()
+            finally:
+                input_handler.set_backend(None)
+                platform_utils.set_game_backend(None)
+            wall = time.perf_counter() - started
+
+    return SimulationResult(
+        completed=completed,
+        timeline=timeline,
+        virtual_seconds=clock.elapsed,
+        wall_seconds=wall,
+        plots=game.plots,
+        output=output.getvalue(),
+        jump_cycles=timeline.jump_cycles(),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate a full route in virtual time")
+    parser.add_argument("route", nargs="?", type=Path, default=None,
+                        help="route file (.txt or Spansh .csv); defaults to 20 made-up systems")
+    parser.add_argument("--jump-timer", type=float, default=900.0,
+                        help="seconds between plotting and departure")
+    parser.add_argument("--fail-plot", type=int, action="append", default=[],
+                        help="plot attempt number the simulated game ignores (repeatable)")
+    parser.add_argument("--no-refuel", action="store_true")
+    parser.add_argument("--power-saving", action="store_true",
+                        help="close the game after each plot and relaunch it, as power-saving=true does")
+    parser.add_argument("--legs", type=int, default=1,
+                        help="split the route into this many files and fly them as a route queue")
+    parser.add_argument("--interrupt", metavar="PHASE:N",
+                        help="stop as with Ctrl+C the Nth time PHASE begins (e.g. countdown:5), then resume")
+    parser.add_argument("--forget-checkpoint", action="store_true",
+                        help="with --interrupt, delete the checkpoint so the resume goes by the journal")
+    parser.add_argument("--timeline", action="store_true", help="print the full timeline")
+    parser.add_argument("--verbose", action="store_true", help="show the traversal output")
+    args = parser.parse_args()
+
+    if args.route is not None:
+        from route import load_route
+        route: Optional[List[str]] = load_route(args.route).names
+    else:
+        route = [f"Simulated System {n}" for n in range(1, 21)]
+
+    result = simulate_route(
+        route,
+        jump_timer=args.jump_timer,
+        fail_plots=args.fail_plot,
+        refuel=not args.no_refuel,
+        quiet=not args.verbose,
+        route_file=args.route,
+        legs=args.legs,
+        forget_checkpoint=args.forget_checkpoint,
+        power_saving=args.power_saving,
+        interrupt=(args.interrupt.split(":")[0], int(args.interrupt.split(":")[1])) if args.interrupt else None,
+    )
+    if args.timeline:
+        print(result.timeline.dump())
+    print(result.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Timing of the steps between launching CTS and it flying the carrier."""
+from __future__ import annotations
+
+import time
+from typing import List, Optional, Tuple
+
+# As close to process start as the sources get; main imports this module first.
+PROCESS_START = time.perf_counter()
+
+
+class StartupTimer:
+    """Named checkpoints, in seconds since `start`, with notes for the report."""
+
+    __slots__ = ["title", "start", "marks", "notes"]
+
+    def __init__(self, title: str = "Startup", start: Optional[float] = None) -> None:
+        self.title = title
+        self.start = time.perf_counter() if start is None else start
+        self.marks: List[Tuple[str, float]] = []
+        self.notes: List[str] = []
+
+    def mark(self, name: str) -> float:
+        """Record `name` as reached now; returns seconds since start."""
+        at = time.perf_counter() - self.start
+        self.marks.append((name, at))
+        return at
+
+    def note(self, text: str) -> None:
+        self.notes.append(text)
+
+    def elapsed(self, name: str) -> Optional[float]:
+        return next((at for mark, at in self.marks if mark == name), None)
+
+    def report(self) -> str:
+        steps = ", ".join(f"{name} {at * 1000:.0f} ms" for name, at in self.marks)
+        lines = [f"{self.title}: {steps}" if steps else f"{self.title}: no steps recorded"]
+        lines += [f"  {note}" for note in self.notes]
+        return "\n".join(lines)
+
+
+STARTUP = StartupTimer(start=PROCESS_START)
@@ -0,0 +1,257 @@
+"""A record of every jump in a local SQLite database.
+
+Each jump's route, system, request, departure and jump times, how long
+plotting and restocking took and how Discord fared are written to
+telemetry.db. Records are handed to a background thread that inserts them in
+batches, so the traversal loop never waits on the disk.
+
+    python telemetry.py stats [--route NAME]
+
+prints per-route aggregates: plot time percentiles, failed plots, restock
+times and Discord latency.
+"""
+from __future__ import annotations
+
+import argparse
+import queue
+import threading
+import time
+from dataclasses import astuple, dataclass, fields
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+from config import BASE_DIR
+
+if TYPE_CHECKING:
+    import sqlite3
+
+DB_PATH = BASE_DIR / "telemetry.db"
+# Records written per transaction, and the longest a record waits for a batch to fill.
+BATCH_SIZE = 32
+FLUSH_INTERVAL = 5.0
+SCHEMA_VERSION = 1
+
+
+@dataclass(slots=True)
+class JumpRecord:
+    route: str
+    system: str
+    position: int
+    # Unix times. jumped_at is when CTS saw the jump complete.
+    requested_at: Optional[float] = None
+    departure_at: Optional[float] = None
+    jumped_at: Optional[float] = None
+    plot_seconds: Optional[float] = None
+    plot_attempts: int = 0
+    plot_failures: int = 0
+    restock_seconds: Optional[float] = None
+    discord_messages: int = 0
+    discord_latency: Optional[float] = None
+    discord_retries: int = 0
+    discord_failures: int = 0
+
+
+_COLUMNS = [item.name for item in fields(JumpRecord)]
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jumps (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    route TEXT NOT NULL,
+    system TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    requested_at REAL,
+    departure_at REAL,
+    jumped_at REAL,
+    plot_seconds REAL,
+    plot_attempts INTEGER NOT NULL,
+    plot_failures INTEGER NOT NULL,
+    restock_seconds REAL,
+    discord_messages INTEGER NOT NULL,
+    discord_latency REAL,
+    discord_retries INTEGER NOT NULL,
+    discord_failures INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jumps_route ON jumps (route, recorded_at);
+"""
+_INSERT = (
+    f"INSERT INTO jumps (recorded_at, {', '.join(_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (len(_COLUMNS) + 1))})"
+)
+
+
+def connect(path: Path = DB_PATH) -> sqlite3.Connection:
+    # Imported here so runs with telemetry off never load it.
+    import sqlite3
+
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    if connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        connection.executescript(_SCHEMA)
+        connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return connection
+
+
+class TelemetryStore:
+    """Queues jump records and writes them from a background thread."""
+
+    __slots__ = ["path", "written", "failed", "_queue", "_thread"]
+
+    def __init__(self, path: Path = DB_PATH) -> None:
+        self.path = path
+        self.written = 0
+        self.failed = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, record: JumpRecord, recorded_at: Optional[float] = None) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+            self._thread.start()
+        self._queue.put((time.time() if recorded_at is None else recorded_at, *astuple(record)))
+
+    def close(self, timeout: float = 5.0) -> bool:
+        """Write what is queued and stop. Returns False if that didn't finish in time."""
+        if self._thread is None:
+            return True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        finished = not self._thread.is_alive()
+        self._thread = None
+        return finished
+
+    def _run(self) -> None:
+        try:
+            connection = connect(self.path)
+        except Exception as exc:
+            print(f"Telemetry disabled: {exc}")
+            self._drain()
+            return
+        try:
+            stopping = False
+            while not stopping:
+                batch: List[tuple] = []
+                deadline = time.monotonic() + FLUSH_INTERVAL
+                while len(batch) < BATCH_SIZE:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                if batch:
+                    self._write(connection, batch)
+        finally:
+            connection.close()
+
+    def _write(self, connection: sqlite3.Connection, batch: List[tuple]) -> None:
+        try:
+            with connection:
+                connection.executemany(_INSERT, batch)
+            self.written += len(batch)
+        except Exception as exc:
+            self.failed += len(batch)
+            print(f"Could not write telemetry: {exc}")
+
+    def _drain(self) -> None:
+        while self._queue.get() is not None:
+            self.failed += 1
+
+
+def percentile(values: Sequence[float], percent: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+@dataclass(slots=True)
+class RouteStats:
+    route: str
+    jumps: int
+    failed_plots: int
+    plot_p50: Optional[float]
+    plot_p95: Optional[float]
+    restock_p50: Optional[float]
+    restock_p95: Optional[float]
+    timer_p50: Optional[float]
+    discord_p95: Optional[float]
+    discord_retries: int
+    discord_failures: int
+    first: float
+    last: float
+
+
+def route_stats(connection: sqlite3.Connection, route: Optional[str] = None) -> List[RouteStats]:
+    query = (
+        "SELECT route, recorded_at, plot_seconds, plot_failures, restock_seconds, "
+        "departure_at - requested_at, discord_latency, discord_retries, discord_failures FROM jumps"
+    )
+    parameters: tuple = ()
+    if route is not None:
+        query += " WHERE route = ?"
+        parameters = (route,)
+    query += " ORDER BY route, recorded_at"
+
+    rows_by_route: dict = {}
+    for row in connection.execute(query, parameters):
+        rows_by_route.setdefault(row[0], []).append(row)
+
+    stats: List[RouteStats] = []
+    for name, rows in rows_by_route.items():
+        def column(index: int) -> List[float]:
+            return [row[index] for row in rows if row[index] is not None]
+
+        plots, restocks, timers, latencies = column(2), column(4), column(5), column(6)
+        stats.append(RouteStats(
+            name,
+            len(rows),
+            sum(row[3] for row in rows),
+            percentile(plots, 50),
+            percentile(plots, 95),
+            percentile(restocks, 50),
+            percentile(restocks, 95),
+            percentile(timers, 50),
+            percentile(latencies, 95),
+            sum(row[7] for row in rows),
+            sum(row[8] for row in rows),
+            rows[0][1],
+            rows[-1][1],
+        ))
+    return stats
+
+
+def _seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the CTS jump telemetry")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    stats_parser = commands.add_parser("stats", help="per-route aggregates")
+    stats_parser.add_argument("--route", help="only this route")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        parser.exit(1, f"No telemetry at {args.db}\n")
+    connection = connect(args.db)
+    try:
+        for stats in route_stats(connection, args.route):
+            first = time.strftime("%Y-%m-%d %H:%M", time.localtime(stats.first))
+            last = time.strftime("%Y-%m-%d %H:%M", time.localtime(stats.last))
+            print(f"{stats.route} ({first} to {last})")
+            print(f"  jumps {stats.jumps}, failed plots {stats.failed_plots}")
+            print(f"  plot time p50 {_seconds(stats.plot_p50)}, p95 {_seconds(stats.plot_p95)}")
+            print(f"  restock p50 {_seconds(stats.restock_p50)}, p95 {_seconds(stats.restock_p95)}")
+            print(f"  jump timer p50 {_seconds(stats.timer_p50)}")
+            print(f"  Discord p95 latency {_seconds(stats.discord_p95)}, "
+                  f"{stats.discord_retries} retries, {stats.discord_failures} failures")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
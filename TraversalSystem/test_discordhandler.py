@@ -0,0 +1,61 @@
+"""Dispatch queue limits, against a transport that holds sends until released.
+
+    python -m pytest TraversalSystem
+"""
+from __future__ import annotations
+
+import threading
+
+from discordhandler import MAX_QUEUED_MESSAGES, DiscordHandler
+from webhooktransport import WebhookMessage
+
+WEBHOOK = "https://discord.invalid/api/webhooks/1/token"
+
+
+class HeldTransport:
+    """Records every post and edit; nothing is sent until `release` is set."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.posted = []
+        self.edits = 0
+
+    def execute(self, url: str, payload: dict) -> WebhookMessage:
+        self.release.wait(10)
+        self.posted.append(payload["embeds"][0]["title"])
+        return WebhookMessage(url, str(len(self.posted)))
+
+    def edit(self, message: WebhookMessage, payload: dict) -> None:
+        self.release.wait(10)
+        self.edits += 1
+
+
+def held_handler():
+    transport = HeldTransport()
+    return DiscordHandler(photos=["https://example.invalid/photo.png"], transport=transport), transport
+
+
+def test_posts_are_never_dropped():
+    handler, transport = held_handler()
+    count = MAX_QUEUED_MESSAGES * 2
+    for index in range(count):
+        handler.post_to_discord(f"Post {index}", WEBHOOK, "Route")
+    transport.release.set()
+
+    assert handler.flush(10)
+    assert transport.posted == [f"Post {index}" for index in range(count)]
+    assert handler.stats.dropped == 0
+
+
+def test_full_queue_drops_a_stale_update_first():
+    handler, transport = held_handler()
+    handler.post_with_fields("First", WEBHOOK, "Route")
+    handler.update_fields(1, 1)
+    for index in range(MAX_QUEUED_MESSAGES):
+        handler.post_to_discord(f"Post {index}", WEBHOOK, "Route")
+    transport.release.set()
+
+    assert handler.flush(10)
+    assert len(transport.posted) == MAX_QUEUED_MESSAGES + 1
+    assert handler.stats.dropped == 1
+    assert transport.edits == 0
@@ -0,0 +1,57 @@
+"""Cached resolution handed out at once, then confirmed by detection.
+
+    python -m pytest TraversalSystem
+"""
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+import resolution
+from resolution import ResolutionProbe, display_identity, load_cached, save_cached
+
+
+@pytest.fixture
+def detection(monkeypatch):
+    """Holds detection until `release` is set, then reports `size`."""
+    held = {"release": threading.Event(), "size": (1920, 1080)}
+
+    def detect():
+        held["release"].wait(10)
+        return held["size"]
+
+    monkeypatch.setattr(resolution, "get_screen_resolution", detect)
+    return held
+
+
+def test_cache_answers_before_detection(tmp_path, detection):
+    cache = tmp_path / "resolution_cache.json"
+    save_cached(display_identity(), (2560, 1440), cache)
+    probe = ResolutionProbe(cache).start()
+
+    assert probe.resolution() == (2560, 1440)
+    assert probe.source == "cache"
+    detection["size"] = (2560, 1440)
+    detection["release"].set()
+    assert probe.confirm() is None
+
+
+def test_changed_resolution_is_reported(tmp_path, detection):
+    cache = tmp_path / "resolution_cache.json"
+    save_cached(display_identity(), (2560, 1440), cache)
+    probe = ResolutionProbe(cache).start()
+
+    assert probe.resolution() == (2560, 1440)
+    detection["release"].set()
+    assert probe.confirm() == (1920, 1080)
+    assert load_cached(display_identity(), cache) == (1920, 1080)
+
+
+def test_no_cache_waits_for_detection(tmp_path, detection):
+    probe = ResolutionProbe(tmp_path / "resolution_cache.json").start()
+    detection["release"].set()
+
+    assert probe.resolution() == (1920, 1080)
+    assert probe.source == "detected"
+    assert probe.confirm() is None
@@ -0,0 +1,102 @@
+"""Screen template matching on synthetic images, no screen needed.
+
+    python -m pytest TraversalSystem
+"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from clock import FakeClock
+from reshandler import Reshandler
+from screencheck import (
+    MATCH_THRESHOLD,
+    SEARCH_MARGIN,
+    TEMPLATE_HEIGHT,
+    TEMPLATE_WIDTH,
+    ScreenVerifier,
+    centre_template,
+    match_template,
+    seen_again,
+    synthetic_scores,
+    synthetic_screen,
+)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+
+def test_region_smaller_than_template(rng):
+    template = centre_template(synthetic_screen(rng))
+    assert match_template(template[:-1, :], template) == -1.0
+    assert match_template(template[:, :-1], template) == -1.0
+
+
+def test_flat_template_never_matches(rng):
+    flat = np.full((TEMPLATE_HEIGHT, TEMPLATE_WIDTH), 90, dtype=np.uint8)
+    assert match_template(synthetic_screen(rng), flat) == 0.0
+    # Not even an identical flat screen.
+    assert match_template(np.pad(flat, SEARCH_MARGIN, mode="edge"), flat) == 0.0
+
+
+def test_exact_copy_scores_one(rng):
+    screen = synthetic_screen(rng)
+    assert match_template(screen, centre_template(screen)) == pytest.approx(1.0, abs=1e-4)
+
+
+def test_shifted_relit_screen_matches(rng):
+    for _ in range(50):
+        screen = synthetic_screen(rng)
+        assert match_template(seen_again(rng, screen), centre_template(screen)) >= MATCH_THRESHOLD
+
+
+def test_different_screen_does_not_match(rng):
+    for _ in range(50):
+        template = centre_template(synthetic_screen(rng))
+        assert match_template(synthetic_screen(rng), template) < MATCH_THRESHOLD
+
+
+def test_synthetic_scores_separate_at_threshold():
+    worst_match, best_mismatch, _ = synthetic_scores(rounds=100)
+    assert worst_match >= MATCH_THRESHOLD > best_mismatch
+
+
+def verifier(rng, grab):
+    template = centre_template(synthetic_screen(rng))
+    with_template = {"galaxy_map": template}
+    return ScreenVerifier(Reshandler(1920, 1080), with_template, grab=grab), template
+
+
+def test_wait_for_matches_once_the_screen_shows(rng):
+    grabs = []
+
+    def grab(left, top, width, height):
+        grabs.append((left, top, width, height))
+        if len(grabs) < 3:
+            return synthetic_screen(rng)
+        return np.pad(screen.templates["galaxy_map"], SEARCH_MARGIN, mode="edge")
+
+    screen, _ = verifier(rng, grab)
+    assert screen.wait_for("galaxy_map", 5.0, FakeClock()) is True
+    assert len(grabs) == 3
+    assert grabs[0][2:] == (TEMPLATE_WIDTH + 2 * SEARCH_MARGIN, TEMPLATE_HEIGHT + 2 * SEARCH_MARGIN)
+
+
+def test_wait_for_times_out_on_the_clock(rng):
+    clock = FakeClock()
+    screen, _ = verifier(rng, lambda *box: synthetic_screen(rng))
+    assert screen.wait_for("galaxy_map", 2.0, clock) is False
+    assert 2.0 <= clock.elapsed < 2.5
+
+
+def test_wait_for_unknown_or_unreadable(rng):
+    def broken(*box):
+        raise OSError("no display")
+
+    screen, _ = verifier(rng, broken)
+    assert screen.wait_for("jump_button", 1.0, FakeClock()) is None
+    assert screen.wait_for("galaxy_map", 1.0, FakeClock()) is None
+    # A screen that can't be read turns the checks off.
+    assert not screen.has("galaxy_map")
@@ -0,0 +1,62 @@
+"""Route throughput checks: the traversal loop flown through simulation.py in virtual time.
+
+    python -m pytest TraversalSystem
+"""
+from __future__ import annotations
+
+import pytest
+
+from simulation import simulate_route
+
+ROUTE = ["Test System A", "Test System B", "Test System C"]
+CYCLE = ["plotting", "countdown", "jumping", "cooldown", "restocking"]
+
+
+def phases(result) -> list:
+    return [entry.detail for entry in result.timeline.of_kind("phase")]
+
+
+def test_route_stage_order_and_duration():
+    result = simulate_route(ROUTE, jump_timer=900.0)
+
+    assert result.completed
+    assert result.plots == len(ROUTE)
+    assert phases(result) == CYCLE * len(ROUTE) + ["complete"]
+    # A jump cycle is the 900 s timer, about 60 s of transit and the cooldown
+    # with its restock, so about 21.5 minutes.
+    assert len(result.jump_cycles) == len(ROUTE) - 1
+    assert all(1200 <= cycle <= 1400 for cycle in result.jump_cycles)
+    assert 3600 <= result.virtual_seconds <= 4200
+
+
+def test_power_saving_relaunches_on_the_clock():
+    result = simulate_route(ROUTE, jump_timer=900.0, power_saving=True)
+
+    assert result.completed
+    assert phases(result) == CYCLE * (len(ROUTE) - 1) + ["plotting", "countdown", "jumping", "complete"]
+    game = [entry.detail for entry in result.timeline.of_kind("game")]
+    # Closed after every plot and reopened at departure, the last jump included.
+    assert sum(detail == "closed" for detail in game) == len(ROUTE)
+    assert sum(detail.startswith("launching") for detail in game) == len(ROUTE)
+    assert sum(detail.startswith("loaded in") for detail in game) >= len(ROUTE) - 1
+    # The relaunch waits in virtual time, so the route takes no real time to speak of.
+    assert result.wall_seconds < 30
+    assert 3000 <= result.virtual_seconds <= 3800
+
+
+def test_late_jump_waits_in_virtual_time():
+    # The CarrierJump lands well after the jump check, so confirmation has to wait for it.
+    result = simulate_route(ROUTE, jump_timer=900.0, jump_duration=150.0)
+
+    assert result.completed
+    assert result.wall_seconds < 30
+    assert all(1290 <= cycle <= 1500 for cycle in result.jump_cycles)
+
+
+@pytest.mark.parametrize("failed", [(0,), (1, 2)])
+def test_failed_plots_are_retried(failed):
+    result = simulate_route(ROUTE, jump_timer=900.0, fail_plots=failed)
+
+    assert result.completed
+    assert result.plots == len(ROUTE) + len(failed)
+    assert phases(result).count("countdown") == len(ROUTE)
@@ -0,0 +1,132 @@
+"""Check GitHub for a newer CTS release without holding up startup.
+
+The check runs on a background thread and prints its warning whenever the
+answer arrives. The answer is cached in version_cache.json: within the TTL
+no request is made at all, and after it the request carries the cached ETag
+so an unchanged release costs a 304 rather than a download.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from config import BASE_DIR
+
+GITHUB_REPO_OWNER = "congenial-acorn"
+GITHUB_REPO_NAME = "CATS"
+GITHUB_RELEASES_API = (
+    f"https://api.github.com/repos/{GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}/releases/latest"
+)
+VERSION_CHECK_USER_AGENT = "CTS-Version-Check"
+CACHE_PATH = BASE_DIR / "version_cache.json"
+# How long a cached answer is trusted without asking GitHub again.
+CACHE_TTL = 12 * 60 * 60
+
+
+def parse_version_tag(tag: str) -> int:
+    cleaned_tag = tag.strip().lstrip("vV")
+    parts = cleaned_tag.split(".")
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        raise ValueError(f"Invalid version tag: {tag}")
+    return int("".join(parts))
+
+
+LOCAL_VERSION_TAG = "v1.4.0"
+LOCAL_VERSION = parse_version_tag(LOCAL_VERSION_TAG)
+
+
+@dataclass(slots=True)
+class CachedRelease:
+    tag: str
+    etag: str
+    checked_at: float
+
+    def fresh(self, now: float, ttl: float = CACHE_TTL) -> bool:
+        return 0 <= now - self.checked_at < ttl
+
+
+def load_cache(path: Path = CACHE_PATH) -> Optional[CachedRelease]:
+    try:
+        cached = json.loads(path.read_text(encoding="utf-8"))
+        return CachedRelease(str(cached["tag"]), str(cached.get("etag", "")), float(cached["checked_at"]))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_cache(release: CachedRelease, path: Path = CACHE_PATH) -> None:
+    try:
+        path.write_text(
+            json.dumps({"tag": release.tag, "etag": release.etag, "checked_at": release.checked_at}),
+            encoding="utf-8",
+        )
+    except OSError:
+        pass
+
+
+def fetch_latest_release(cached: Optional[CachedRelease] = None, timeout: float = 5.0) -> CachedRelease:
+    """Ask GitHub for the latest release, revalidating `cached` with its ETag."""
+    import urllib.error
+    import urllib.request
+
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "User-Agent": VERSION_CHECK_USER_AGENT,
+    }
+    if cached is not None and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    request = urllib.request.Request(GITHUB_RELEASES_API, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = json.load(response)
+            etag = response.headers.get("ETag", "")
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304 and cached is not None:
+            return CachedRelease(cached.tag, cached.etag, time.time())
+        raise
+
+    tag_name = payload.get("tag_name")
+    if not tag_name:
+        raise ValueError("No tag_name in GitHub release response.")
+    parse_version_tag(tag_name)
+    return CachedRelease(tag_name, etag, time.time())
+
+
+def latest_release_tag(cache_path: Path = CACHE_PATH, ttl: float = CACHE_TTL) -> str:
+    """The newest release tag, from the cache while it is fresh."""
+    cached = load_cache(cache_path)
+    if cached is not None and cached.fresh(time.time(), ttl):
+        return cached.tag
+    release = fetch_latest_release(cached)
+    save_cache(release, cache_path)
+    return release.tag
+
+
+def update_warning(latest_tag: str) -> Optional[str]:
+    if parse_version_tag(latest_tag) <= LOCAL_VERSION:
+        return None
+    return (
+        f"Update available. You are on {LOCAL_VERSION_TAG}, but the latest release is "
+        f"{latest_tag}. Please download the newest version from GitHub. "
+        f"https://github.com/congenial-acorn/CTS/releases/latest"
+    )
+
+
+def check_for_update(report: Callable[[str], None] = print, cache_path: Path = CACHE_PATH) -> None:
+    try:
+        warning = update_warning(latest_release_tag(cache_path))
+    except Exception as exc:  # offline, rate limited, bad response: never fatal
+        report(f"Version check skipped: {exc}")
+        return
+    if warning is not None:
+        report(warning)
+
+
+def start_version_check(report: Callable[[str], None] = print) -> threading.Thread:
+    """Run check_for_update on a background thread and return it."""
+    thread = threading.Thread(target=check_for_update, args=(report,), name="version-check", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,264 @@
+"""Local stand-in for Discord's webhook API.
+
+Serves the two endpoints CTS uses, executing a webhook and editing one of
+its messages, so DiscordHandler can be exercised and benchmarked without a
+real webhook. Responses can be slowed down, rate limited the way Discord
+does (``X-RateLimit-*`` headers and 429s with ``retry_after``) and made to
+fail.
+
+    python webhookstandin.py --port 8080 --latency 0.15 --fail-rate 0.05
+
+then point ``webhook_url`` at the printed URL.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import re
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+_EXECUTE = re.compile(r"^/api/webhooks/(\d+)/([\w-]+)/?$")
+_EDIT = re.compile(r"^/api/webhooks/(\d+)/([\w-]+)/messages/(\d+)/?$")
+
+
+@dataclass(slots=True)
+class StandinConfig:
+    # Seconds added to every response, plus up to `latency_jitter` more.
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    # Requests allowed per webhook in each `bucket_window` seconds; 0 disables the limit.
+    bucket_size: int = 5
+    bucket_window: float = 2.0
+    # Whether to send X-RateLimit-* headers, so clients can budget ahead of a 429.
+    rate_limit_headers: bool = True
+    # Share of requests answered with a 500.
+    fail_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+@dataclass(slots=True)
+class StandinRequest:
+    method: str
+    path: str
+    status: int
+    at: float
+
+
+@dataclass(slots=True)
+class _Bucket:
+    remaining: int
+    reset_at: float
+
+
+@dataclass(slots=True)
+class StandinCounts:
+    executes: int = 0
+    edits: int = 0
+    rate_limited: int = 0
+    failed: int = 0
+    not_found: int = 0
+    requests: List[StandinRequest] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.requests)} requests: {self.executes} executes, {self.edits} edits, "
+            f"{self.rate_limited} rate limited, {self.failed} failed, {self.not_found} not found"
+        )
+
+
+class WebhookStandin:
+    """A webhook server on localhost; use as a context manager or start()/stop()."""
+
+    __slots__ = ["config", "counts", "messages", "webhook_id", "token", "_server", "_thread",
+                 "_lock", "_buckets", "_ids", "_random", "_fail_next"]
+
+    def __init__(self, config: Optional[StandinConfig] = None, port: int = 0) -> None:
+        self.config = config or StandinConfig()
+        self.counts = StandinCounts()
+        self.messages: Dict[str, dict] = {}
+        self.webhook_id = "1234567890"
+        self.token = "standin-token"
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _Bucket] = {}
+        self._ids = itertools.count(1000000000000000000)
+        self._random = random.Random(self.config.seed)
+        self._fail_next = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/webhooks/{self.webhook_id}/{self.token}"
+
+    def start(self) -> "WebhookStandin":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="webhook-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def __enter__(self) -> "WebhookStandin":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def fail_next(self, count: int = 1) -> None:
+        """Answer the next `count` requests with a 500."""
+        with self._lock:
+            self._fail_next += count
+
+    def handle(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, str], Optional[dict]]:
+        """Status, headers and JSON body for one request."""
+        route, _, query = path.partition("?")
+        execute = _EXECUTE.match(route) if method == "POST" else None
+        edit = _EDIT.match(route) if method == "PATCH" else None
+        match = execute or edit
+        if match is None or match.group(1) != self.webhook_id or match.group(2) != self.token:
+            return self._record(method, path, 404, {}, {"message": "Unknown Webhook", "code": 10015})
+
+        with self._lock:
+            now = time.monotonic()
+            headers: Dict[str, str] = {}
+            if self.config.bucket_size > 0:
+                bucket = self._buckets.get(self.webhook_id)
+                if bucket is None or now >= bucket.reset_at:
+                    bucket = _Bucket(self.config.bucket_size, now + self.config.bucket_window)
+                    self._buckets[self.webhook_id] = bucket
+                reset_after = max(0.0, bucket.reset_at - now)
+                if bucket.remaining <= 0:
+                    self.counts.rate_limited += 1
+                    headers = {"Retry-After": f"{reset_after:.3f}", "X-RateLimit-Scope": "user"}
+                    if self.config.rate_limit_headers:
+                        headers.update(self._rate_limit_headers(bucket, reset_after))
+                    return self._record(method, path, 429, headers, {
+                        "message": "You are being rate limited.",
+                        "retry_after": round(reset_after, 3),
+                        "global": False,
+                    })
+                bucket.remaining -= 1
+                if self.config.rate_limit_headers:
+                    headers = self._rate_limit_headers(bucket, reset_after)
+
+            if self._fail_next > 0 or self._random.random() < self.config.fail_rate:
+                self._fail_next = max(0, self._fail_next - 1)
+                self.counts.failed += 1
+                return self._record(method, path, 500, headers, {"message": "500: Internal Server Error", "code": 0})
+
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return self._record(method, path, 400, headers, {"message": "Cannot send an empty message", "code": 50006})
+
+            if execute is not None:
+                message_id = str(next(self._ids))
+                message = {"id": message_id, "webhook_id": self.webhook_id, "embeds": payload.get("embeds", [])}
+                self.messages[message_id] = message
+                self.counts.executes += 1
+                if "wait=true" not in query:
+                    return self._record(method, path, 204, headers, None)
+                return self._record(method, path, 200, headers, message)
+
+            message = self.messages.get(edit.group(3))
+            if message is None:
+                self.counts.not_found += 1
+                return self._record(method, path, 404, headers, {"message": "Unknown Message", "code": 10008})
+            message["embeds"] = payload.get("embeds", message["embeds"])
+            self.counts.edits += 1
+            return self._record(method, path, 200, headers, message)
+
+    def _rate_limit_headers(self, bucket: _Bucket, reset_after: float) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.config.bucket_size),
+            "X-RateLimit-Remaining": str(bucket.remaining),
+            "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}",
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": f"standin-{self.webhook_id}",
+        }
+
+    def _record(
+        self, method: str, path: str, status: int, headers: Dict[str, str], body: Optional[dict]
+    ) -> Tuple[int, Dict[str, str], Optional[dict]]:
+        self.counts.requests.append(StandinRequest(method, path, status, time.monotonic()))
+        return status, headers, body
+
+
+def _make_handler(standin: WebhookStandin) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            # Headers and body go out in separate writes; don't let Nagle hold the body back.
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def _respond(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            config = standin.config
+            delay = config.latency + (random.uniform(0, config.latency_jitter) if config.latency_jitter else 0.0)
+            if delay > 0:
+                time.sleep(delay)
+
+            status, headers, payload = standin.handle(self.command, self.path, body)
+            data = json.dumps(payload).encode() if payload is not None else b""
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if data:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_POST = do_PATCH = do_GET = do_DELETE = _respond
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for a Discord webhook")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--bucket-size", type=int, default=5, help="requests per window, 0 for no limit")
+    parser.add_argument("--bucket-window", type=float, default=2.0)
+    parser.add_argument("--no-rate-limit-headers", action="store_true")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with a 500")
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        bucket_size=args.bucket_size,
+        bucket_window=args.bucket_window,
+        rate_limit_headers=not args.no_rate_limit_headers,
+        fail_rate=args.fail_rate,
+    )
+    with WebhookStandin(config, args.port) as standin:
+        print(f"Webhook stand-in listening on {standin.url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    print(standin.counts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""HTTP transport for Discord webhooks.
+
+Keeps one persistent connection per host so consecutive posts and edits skip
+the TCP and TLS handshakes, and tracks Discord's ``X-RateLimit-*`` headers so
+a request that would be rejected waits for its bucket to reset instead of
+being sent and bounced with a 429. Failed requests are retried with jittered
+exponential backoff, except a post whose body may already have reached
+Discord: retrying that could post the message twice.
+"""
+from __future__ import annotations
+
+import json
+import random
+import select
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from versioncheck import LOCAL_VERSION_TAG
+
+if TYPE_CHECKING:
+    import http.client
+
+USER_AGENT = f"CTS (https://github.com/congenial-acorn/CTS, {LOCAL_VERSION_TAG})"
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+
+class WebhookError(Exception):
+    """A webhook request that failed for good."""
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _SendError(Exception):
+    """A request that failed in transit. `sent` if it failed after the body went out."""
+
+    def __init__(self, cause: Exception, sent: bool) -> None:
+        super().__init__(str(cause))
+        self.sent = sent
+
+
+@dataclass(slots=True)
+class WebhookMessage:
+    """A message sent through a webhook, kept so it can be edited later."""
+    url: str
+    message_id: str
+
+
+@dataclass(slots=True)
+class RequestStats:
+    requests: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    reconnects: int = 0
+    # Seconds spent waiting for a rate limit bucket before sending.
+    budget_wait: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    def percentile(self, percent: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.requests} requests, {self.retries} retries, {self.rate_limited} rate limited, "
+            f"{self.reconnects} reconnects, {self.budget_wait:.1f}s waiting on rate limits, "
+            f"latency p50 {self.percentile(50) * 1000:.0f} ms, p95 {self.percentile(95) * 1000:.0f} ms"
+        )
+
+
+@dataclass(slots=True)
+class _Bucket:
+    remaining: int = 1
+    reset_at: float = 0.0
+
+
+class WebhookTransport:
+    """Sends webhook requests over pooled connections within Discord's rate limits."""
+
+    __slots__ = ["timeout", "max_retries", "stats", "_sleep", "_monotonic", "_lock",
+                 "_connections", "_route_buckets", "_buckets", "_global_reset"]
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_retries: int = MAX_RETRIES,
+        sleep: Callable[[float], None] = time.sleep,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.stats = RequestStats()
+        self._sleep = sleep
+        self._monotonic = monotonic
+        self._lock = threading.Lock()
+        self._connections: Dict[Tuple[str, str], http.client.HTTPConnection] = {}
+        # Discord reports which bucket a route belongs to; several routes can share one.
+        self._route_buckets: Dict[str, str] = {}
+        self._buckets: Dict[str, _Bucket] = {}
+        self._global_reset = 0.0
+
+    def execute(self, url: str, payload: dict) -> WebhookMessage:
+        """Post a new message and return it."""
+        message = self.request("POST", url, payload, query="wait=true")
+        if not isinstance(message, dict) or "id" not in message:
+            raise WebhookError("Discord did not return the posted message")
+        return WebhookMessage(url, str(message["id"]))
+
+    def edit(self, message: WebhookMessage, payload: dict) -> None:
+        self.request("PATCH", f"{message.url.rstrip('/')}/messages/{message.message_id}", payload)
+
+    def request(self, method: str, url: str, payload: dict, query: str = "") -> Optional[dict]:
+        # Imported here so runs with no webhook never load the HTTP stack.
+        import http.client
+
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise WebhookError(f"Not a webhook URL: {url}")
+        path = parts.path or "/"
+        if parts.query or query:
+            path += "?" + "&".join(filter(None, (parts.query, query)))
+        # Edits of different messages share their webhook's limit.
+        route = f"{method} {parts.path.split('/messages/')[0]}"
+        body = json.dumps(payload).encode("utf-8")
+
+        # The lock is only taken to check a connection out of the pool or back
+        # in and to update the buckets and stats, never across network I/O or
+        # a sleep, so one slow or backing-off request doesn't hold up the others.
+        key = (parts.scheme, parts.netloc)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._lock:
+                    self.stats.retries += 1
+            self._wait_for_budget(route)
+
+            connection = self._checkout(key)
+            started = self._monotonic()
+            try:
+                status, headers, data, reusable = self._send(connection, method, path, body)
+            except _SendError as exc:
+                failure = exc
+                reusable = False
+            else:
+                failure = None
+            latency = self._monotonic() - started
+            self._checkin(key, connection, reusable)
+            with self._lock:
+                self.stats.latencies.append(latency)
+                self.stats.requests += 1
+                if failure is None:
+                    self._update_bucket(route, headers)
+
+            if failure is not None:
+                # A post that may have arrived is not sent again; edits can be repeated safely.
+                if attempt == self.max_retries or (failure.sent and method == "POST"):
+                    raise WebhookError(f"Webhook request failed: {failure}") from failure.__cause__
+                self._sleep(self._backoff(attempt))
+                continue
+            if status == 429:
+                retry_after = self._retry_after(headers, data)
+                with self._lock:
+                    self.stats.rate_limited += 1
+                    if _header(headers, "X-RateLimit-Global") == "true":
+                        self._global_reset = self._monotonic() + retry_after
+                if attempt == self.max_retries:
+                    raise WebhookError("Rate limited by Discord", status)
+                self._sleep(retry_after * random.uniform(1.0, 1.1))
+                continue
+            if status >= 500:
+                if attempt == self.max_retries:
+                    raise WebhookError(f"Discord returned {status}", status)
+                self._sleep(self._backoff(attempt))
+                continue
+            if status >= 400:
+                raise WebhookError(f"Discord returned {status}: {data[:200].decode('utf-8', 'replace')}", status)
+            return json.loads(data) if data else None
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections.values():
+                connection.close()
+            self._connections.clear()
+
+    def _checkout(self, key: Tuple[str, str]) -> http.client.HTTPConnection:
+        """Take the idle connection for `key` out of the pool, or make a new one."""
+        import http.client
+
+        with self._lock:
+            connection = self._connections.pop(key, None)
+            if connection is not None and _dropped(connection):
+                # Closed by the server while idle. Found now, before sending, so
+                # the request isn't lost to it after the body has gone out.
+                connection.close()
+                self.stats.reconnects += 1
+                connection = None
+        if connection is None:
+            scheme, netloc = key
+            connection_type = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            connection = connection_type(netloc, timeout=self.timeout)
+        return connection
+
+    def _checkin(self, key: Tuple[str, str], connection: http.client.HTTPConnection, reusable: bool) -> None:
+        """Return `connection` to the pool, or close it if it can't be reused or the pool has one."""
+        with self._lock:
+            if reusable and key not in self._connections:
+                self._connections[key] = connection
+                return
+            if not reusable:
+                self.stats.reconnects += 1
+        connection.close()
+
+    def _send(
+        self, connection: http.client.HTTPConnection, method: str, path: str, body: bytes
+    ) -> Tuple[int, Dict[str, str], bytes, bool]:
+        """Send one request on `connection`, which only this thread holds.
+
+        Returns the status, headers, body and whether the connection can be reused.
+        """
+        import http.client
+
+        try:
+            connection.request(method, path, body=body, headers={
+                "Content-Type": "application/json",
+                "User-Agent": USER_AGENT,
+            })
+        except (OSError, http.client.HTTPException) as exc:
+            # Connecting or writing failed; the server can't have acted on a partial request.
+            raise _SendError(exc, sent=False) from exc
+        try:
+            response = connection.getresponse()
+            # The body has to be read in full before the connection can be reused.
+            data = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            raise _SendError(exc, sent=True) from exc
+        headers = {name.lower(): value for name, value in response.getheaders()}
+        return response.status, headers, data, not response.will_close
+
+    def _wait_for_budget(self, route: str) -> None:
+        with self._lock:
+            now = self._monotonic()
+            wait = self._global_reset - now
+            bucket = self._buckets.get(self._route_buckets.get(route, ""))
+            if bucket is not None and bucket.remaining <= 0:
+                wait = max(wait, bucket.reset_at - now)
+            if wait > 0:
+                self.stats.budget_wait += wait
+        if wait > 0:
+            self._sleep(wait)
+
+    def _update_bucket(self, route: str, headers: Dict[str, str]) -> None:
+        bucket_id = _header(headers, "X-RateLimit-Bucket")
+        remaining = _header(headers, "X-RateLimit-Remaining")
+        reset_after = _header(headers, "X-RateLimit-Reset-After")
+        if bucket_id is None or remaining is None or reset_after is None:
+            return
+        try:
+            bucket = _Bucket(int(remaining), self._monotonic() + float(reset_after))
+        except ValueError:
+            return
+        self._route_buckets[route] = bucket_id
+        self._buckets[bucket_id] = bucket
+
+    def _retry_after(self, headers: Dict[str, str], data: bytes) -> float:
+        try:
+            return float(json.loads(data)["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(_header(headers, "Retry-After") or 1.0)
+        except ValueError:
+            return 1.0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _dropped(connection: http.client.HTTPConnection) -> bool:
+    """Whether an idle pooled connection has been closed by the other end."""
+    if connection.sock is None:
+        return False
+    try:
+        # An idle keep-alive socket only turns readable when the server closes it.
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    return headers.get(name.lower())
@@ -0,0 +1,111 @@
+"""Discord messaging: a whole route's webhook traffic against the local stand-in.
+
+Replays the post_with_fields/update_fields calls of every jump, with the
+stage gaps of a real jump scaled down by --time-scale, and reports how long
+the traversal loop was blocked, throughput and end-to-end latency.
+
+    python benchmarks/bench_discord.py --jumps 20 --latency 0.1
+    python benchmarks/bench_discord.py --sync   # wait for each send, like the old handler
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List, Tuple
+
+from common import SOURCE_DIR  # noqa: F401  (puts TraversalSystem on the path)
+
+from discordhandler import DiscordHandler
+from webhookstandin import StandinConfig, WebhookStandin
+
+# Discord calls of one jump, in seconds after the jump was plotted (900 s timer).
+JUMP_UPDATES: List[Tuple[float, int, int]] = [
+    (0, 0, 0),
+    (300, 1, 1), (700, 2, 2), (710, 2, 3), (756, 2, 4), (797, 2, 5), (810, 2, 6),
+    (825, 2, 7), (840, 3, 7), (870, 4, 7), (900, 5, 7), (922, 6, 7), (942, 7, 7),
+    (962, 8, 7), (1111, 8, 8), (1162, 8, 9), (1262, 9, 9),
+]
+
+
+def percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def run_route(handler: DiscordHandler, url: str, jumps: int, time_scale: float, sync: bool) -> List[float]:
+    """Make the calls of `jumps` jumps; returns how long each call blocked the caller."""
+    blocked: List[float] = []
+    start = time.perf_counter()
+    for jump in range(jumps):
+        jump_start = jump * JUMP_UPDATES[-1][0]
+        for offset, carrier_stage, maintenance_stage in JUMP_UPDATES:
+            due = start + (jump_start + offset) * time_scale
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            called = time.perf_counter()
+            if offset == 0:
+                handler.post_with_fields(
+                    "Carrier Jump", url, "Benchmark Route",
+                    f"The carrier is now jumping to the Benchmark {jump} system.",
+                    "Next jump: <t:1700000000:R>", "o7",
+                )
+            handler.update_fields(carrier_stage, maintenance_stage)
+            if sync:
+                handler.flush()
+            blocked.append(time.perf_counter() - called)
+    return blocked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jumps", type=int, default=20)
+    parser.add_argument("--time-scale", type=float, default=0.001,
+                        help="real seconds per second of a jump (0.001 = 1000x faster)")
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in response latency")
+    parser.add_argument("--latency-jitter", type=float, default=0.05)
+    parser.add_argument("--bucket-size", type=int, default=5)
+    parser.add_argument("--bucket-window", type=float, default=2.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--single-message", action="store_true")
+    parser.add_argument("--sync", action="store_true", help="wait for every call to be sent")
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        bucket_size=args.bucket_size,
+        bucket_window=args.bucket_window,
+        fail_rate=args.fail_rate,
+        seed=1,
+    )
+    with WebhookStandin(config) as standin:
+        handler = DiscordHandler(single_message=args.single_message, photos=["https://example.invalid/photo.png"])
+        started = time.perf_counter()
+        blocked = run_route(handler, standin.url, args.jumps, args.time_scale, args.sync)
+        calls_done = time.perf_counter()
+        handler.flush()
+        drained = time.perf_counter()
+        handler.transport.close()
+
+    calls = len(blocked)
+    stats = handler.stats
+    print(f"{args.jumps} jumps, {calls} calls, {'sync' if args.sync else 'queued'}"
+          f"{', single message' if args.single_message else ''}")
+    print(f"Caller blocked: total {sum(blocked):.3f}s, p99 {percentile(blocked, 99) * 1000:.2f} ms, "
+          f"max {max(blocked) * 1000:.2f} ms")
+    print(f"Calls made in {calls_done - started:.2f}s, queue drained {drained - calls_done:.2f}s later")
+    print(f"Throughput: {stats.sent / (drained - started):.1f} messages/s")
+    print(f"End-to-end latency: p50 {percentile(stats.latencies, 50) * 1000:.0f} ms, "
+          f"p95 {percentile(stats.latencies, 95) * 1000:.0f} ms, "
+          f"p99 {percentile(stats.latencies, 99) * 1000:.0f} ms")
+    print(f"Dispatch: {stats}")
+    print(f"HTTP: {handler.transport.stats}")
+    print(f"Stand-in: {standin.counts}")
+
+
+if __name__ == "__main__":
+    main()
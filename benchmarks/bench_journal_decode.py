@@ -0,0 +1,62 @@
+"""Journal decode throughput: stdlib json on every line vs. the prefiltered path.
+
+    python benchmarks/bench_journal_decode.py --size-mb 50
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from common import best_of, write_synthetic_journal
+
+import journalevents
+from journalevents import decode_event
+
+
+def decode_all_json(lines):
+    handled = 0
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if event["event"] in ("CarrierJumpRequest", "CarrierStats", "CarrierJump"):
+            handled += 1
+    return handled
+
+
+def decode_prefiltered(lines):
+    handled = 0
+    for line in lines:
+        if decode_event(line) is not None:
+            handled += 1
+    return handled
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=50.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = write_synthetic_journal(
+            Path(tmp) / "Journal.2024-01-01T000000.01.log", int(args.size_mb * 1024 * 1024)
+        )
+        lines = journal.read_bytes().split(b"\n")
+
+    baseline = best_of(lambda: decode_all_json(lines), args.repeat)
+    fast = best_of(lambda: decode_prefiltered(lines), args.repeat)
+    assert decode_all_json(lines) == decode_prefiltered(lines)
+
+    mb = args.size_mb
+    print(f"Journal: {mb:.0f} MB, {len(lines)} lines, decoder: {journalevents.DECODER_NAME}")
+    print(f"json.loads every line: {baseline:8.3f}s ({mb / baseline:7.1f} MB/s)")
+    print(f"prefilter + decoder:   {fast:8.3f}s ({mb / fast:7.1f} MB/s)")
+    print(f"speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Startup time: fresh interpreters importing main and flying to the first plot.
+
+Each run starts a new Python with ``-X importtime`` and, in it, imports
+main.py and runs main's startup up to "Autopilot Script Online", then flies
+a one-system route through the simulation up to the first navigation. Both
+times are read from the ``STARTUP`` marks main records, from process start. The
+slowest imports of the last run are listed so regressions point at a module.
+
+    python benchmarks/bench_startup.py --runs 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from common import SOURCE_DIR
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+CHILD = """
+import json
+import main
+from startup import STARTUP
+main.go_online()
+from simulation import simulate_route
+simulate_route(["Startup Benchmark"], jump_timer=60)
+# Both marks are taken as the step is reached, not after the simulated route has finished.
+print(json.dumps({"online": STARTUP.elapsed("online"), "first_navigation": STARTUP.elapsed("first navigation")}))
+"""
+
+
+def run_once() -> Tuple[Dict[str, float], List[Tuple[int, str]]]:
+    """Seconds to online and to first navigation, and top-level import costs in microseconds."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SOURCE_DIR), env.get("PYTHONPATH", "")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=SOURCE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = json.loads(result.stdout.strip().splitlines()[-1])
+
+    imports: List[Tuple[int, str]] = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        # The script's own imports and what they import directly.
+        if match and len(match.group(3)) <= 3:
+            imports.append((int(match.group(2)), match.group(4)))
+    return times, imports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    online: List[float] = []
+    navigation: List[float] = []
+    imports: List[Tuple[int, str]] = []
+    for _ in range(args.runs):
+        times, imports = run_once()
+        online.append(times["online"])
+        navigation.append(times["first_navigation"])
+
+    print(f"{args.runs} runs")
+    print(f"Start to online:            median {statistics.median(online) * 1000:.1f} ms, "
+          f"best {min(online) * 1000:.1f} ms")
+    print(f"Start to first navigation:  median {statistics.median(navigation) * 1000:.1f} ms, "
+          f"best {min(navigation) * 1000:.1f} ms")
+    print("Slowest imports (cumulative):")
+    for micros, module in sorted(imports, reverse=True)[:args.top]:
+        print(f"  {micros / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks are run from the repository root, e.g.
+``python benchmarks/bench_journal_decode.py``. Importing this module puts the
+TraversalSystem sources on the import path.
+"""
+from __future__ import annotations
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+ROOT = Path(__file__).resolve().parents[1]
+SOURCE_DIR = ROOT / "TraversalSystem"
+if str(SOURCE_DIR) not in sys.path:
+    sys.path.insert(0, str(SOURCE_DIR))
+
+# Rough event mix of a real carrier session: mostly noise, a few carrier events.
+_NOISE_EVENTS = [
+    {"event": "Music", "MusicTrack": "NoTrack"},
+    {"event": "ReceiveText", "From": "", "Message": "$COMMS_entered:#name=Carrier;", "Message_Localised": "Entered Channel: Carrier", "Channel": "npc"},
+    {"event": "FSSSignalDiscovered", "SystemAddress": 3932277478106, "SignalName": "HMS NOTHING X7Z-1QK", "IsStation": True},
+    {"event": "Scan", "ScanType": "AutoScan", "BodyName": "Synuefe AB-C d13-3 A 1", "BodyID": 12, "DistanceFromArrivalLS": 1234.5, "TidalLock": False, "TerraformState": "", "PlanetClass": "Icy body", "Atmosphere": "", "Volcanism": "", "MassEM": 0.0123, "Radius": 1853244.0, "SurfaceGravity": 1.42, "SurfaceTemperature": 53.1, "SurfacePressure": 0.0, "Landable": True, "Materials": [{"Name": "iron", "Percent": 19.1}, {"Name": "nickel", "Percent": 14.4}, {"Name": "sulphur", "Percent": 13.2}], "Composition": {"Ice": 0.68, "Rock": 0.21, "Metal": 0.1}, "SemiMajorAxis": 4.2e11, "Eccentricity": 0.001, "OrbitalInclination": 0.2, "Periapsis": 12.3, "OrbitalPeriod": 8.9e7, "RotationPeriod": 8.9e7, "AxialTilt": 0.1, "WasDiscovered": True, "WasMapped": False},
+    {"event": "Cargo", "Vessel": "Ship", "Count": 200},
+    {"event": "NpcCrewPaidWage", "NpcCrewName": "Jane Doe", "NpcCrewId": 1234, "Amount": 0},
+    {"event": "CarrierTradeOrder", "CarrierID": 3700000000, "BlackMarket": False, "Commodity": "tritium", "PurchaseOrder": 0},
+]
+
+
+def synthetic_journal_lines(size_bytes: int, seed: int = 1) -> Iterator[bytes]:
+    """Journal lines totalling roughly `size_bytes`, in the game's formatting."""
+    rng = random.Random(seed)
+    written = 0
+    jump = 0
+    while written < size_bytes:
+        roll = rng.random()
+        stamp = f"2024-01-{1 + jump % 28:02d}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}Z"
+        if roll < 0.002:
+            jump += 1
+            body = {"event": "CarrierJumpRequest", "CarrierID": 3700000000, "SystemName": f"Route System {jump}", "Body": f"Route System {jump}", "SystemAddress": jump, "BodyID": 0, "DepartureTime": stamp}
+        elif roll < 0.004:
+            body = {"event": "CarrierJump", "Docked": True, "StationName": "X7Z-1QK", "StarSystem": f"Route System {jump}", "SystemAddress": jump}
+        elif roll < 0.006:
+            body = {"event": "CarrierStats", "CarrierID": 3700000000, "Callsign": "X7Z-1QK", "Name": "HMS NOTHING", "FuelLevel": rng.randrange(1000)}
+        else:
+            body = rng.choice(_NOISE_EVENTS)
+        line = (
+            b'{ "timestamp":"' + stamp.encode() + b'", '
+            + json.dumps(body, separators=(",", ":"))[1:].encode()
+            + b"\r\n"
+        )
+        written += len(line)
+        yield line
+
+
+def write_synthetic_journal(path: Path, size_bytes: int, seed: int = 1) -> Path:
+    with path.open("wb") as journal:
+        journal.writelines(synthetic_journal_lines(size_bytes, seed))
+    return path
+
+
+def best_of(func: Callable[[], object], repeat: int = 5) -> float:
+    """Fastest wall time of `repeat` runs of `func`, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,292 @@
+"""Offline microbenchmarks of the parsing paths, with JSON output to track over time.
+
+Covers journal tailing (JournalWatcher on 1 to 200 MB journals), route
+loading (10k-row Spansh CSV and plain text), Reshandler lookups, finding the
+newest journal in folders of thousands of journals and reading the carrier's
+position back from them, button sequences (compiling, and running them
+against a no-op input backend) and screen template matching.
+Every fixture is synthetic and built in a scratch folder.
+
+    python benchmarks/suite.py --output bench.json
+    python benchmarks/suite.py --compare bench.json        # after a change
+    python benchmarks/suite.py --quick --only route
+
+--compare exits with status 1 when a benchmark is slower than the baseline
+by more than --threshold.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from common import ROOT, write_synthetic_journal
+
+from buttonsequence import SequenceLibrary, compile_sequence
+from clock import FakeClock
+from inputexecutor import InputExecutor
+import input_handler
+from journallocator import JournalLocator
+from journalscan import scan_carrier_state
+from journalwatcher import JournalWatcher
+from reshandler import Reshandler
+from route import COLUMNS, load_route
+import screencheck
+
+SEQUENCE_DIR = ROOT / "TraversalSystem" / "sequences"
+JOURNAL_SIZES_MB = (1, 10, 50, 200)
+QUICK_JOURNAL_SIZES_MB = (1, 10)
+ROUTE_ROWS = 10_000
+JOURNAL_COUNTS = (1_000, 5_000)
+RESOLUTIONS = [
+    (1920, 1080), (3440, 1440), (5120, 1440), (3620, 2036), (2560, 1440),
+    (1280, 720), (3840, 2160), (2560, 1080), (1600, 900), (1024, 768),
+]
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best and median wall time of `repeat` runs, in seconds."""
+    times: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return {"best": min(times), "median": statistics.median(times), "runs": repeat}
+
+
+@contextlib.contextmanager
+def quiet() -> Iterator[None]:
+    """CTS prints as it goes; keep it out of the benchmark output and timings."""
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+class NoopBackend:
+    """Input backend that drops every action."""
+
+    def press(self, key): pass
+    def keyDown(self, key): pass
+    def keyUp(self, key): pass
+    def click(self, x=None, y=None, button="left"): pass
+    def moveTo(self, x, y): pass
+    def typewrite(self, text, interval=0.0): pass
+    def copy(self, text): pass
+
+
+def bench_journal(scratch: Path, sizes_mb, repeat: int) -> Dict[str, dict]:
+    results = {}
+    for size_mb in sizes_mb:
+        journal = write_synthetic_journal(
+            scratch / f"Journal.2024-01-01T{size_mb:06d}.01.log", int(size_mb * 1024 * 1024)
+        )
+
+        def read_all() -> None:
+            # follow() on a fresh watcher reads the file from the top.
+            JournalWatcher().follow(journal)
+
+        with quiet():
+            result = measure(read_all, repeat)
+        result["mb_per_s"] = size_mb / result["best"]
+        results[f"journal.process_{size_mb}mb"] = result
+        journal.unlink()
+    return results
+
+
+def write_spansh_csv(path: Path, rows: int, seed: int = 1) -> Path:
+    rng = random.Random(seed)
+    header = [title.title() for title in COLUMNS]
+    remaining = rows * 480.0
+    with path.open("w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file, quoting=csv.QUOTE_ALL)
+        writer.writerow(header)
+        for row in range(rows):
+            distance = 0.0 if row == 0 else rng.uniform(300, 500)
+            remaining = max(0.0, remaining - distance)
+            # Some real system names contain commas.
+            name = f"Synuefe {row}, AB-C d13-{row % 97}" if row % 5 == 0 else f"Route System {row}"
+            writer.writerow([
+                name, f"{distance:.2f}", f"{remaining:.2f}", rng.randrange(1000), 0,
+                0 if row == 0 else rng.randrange(50, 135),
+                "Yes" if row % 7 == 0 else "No", "No", "Yes" if row % 40 == 0 else "No",
+            ])
+    return path
+
+
+def bench_route(scratch: Path, repeat: int) -> Dict[str, dict]:
+    csv_path = write_spansh_csv(scratch / "route.csv", ROUTE_ROWS)
+    text_path = scratch / "route.txt"
+    text_path.write_text("\n".join(load_route(csv_path).names), encoding="utf-8")
+    results = {
+        f"route.load_csv_{ROUTE_ROWS // 1000}k": measure(lambda: load_route(csv_path), repeat),
+        f"route.load_txt_{ROUTE_ROWS // 1000}k": measure(lambda: load_route(text_path), repeat),
+    }
+    route = load_route(csv_path)
+    results["route.prefix_queries"] = measure(
+        lambda: [route.distance_from(i) + route.fuel_from(i) for i in range(len(route))], repeat
+    )
+    return results
+
+
+def bench_resolution(repeat: int) -> Dict[str, dict]:
+    def lookup_all() -> None:
+        for width, height in RESOLUTIONS:
+            Reshandler(width, height)
+
+    with quiet():
+        result = measure(lookup_all, repeat)
+    result["per_lookup"] = result["best"] / len(RESOLUTIONS)
+    return {f"reshandler.lookup_{len(RESOLUTIONS)}": result}
+
+
+def bench_locator(scratch: Path, repeat: int) -> Dict[str, dict]:
+    results = {}
+    for count in JOURNAL_COUNTS:
+        directory = scratch / f"journals_{count}"
+        directory.mkdir()
+        for n in range(count):
+            day, second = divmod(n, 86400)
+            hours, rest = divmod(second, 3600)
+            minutes, seconds = divmod(rest, 60)
+            name = f"Journal.2024-{1 + day // 28:02d}-{1 + day % 28:02d}T{hours:02d}{minutes:02d}{seconds:02d}.01.log"
+            (directory / name).touch()
+
+        results[f"locator.cold_{count}"] = measure(lambda: JournalLocator(directory).latest(), repeat)
+        locator = JournalLocator(directory)
+        locator.latest()
+        results[f"locator.warm_{count}"] = measure(locator.latest, repeat)
+        # No carrier events anywhere: the scan gives up after MAX_JOURNALS.
+        results[f"journalscan.no_jump_{count}"] = measure(lambda: scan_carrier_state(directory), repeat)
+    return results
+
+
+def bench_sequences(repeat: int) -> Dict[str, dict]:
+    paths = sorted(SEQUENCE_DIR.rglob("*.txt"))
+    results = {
+        "sequence.compile_all": measure(lambda: [compile_sequence(path) for path in paths], repeat),
+        "sequence.preload_library": measure(lambda: SequenceLibrary(SEQUENCE_DIR).preload(), repeat),
+    }
+
+    library = SequenceLibrary(SEQUENCE_DIR)
+    names = [path.relative_to(SEQUENCE_DIR).as_posix() for path in paths]
+    # Virtual time, so the waits in the sequences cost nothing.
+    inputs = InputExecutor(FakeClock(), jitter=0.0)
+
+    def run_all() -> None:
+        for name in names:
+            inputs.run(library.get(name).steps, name)
+
+    input_handler.set_backend(NoopBackend())
+    try:
+        results["sequence.run_all_noop"] = measure(run_all, repeat)
+    finally:
+        input_handler.set_backend(None)
+    return results
+
+
+def bench_screen(repeat: int) -> Dict[str, dict]:
+    import numpy
+
+    rng = numpy.random.default_rng(1)
+    region = screencheck.synthetic_screen(rng)
+    template = screencheck.centre_template(region).copy()
+    # One poll's worth of work, less the screen grab.
+    return {"screen.match_template": measure(lambda: screencheck.match_template(region, template), repeat * 20)}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, dict], baseline_path: Path, threshold: float, min_delta: float) -> bool:
+    """Print each benchmark against the baseline; False if any regressed past `threshold`.
+
+    Slowdowns smaller than `min_delta` seconds are timer noise, not regressions.
+    """
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"Against {baseline_path} ({baseline.get('commit') or 'unknown commit'}):")
+    ok = True
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            print(f"  {name:<32} {result['best'] * 1000:10.2f} ms  (new)")
+            continue
+        ratio = result["best"] / before["best"] if before["best"] else float("inf")
+        flag = ""
+        if ratio > threshold and result["best"] - before["best"] > min_delta:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"  {name:<32} {result['best'] * 1000:10.2f} ms  {ratio:6.2f}x{flag}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="skip the 50 and 200 MB journals")
+    parser.add_argument("--only", action="append", default=[],
+                        help="run benchmarks whose group matches (journal, route, reshandler, locator, sequence, screen)")
+    parser.add_argument("--output", type=Path, help="write the results as JSON here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio counted as a regression (default 1.25)")
+    parser.add_argument("--min-delta", type=float, default=0.002,
+                        help="seconds a slowdown must also exceed to count (default 0.002)")
+    args = parser.parse_args()
+
+    def wanted(group: str) -> bool:
+        return not args.only or group in args.only
+
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(prefix="cts-bench-") as scratch_name:
+        scratch = Path(scratch_name)
+        if wanted("journal"):
+            sizes = QUICK_JOURNAL_SIZES_MB if args.quick else JOURNAL_SIZES_MB
+            # The big journals are read a few times at most.
+            results.update(bench_journal(scratch, sizes, min(args.repeat, 3)))
+        if wanted("route"):
+            results.update(bench_route(scratch, args.repeat))
+        if wanted("reshandler"):
+            results.update(bench_resolution(args.repeat))
+        if wanted("locator"):
+            results.update(bench_locator(scratch, args.repeat))
+        if wanted("sequence"):
+            results.update(bench_sequences(args.repeat))
+        if wanted("screen"):
+            results.update(bench_screen(args.repeat))
+
+    report = {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.compare is not None:
+        if not compare(results, args.compare, args.threshold, args.min_delta):
+            sys.exit(1)
+    elif args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()